@@ -4,12 +4,8 @@ from .models import User
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
+    # Nom, slug et WhatsApp de la boutique : modifiables depuis l'admin Shop.
     list_display = ('email', 'username', 'shop_name', 'whatsapp_number', 'is_staff', 'is_superuser')
-    search_fields = ('email', 'username', 'shop_name')
+    list_select_related = ('shop',)
+    search_fields = ('email', 'username', 'shop__name', 'shop__slug')
     ordering = ('email',)
-    fieldsets = BaseUserAdmin.fieldsets + (
-        ('LinkContact', {'fields': ('shop_name', 'slug', 'whatsapp_number')}),
-    )
-    add_fieldsets = BaseUserAdmin.add_fieldsets + (
-        ('LinkContact', {'fields': ('shop_name', 'slug', 'whatsapp_number')}),
-    )
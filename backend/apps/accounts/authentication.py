@@ -0,0 +1,108 @@
+"""
+JWT authentication with a per-process cache of the authenticated user.
+
+simplejwt's JWTAuthentication reads the user on every request, and most
+authenticated views then look up the user's shop. CachedJWTAuthentication
+reads both in one query (user LEFT JOIN shop) and keeps the rows per
+access token `jti` for AUTH_USER_CACHE_TTL seconds; every request gets its
+own User instance with `user.shop` already loaded. Saving or deleting a
+user or their shop drops that user's entries in this process (see
+apps.accounts.signals); other workers converge within the TTL.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.core.lru import TTLCache
+from apps.shops.models import Shop
+from .models import User
+
+# jti -> (user id, user column values, shop column values or None)
+_cache = TTLCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+)
+
+
+def _values(instance):
+    return tuple(getattr(instance, field.attname) for field in type(instance)._meta.concrete_fields)
+
+
+def _build(model, values):
+    names = [field.attname for field in model._meta.concrete_fields]
+    return model.from_db(DEFAULT_DB_ALIAS, names, values)
+
+
+def _load(user_id):
+    """Cache entry for `user_id`, from one query; None if there is no such user."""
+    user = User.objects.select_related('shop').filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    if user is None:
+        return None
+    try:
+        shop = _values(user.shop)
+    except Shop.DoesNotExist:
+        shop = None
+    return user.pk, _values(user), shop
+
+
+def _user_from_entry(entry):
+    _, user_values, shop_values = entry
+    user = _build(User, user_values)
+    shop = _build(Shop, shop_values) if shop_values is not None else None
+    # A cached None makes `user.shop` raise Shop.DoesNotExist without a query.
+    User._meta.get_field('shop').set_cached_value(user, shop)
+    if shop is not None:
+        Shop._meta.get_field('user').set_cached_value(shop, user)
+    return user
+
+
+def forget_user(user_id):
+    """Drop the cached entries of `user_id` (after a write to the user or their shop)."""
+    _cache.delete_matching(lambda entry: entry[0] == user_id)
+
+
+def clear():
+    _cache.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication whose user (with `user.shop`) is cached per token."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        entry = _cache.get(jti) if jti else None
+        if entry is None:
+            entry = _load(user_id)
+            if entry is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if jti:
+                _cache.set(jti, entry)
+        user = _user_from_entry(entry)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+
+def get_request_shop(request):
+    """
+    The authenticated user's shop: already loaded with a JWT request, one
+    query otherwise (session, admin). Http404 if the user has none.
+    """
+    try:
+        return request.user.shop
+    except Shop.DoesNotExist:
+        raise Http404
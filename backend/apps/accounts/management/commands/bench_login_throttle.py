@@ -0,0 +1,174 @@
+"""
+Legitimate login latency during a credential-stuffing flood.
+
+    python manage.py bench_login_throttle
+    python manage.py bench_login_throttle --attackers 8 --backend database
+
+Runs against a throwaway test database with the real password hasher. A
+client thread logs in with valid credentials --logins times (a different
+user and IP each time, as separate visitors would) while --attackers
+threads post wrong passwords at --attack-rate attempts per second in
+total, from --attacker-ips addresses, against existing and unknown
+accounts. Legitimate logins are measured once the flood has sent one IP
+burst (LOGIN_THROTTLE_IP_BURST) per attacker address, i.e. in the steady
+state. Three phases: no attack, attack with LOGIN_THROTTLE_ENABLED =
+False, attack with the throttle on (--backend store). Requests go through
+the full Django stack in-process; the comparison between phases is what
+matters.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from apps.accounts import throttling
+from apps.core import testing
+
+PATH = '/api/auth/login/'
+PASSWORD = 'bench-password'
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = "Latence des connexions légitimes pendant une attaque par bourrage d'identifiants."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=30, help='Connexions légitimes mesurées par phase.')
+        parser.add_argument('--attackers', type=int, default=4, help="Threads d'attaque.")
+        parser.add_argument('--attacker-ips', type=int, default=2)
+        parser.add_argument('--attack-rate', type=float, default=50.0, help="Tentatives d'attaque par seconde.")
+        parser.add_argument('--accounts', type=int, default=50, help='Comptes existants visés par l\'attaque.')
+        parser.add_argument(
+            '--backend', choices=[throttling.BACKEND_MEMORY, throttling.BACKEND_DATABASE],
+            default=throttling.BACKEND_MEMORY,
+        )
+
+    def handle(self, *args, **options):
+        if min(options['logins'], options['attackers'], options['attacker_ips'], options['attack_rate']) <= 0:
+            raise CommandError('--logins, --attackers, --attacker-ips et --attack-rate doivent être positifs.')
+        with testing.throwaway_database(), override_settings(
+            ALLOWED_HOSTS=['*'], LOGIN_THROTTLE_BACKEND=options['backend'],
+        ):
+            self._seed(options)
+            # First request of the process: imports, URL resolver, hasher setup.
+            self._login(Client(), 'warmup@linkcontact.local', PASSWORD, '10.0.0.1')
+            phases = [
+                ('sans attaque', True, 0),
+                ('attaque, sans limitation', False, options['attackers']),
+                (f"attaque, limitation {options['backend']}", True, options['attackers']),
+            ]
+            results = []
+            for label, enabled, attackers in phases:
+                with override_settings(LOGIN_THROTTLE_ENABLED=enabled):
+                    throttling.get_store().clear()
+                    results.append((label, *self._run(attackers, options)))
+
+        self.stdout.write(
+            f"{options['logins']} connexions légitimes par phase ; attaque : {options['attack_rate']:.0f} tentatives/s, "
+            f"{options['attackers']} threads, {options['attacker_ips']} IP"
+        )
+        self.stdout.write(
+            f"{'phase':<30}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'échecs':>8}"
+            f"{'attaque/s':>11}{'refusées':>10}{'hachées/s':>11}"
+        )
+        for label, latencies, failures, elapsed, attempts, refused in results:
+            latencies.sort()
+            self.stdout.write(
+                f'{label:<30}'
+                f'{_percentile(latencies, 0.50) * 1000:>9.0f}'
+                f'{_percentile(latencies, 0.95) * 1000:>9.0f}'
+                f'{_percentile(latencies, 0.99) * 1000:>9.0f}'
+                f'{failures:>8}'
+                f'{attempts / elapsed:>11.1f}'
+                f'{(refused / attempts if attempts else 0):>10.0%}'
+                f'{(attempts - refused) / elapsed:>11.1f}'
+            )
+
+    def _seed(self, options):
+        from django.contrib.auth.hashers import make_password
+        from apps.accounts.models import User
+
+        # One hash for every account: seeding stays fast, each login still runs the hasher.
+        password = make_password(PASSWORD)
+        users = [('warmup', 'warmup@linkcontact.local')]
+        users += [(f'legit{i}', f'legit{i}@linkcontact.local') for i in range(3 * options['logins'])]
+        users += [(f'victim{i}', f'victim{i}@linkcontact.local') for i in range(options['accounts'])]
+        User.objects.bulk_create([
+            User(username=username, email=email, password=password) for username, email in users
+        ])
+        self._next_legit = 0
+
+    def _login(self, client, email, password, ip):
+        return client.post(PATH, {'email': email, 'password': password}, content_type='application/json', REMOTE_ADDR=ip)
+
+    def _run(self, attackers, options):
+        """(legit latencies, legit failures, elapsed, attack attempts, attempts refused with 429)."""
+        stop = threading.Event()
+        measuring = threading.Event()
+        counts = []
+        lock = threading.Lock()
+        sent = [0]
+        interval = attackers / options['attack_rate'] if attackers else 0
+        warmup = options['attacker_ips'] * settings.LOGIN_THROTTLE_IP_BURST if attackers else 0
+
+        def attacker(number):
+            client = Client(raise_request_exception=False)
+            rng = random.Random(number)
+            ip = f'203.0.113.{number % options["attacker_ips"] + 1}'
+            attempts = refused = 0
+            next_at = time.perf_counter()
+            while not stop.is_set():
+                # Fixed pace, like an external flood: late attempts are not made up for.
+                next_at = max(next_at + interval, time.perf_counter())
+                stop.wait(max(0.0, next_at - time.perf_counter()))
+                target = rng.randrange(2 * options['accounts'])
+                # Half the guesses name an existing account, half an unknown one.
+                email = f'victim{target}@linkcontact.local' if target < options['accounts'] else f'ghost{target}@example.com'
+                counted = measuring.is_set()
+                response = self._login(client, email, 'wrong-password', ip)
+                attempts += counted
+                refused += counted and response.status_code == 429
+                with lock:
+                    sent[0] += 1
+            connections.close_all()
+            with lock:
+                counts.append((attempts, refused))
+
+        threads = [threading.Thread(target=attacker, args=(number,)) for number in range(attackers)]
+        for thread in threads:
+            thread.start()
+        while sent[0] < warmup:
+            time.sleep(0.05)
+        measuring.set()
+        started = time.perf_counter()
+        client = Client(raise_request_exception=False)
+        latencies, failures = [], 0
+        for _ in range(options['logins']):
+            number = self._next_legit
+            self._next_legit += 1
+            begin = time.perf_counter()
+            response = self._login(
+                client, f'legit{number}@linkcontact.local', PASSWORD, f'10.1.{number // 250}.{number % 250 + 1}',
+            )
+            latencies.append(time.perf_counter() - begin)
+            failures += response.status_code != 200
+        elapsed = time.perf_counter() - started
+        measuring.clear()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return (
+            latencies, failures, elapsed,
+            sum(attempts for attempts, _ in counts), sum(refused for _, refused in counts),
+        )
@@ -0,0 +1,20 @@
+"""
+Delete the login throttle buckets that have refilled.
+
+    python manage.py prune_login_throttle
+
+Only useful with LOGIN_THROTTLE_BACKEND = 'database': a full bucket is the
+same as no row, so the table only keeps the IPs and accounts still being
+limited. Safe to run at any time (e.g. from a cron job every hour).
+"""
+from django.core.management.base import BaseCommand
+
+from apps.accounts.throttling import DatabaseBucketStore
+
+
+class Command(BaseCommand):
+    help = 'Supprime les seaux de limitation des connexions redevenus pleins.'
+
+    def handle(self, *args, **options):
+        deleted = DatabaseBucketStore().prune()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} seau(x) supprimé(s).'))
@@ -0,0 +1,65 @@
+from django.db import migrations
+from django.db.models import Q
+from django.utils.text import slugify
+
+
+def _free_slug(user, taken):
+    """The user's slug (else one from the shop name) if no shop uses it, else the first free `-n` suffix."""
+    base = (user.slug or slugify(user.shop_name or user.username) or 'boutique')[:50].strip('-') or 'boutique'
+    slug, n = base, 0
+    while slug in taken:
+        n += 1
+        suffix = f'-{n}'
+        slug = base[:50 - len(suffix)] + suffix
+    taken.add(slug)
+    return slug
+
+
+def copy_shop_fields_to_shops(apps, schema_editor):
+    """
+    Shop becomes the only owner of name / slug / WhatsApp. Its values win;
+    empty ones are filled from the user (an empty slug gets the user's slug
+    when no shop uses it, else a suffixed one). Users without a shop get
+    one, with a slug allocated the same way.
+    """
+    User = apps.get_model('accounts', 'User')
+    Shop = apps.get_model('shops', 'Shop')
+
+    taken = set(Shop.objects.values_list('slug', flat=True))
+    for user in list(User.objects.filter(shop__isnull=True)):
+        slug = _free_slug(user, taken)
+        Shop.objects.create(
+            user=user, name=user.shop_name or user.username, slug=slug, whatsapp_number=user.whatsapp_number,
+        )
+
+    shops = []
+    for shop in Shop.objects.select_related('user').filter(Q(name='') | Q(slug='') | Q(whatsapp_number='')).iterator():
+        shop.name = shop.name or shop.user.shop_name or shop.user.username
+        shop.slug = shop.slug or _free_slug(shop.user, taken)
+        shop.whatsapp_number = shop.whatsapp_number or shop.user.whatsapp_number
+        shops.append(shop)
+    Shop.objects.bulk_update(shops, ['name', 'slug', 'whatsapp_number'], batch_size=500)
+
+
+def copy_shop_fields_to_users(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Shop = apps.get_model('shops', 'Shop')
+
+    users = []
+    for shop in Shop.objects.select_related('user').iterator():
+        user = shop.user
+        user.shop_name, user.slug, user.whatsapp_number = shop.name, shop.slug or None, shop.whatsapp_number
+        users.append(user)
+    User.objects.bulk_update(users, ['shop_name', 'slug', 'whatsapp_number'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_login_throttle_bucket'),
+        ('shops', '0003_shop_logo_urls'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_shop_fields_to_shops, copy_shop_fields_to_users),
+    ]
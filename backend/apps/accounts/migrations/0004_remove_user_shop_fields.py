@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_move_shop_fields_to_shop'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='shop_name',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='slug',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='whatsapp_number',
+        ),
+    ]
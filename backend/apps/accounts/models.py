@@ -5,8 +5,8 @@ V1 Production Ready
 """
 
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
-from django.utils.text import slugify
 
 
 class User(AbstractUser):
@@ -14,33 +14,74 @@ class User(AbstractUser):
     Custom User model:
     - Email comme identifiant principal
     - Chaque utilisateur peut avoir une Shop (OneToOne)
+
+    Le nom, le slug et le WhatsApp de la boutique sont stockés sur Shop
+    uniquement. `shop_name`, `slug` et `whatsapp_number` restent lisibles
+    ici (valeurs de la boutique) ; affectés sur l'utilisateur, ils sont
+    écrits sur la boutique à la sauvegarde (apps.accounts.signals).
     """
 
     email = models.EmailField(unique=True)
-    shop_name = models.CharField(max_length=255, blank=True)
-    slug = models.SlugField(unique=True, blank=True, null=True)
-    whatsapp_number = models.CharField(max_length=20, blank=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
-    def save(self, *args, **kwargs):
-        """
-        Auto-generate slug if not provided.
-        """
-        if not self.slug and self.shop_name:
-            base_slug = slugify(self.shop_name)
-            slug = base_slug
-            counter = 1
+    def _shop_value(self, field, default):
+        pending = self.__dict__.get('_shop_fields', {})
+        if field in pending:
+            return pending[field]
+        try:
+            return getattr(self.shop, field)
+        except ObjectDoesNotExist:
+            return default
+
+    def _set_shop_value(self, field, value):
+        self.__dict__.setdefault('_shop_fields', {})[field] = value
+
+    def pop_shop_fields(self):
+        """Shop fields assigned on the user since the last save ({'name': ..., 'slug': ...})."""
+        return self.__dict__.pop('_shop_fields', {})
+
+    @property
+    def shop_name(self):
+        return self._shop_value('name', '')
 
-            # Ensure unique slug
-            while User.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
+    @shop_name.setter
+    def shop_name(self, value):
+        self._set_shop_value('name', value)
 
-            self.slug = slug
+    @property
+    def slug(self):
+        return self._shop_value('slug', None)
 
-        super().save(*args, **kwargs)
+    @slug.setter
+    def slug(self, value):
+        self._set_shop_value('slug', value)
+
+    @property
+    def whatsapp_number(self):
+        return self._shop_value('whatsapp_number', '')
+
+    @whatsapp_number.setter
+    def whatsapp_number(self, value):
+        self._set_shop_value('whatsapp_number', value)
 
     def __str__(self):
         return self.email
+
+
+class LoginThrottleBucket(models.Model):
+    """
+    Token bucket of the 'database' login throttle backend
+    (apps.accounts.throttling), one row per client IP or attempted account.
+    """
+
+    # sha256 of scope + IP / account: attempted usernames are not stored in clear
+    key = models.CharField(max_length=64, primary_key=True)
+    tokens = models.FloatField()
+    # Epoch seconds (time.time()) of the last refill, and when the bucket is full again
+    refilled_at = models.FloatField()
+    full_at = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return self.key
@@ -1,22 +1,14 @@
 """
 Serializers for accounts app.
 """
+from django.db import IntegrityError
+from django.db.models import F, Q, Value
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import authenticate
 from .models import User
 
 
-def slugify_shop_name(name):
-    """Generate slug from shop name."""
-    import re
-    from unicodedata import normalize
-    s = normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
-    s = re.sub(r'[^\w\s-]', '', s).strip().lower()
-    s = re.sub(r'[-\s]+', '-', s)
-    return s[:50] if s else 'shop'
-
-
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Accept email instead of username for login (frontend compatibility)."""
 
@@ -40,8 +32,16 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 
 class RegisterSerializer(serializers.ModelSerializer):
-    """Register new user and create Shop. Accepts both spec and frontend formats."""
+    """
+    Register new user and create Shop. Accepts both spec and frontend formats.
+    Email / username / slug conflicts are checked together in validate(),
+    with one query, instead of one exists() per field.
+    """
     password = serializers.CharField(write_only=True, min_length=8)
+    # Champs de la boutique (Shop), créée par le signal post_save du User.
+    shop_name = serializers.CharField(max_length=255, allow_blank=True)
+    slug = serializers.SlugField(max_length=50, required=False, allow_blank=True, allow_null=True)
+    whatsapp_number = serializers.CharField(max_length=20, required=False, allow_blank=True)
 
     class Meta:
         model = User
@@ -51,39 +51,49 @@ class RegisterSerializer(serializers.ModelSerializer):
             'shop_name', 'slug', 'whatsapp_number'
         ]
         extra_kwargs = {
-            'username': {'required': False},
-            'email': {'required': True},
-            'slug': {'required': False},
-            'whatsapp_number': {'required': False},
-            'shop_name': {'required': True},
+            'username': {'required': False, 'validators': []},
+            'email': {'required': True, 'validators': []},
         }
 
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError('Un compte existe déjà avec cet email.')
-        return value
+    def validate(self, attrs):
+        from apps.shops.models import Shop
 
-    def validate_slug(self, value):
-        if value and User.objects.filter(slug=value).exists():
-            raise serializers.ValidationError('Ce slug est déjà utilisé.')
-        return value
+        email = attrs['email']
+        username = attrs.get('username') or email
+        slug = attrs.get('slug')
+        taken = (
+            User.objects.filter(Q(email=email) | Q(username=username)).order_by()
+            .annotate(shop_slug=Value('')).values_list('email', 'username', 'shop_slug')
+        )
+        if slug:
+            taken = taken.union(
+                Shop.objects.filter(slug=slug).order_by().annotate(
+                    email=Value(''), username=Value(''), shop_slug=F('slug'),
+                ).values_list('email', 'username', 'shop_slug')
+            )
+        errors = {}
+        for taken_email, taken_username, taken_slug in taken:
+            if {email, username} & {taken_email, taken_username}:
+                errors['email'] = ['Un compte existe déjà avec cet email.']
+            if slug and taken_slug == slug:
+                errors['slug'] = ['Ce slug est déjà utilisé.']
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
 
     def create(self, validated_data):
+        """
+        Create the user; its post_save signal creates the shop with the
+        name, slug and WhatsApp number (a free slug is allocated from the
+        name when none is given).
+        """
         password = validated_data.pop('password')
-        email = validated_data.get('email')
-        username = validated_data.get('username') or email
-        shop_name = validated_data.get('shop_name', '')
-        slug = validated_data.get('slug') or slugify_shop_name(shop_name)
-        # Ensure slug uniqueness
-        base_slug = slug
-        counter = 1
-        while User.objects.filter(slug=slug).exists():
-            slug = f'{base_slug}-{counter}'
-            counter += 1
-        validated_data['username'] = username
-        validated_data['slug'] = slug
-        user = User.objects.create_user(password=password, **validated_data)
-        return user
+        validated_data['username'] = validated_data.get('username') or validated_data['email']
+        try:
+            return User.objects.create_user(password=password, **validated_data)
+        except IntegrityError:
+            # Inscription concurrente avec le même email ou le même slug.
+            raise serializers.ValidationError({'email': ['Un compte existe déjà avec cet email ou ce slug.']})
 
 
 class UserMeSerializer(serializers.ModelSerializer):
@@ -1,9 +1,42 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from apps.accounts.authentication import forget_user
 from apps.accounts.models import User
 from apps.shops.models import Shop
 
 @receiver(post_save, sender=User)
-def create_user_shop(sender, instance, created, **kwargs):
+def save_user_shop(sender, instance, created, **kwargs):
+    # Nom, slug et WhatsApp n'existent que sur la boutique : ceux affectés à
+    # l'utilisateur y sont écrits. À la création, boutique complète en un INSERT.
+    fields = instance.pop_shop_fields()
     if created:
-        Shop.objects.create(user=instance)
+        Shop.objects.create(
+            user=instance,
+            name=fields.get('name') or instance.username,
+            slug=fields.get('slug') or '',
+            whatsapp_number=fields.get('whatsapp_number') or '',
+        )
+    elif fields:
+        try:
+            shop = instance.shop
+        except Shop.DoesNotExist:
+            shop = Shop(user=instance)
+        for name, value in fields.items():
+            setattr(shop, name, value or '')
+        shop.name = shop.name or instance.username
+        shop.save()
+
+
+# L'utilisateur authentifié (et sa boutique) est mis en cache par jeton JWT :
+# toute écriture sur l'un ou l'autre invalide ses entrées.
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=Shop)
+@receiver(post_delete, sender=Shop)
+def forget_cached_shop_owner(sender, instance, **kwargs):
+    forget_user(instance.user_id)
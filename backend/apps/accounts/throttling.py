@@ -0,0 +1,187 @@
+"""
+Login throttling: token buckets per client IP and per account.
+
+Every POST /api/auth/login/ runs a full password hash (PBKDF2), valid
+account or not, so a flood of bad logins can keep a worker's CPU busy.
+LoginThrottle (a DRF throttle) runs in the view's initial(), before the
+serializer calls authenticate(): an attempt takes one token from the
+bucket of its IP, then from the bucket of the account it names from that
+IP, and is answered 429 without hashing when either bucket is empty. The
+account bucket is per (account, IP) so that failed attempts from one
+address cannot lock the owner out from another. A bucket holds up to
+LOGIN_THROTTLE_*_BURST tokens and refills at LOGIN_THROTTLE_*_PER_MINUTE
+tokens per minute.
+
+Bucket state lives in a store selected with settings.LOGIN_THROTTLE_BACKEND:
+- 'memory'   : in the worker process (no query; each worker has its own buckets).
+- 'database' : in the LoginThrottleBucket table, shared by all workers
+               (a row lock per bucket; `manage.py prune_login_throttle`
+               deletes the buckets that have refilled).
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from rest_framework.throttling import BaseThrottle
+
+from apps.core.lru import TTLCache
+
+BACKEND_MEMORY = 'memory'
+BACKEND_DATABASE = 'database'
+
+SCOPE_IP = 'ip'
+SCOPE_ACCOUNT = 'account'
+
+
+def _refill(tokens, refilled_at, now, capacity, rate):
+    return min(capacity, tokens + max(0.0, now - refilled_at) * rate)
+
+
+def _take(tokens, capacity, rate):
+    """(tokens left, wait in seconds) after one attempt on a bucket holding `tokens`."""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    """Buckets of this worker process, bounded in number."""
+
+    backend = BACKEND_MEMORY
+
+    def __init__(self, maxsize=100000, ttl=3600.0):
+        # A bucket unused for `ttl` seconds is full again: dropping it changes nothing.
+        self._buckets = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, refilled_at = self._buckets.get(key, (capacity, now))
+            tokens, wait = _take(_refill(tokens, refilled_at, now, capacity, rate), capacity, rate)
+            self._buckets.set(key, (tokens, now))
+        return wait
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class DatabaseBucketStore:
+    """Buckets in the LoginThrottleBucket table, shared by every worker."""
+
+    backend = BACKEND_DATABASE
+
+    def take(self, key, capacity, rate, now=None):
+        from .models import LoginThrottleBucket
+
+        now = time.time() if now is None else now
+        with transaction.atomic():
+            bucket = LoginThrottleBucket.objects.select_for_update().filter(key=key).first()
+            if bucket is None:
+                tokens, wait = _take(capacity, capacity, rate)
+                try:
+                    with transaction.atomic():
+                        LoginThrottleBucket.objects.create(
+                            key=key, tokens=tokens, refilled_at=now, full_at=now + (capacity - tokens) / rate,
+                        )
+                    return wait
+                except IntegrityError:
+                    # Created meanwhile by a concurrent attempt: lock it and count again.
+                    bucket = LoginThrottleBucket.objects.select_for_update().get(key=key)
+            tokens, wait = _take(_refill(bucket.tokens, bucket.refilled_at, now, capacity, rate), capacity, rate)
+            LoginThrottleBucket.objects.filter(key=key).update(
+                tokens=tokens, refilled_at=now, full_at=now + (capacity - tokens) / rate,
+            )
+        return wait
+
+    def prune(self, now=None):
+        """Delete the buckets that are full again (same as no row); returns the count."""
+        from .models import LoginThrottleBucket
+
+        now = time.time() if now is None else now
+        return LoginThrottleBucket.objects.filter(full_at__lte=now).delete()[0]
+
+    def clear(self):
+        from .models import LoginThrottleBucket
+
+        LoginThrottleBucket.objects.all().delete()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_backend():
+    backend = getattr(settings, 'LOGIN_THROTTLE_BACKEND', BACKEND_MEMORY)
+    if backend not in (BACKEND_MEMORY, BACKEND_DATABASE):
+        raise ImproperlyConfigured(
+            f"LOGIN_THROTTLE_BACKEND doit être '{BACKEND_MEMORY}' ou '{BACKEND_DATABASE}' (reçu: {backend!r})."
+        )
+    return backend
+
+
+def _limits(scope):
+    """(burst, tokens per second) of the buckets of `scope`."""
+    prefix = f'LOGIN_THROTTLE_{scope.upper()}'
+    defaults = {SCOPE_IP: (20, 10.0), SCOPE_ACCOUNT: (5, 1.0)}[scope]
+    burst = getattr(settings, f'{prefix}_BURST', defaults[0])
+    per_minute = getattr(settings, f'{prefix}_PER_MINUTE', defaults[1])
+    return burst, per_minute / 60.0
+
+
+def get_store():
+    """Process-wide bucket store for the configured backend, created on first use."""
+    global _store
+    backend = get_backend()
+    store = _store
+    if store is None or store.backend != backend:
+        with _store_lock:
+            if _store is None or _store.backend != backend:
+                if backend == BACKEND_MEMORY:
+                    refill_time = max(burst / rate for burst, rate in map(_limits, (SCOPE_IP, SCOPE_ACCOUNT)))
+                    _store = MemoryBucketStore(
+                        maxsize=getattr(settings, 'LOGIN_THROTTLE_CACHE_SIZE', 100000), ttl=refill_time,
+                    )
+                else:
+                    _store = DatabaseBucketStore()
+            store = _store
+    return store
+
+
+def bucket_key(scope, value):
+    """Fixed-length key; attempted usernames are not stored in clear."""
+    return hashlib.sha256(f'{scope}:{value}'.encode()).hexdigest()
+
+
+def check_login_attempt(ip, account):
+    """
+    Take one token from the bucket of `ip`, then from the bucket of
+    `account` (if any) at `ip`. Seconds to wait before retrying, 0 when allowed.
+    """
+    store = get_store()
+    for scope, value in ((SCOPE_IP, ip), (SCOPE_ACCOUNT, account and f'{account}|{ip}')):
+        if not value:
+            continue
+        burst, rate = _limits(scope)
+        wait = store.take(bucket_key(scope, value), burst, rate)
+        if wait:
+            return wait
+    return 0.0
+
+
+class LoginThrottle(BaseThrottle):
+    """Token buckets per IP and per account, checked before any password hashing."""
+
+    def allow_request(self, request, view):
+        if not getattr(settings, 'LOGIN_THROTTLE_ENABLED', True):
+            return True
+        data = request.data if hasattr(request.data, 'get') else {}
+        account = str(data.get('email') or data.get('username') or '').strip().lower()
+        self._wait = check_login_attempt(self.get_ident(request), account)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
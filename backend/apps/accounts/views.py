@@ -1,8 +1,10 @@
 """
 Views for accounts app - JWT Auth.
 """
+from django.db import transaction
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import Throttled
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -10,26 +12,23 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from .models import User
 from .serializers import RegisterSerializer, UserMeSerializer, CustomTokenObtainPairSerializer
+from .throttling import LoginThrottle
 
 
 class RegisterView(APIView):
-    """POST /api/auth/register/ - Create user and Shop."""
+    """
+    POST /api/auth/register/ - Create user and Shop, in one transaction:
+    one conflict check, the slug allocation (without an explicit slug), one
+    INSERT per table. The query count is checked by apps.core.tests.test_query_budgets.
+    """
     permission_classes = [AllowAny]
 
     def post(self, request):
         ser = RegisterSerializer(data=request.data)
         if not ser.is_valid():
             return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
-        user = ser.save()
-        from apps.shops.models import Shop
-        Shop.objects.get_or_create(
-            user=user,
-            defaults={
-                'name': user.shop_name,
-                'slug': user.slug,
-                'whatsapp_number': user.whatsapp_number
-            }
-        )
+        with transaction.atomic():
+            user = ser.save()
         from rest_framework_simplejwt.tokens import RefreshToken
         refresh = RefreshToken.for_user(user)
         return Response({
@@ -39,10 +38,23 @@ class RegisterView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class LoginThrottled(Throttled):
+    default_detail = 'Trop de tentatives de connexion.'
+    extra_detail_singular = 'Réessayez dans {wait} seconde.'
+    extra_detail_plural = 'Réessayez dans {wait} secondes.'
+
+
 class LoginView(TokenObtainPairView):
-    """POST /api/auth/login/ - Accept email or username."""
+    """
+    POST /api/auth/login/ - Accept email or username. Attempts are throttled
+    per IP and per account before the password is hashed (429 beyond).
+    """
     permission_classes = [AllowAny]
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginThrottle]
+
+    def throttled(self, request, wait):
+        raise LoginThrottled(wait)
 
     def post(self, request, *args, **kwargs):
         data = request.data.copy()
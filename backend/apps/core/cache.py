@@ -0,0 +1,108 @@
+"""
+Versioned response cache for public read endpoints.
+
+Each cached response is stored under a key that embeds the current
+version of every scope it depends on ('shop:12', 'catalog', ...). Writes
+bump the versions (see the shops/products signals), so stale entries are
+never read again and simply age out: no TTL guessing, no key deletion.
+Hits return the JSON bytes rendered on the first miss.
+
+Versions start from a time-based value rather than 1, so a version key
+evicted from the cache cannot come back to a number already used by
+cached responses.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+VERSION_PREFIX = 'lc:v:'
+RESPONSE_PREFIX = 'lc:r:'
+
+CATALOG_SCOPE = 'catalog'
+POPULARITY_SCOPE = 'popularity'
+
+# Response headers kept with the cached body (pagination).
+KEPT_HEADERS = ('Link', 'X-Next-Cursor')
+
+
+def _fresh_version():
+    return time.time_ns()
+
+
+def get_versions(scopes):
+    """Current version of each scope, initialising the missing ones."""
+    keys = [VERSION_PREFIX + scope for scope in scopes]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            version = _fresh_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def _bump(scopes):
+    for scope in scopes:
+        key = VERSION_PREFIX + scope
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), timeout=None)
+
+
+def bump_versions(*scopes):
+    """Invalidate every response cached for `scopes`, once the current transaction commits."""
+    scopes = [scope for scope in scopes if scope]
+    if scopes:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def shop_scope(shop_id):
+    return f'shop:{shop_id}'
+
+
+def cached_response(view, request, scopes, build):
+    """
+    Serve `request` from the cache when possible. `build()` returns the DRF
+    Response to cache on a miss; only JSON 200 responses are stored.
+    """
+    if (
+        not getattr(settings, 'RESPONSE_CACHE_ENABLED', False)
+        or request.method != 'GET'
+        or getattr(request.accepted_renderer, 'format', None) != 'json'
+    ):
+        return build()
+
+    versions = get_versions(scopes)
+    raw = '|'.join(f'{scope}={version}' for scope, version in zip(scopes, versions))
+    # Absolute URI: the Link header depends on the scheme and host.
+    raw += '|' + request.build_absolute_uri()
+    key = RESPONSE_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+    entry = cache.get(key)
+    if entry is not None:
+        content, headers = entry
+        response = HttpResponse(content, content_type='application/json')
+        for name, value in headers:
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return response
+
+    response = build()
+    if response.status_code == 200:
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = 'application/json'
+        response.renderer_context = view.get_renderer_context()
+        response.render()
+        headers = [(name, response[name]) for name in KEPT_HEADERS if name in response]
+        cache.set(key, (response.content, headers), getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 86400))
+        response['X-Cache'] = 'MISS'
+    return response
@@ -0,0 +1,27 @@
+"""
+Small ORM helpers shared by the apps.
+"""
+
+
+def update_fields_except(instance, *excluded):
+    """
+    Field names for `instance.save(update_fields=...)` covering every
+    concrete column but the primary key and `excluded`. Used to keep
+    full saves from overwriting columns maintained by UPDATE ... SET x = x + n.
+    """
+    return [
+        field.name
+        for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in excluded
+    ]
+
+
+def keep_counter_columns(instance, args, kwargs, *columns):
+    """
+    For a full save() of an existing row (`args` / `kwargs` of save()),
+    restrict update_fields to every column but `columns`. Used for the
+    views_count counters, which apps.stats.counters increments in the
+    database: the value loaded with the instance may already be stale.
+    """
+    if not instance._state.adding and not args and kwargs.get('update_fields') is None:
+        kwargs['update_fields'] = update_fields_except(instance, *columns)
@@ -0,0 +1,94 @@
+"""
+Sparse fieldsets for list endpoints.
+
+`?fields=name,price` keeps only those serializer fields; a serializer may
+also name projections (`Meta.projections = {'card': [...]}`) usable in the
+same parameter, alone or with extra fields (`?fields=card,description`).
+`project_queryset()` then loads only the columns the kept fields read
+(`.only()`), joining a related table only when one of them needs it, so
+unrequested columns are neither fetched nor serialized.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+
+
+class SparseFieldsetMixin:
+    """Serializer taking `fields=[...]`: the other fields are dropped."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+
+
+def requested_fields(request, serializer_class):
+    """Field names selected by ?fields= (projections expanded), or None."""
+    raw = request.query_params.get(FIELDS_PARAM)
+    if not raw:
+        return None
+    available = list(serializer_class().fields)
+    projections = getattr(serializer_class.Meta, 'projections', {})
+    selected, unknown = [], []
+    for name in filter(None, (part.strip() for part in raw.split(','))):
+        if name in projections:
+            names = projections[name]
+        elif name in available:
+            names = [name]
+        else:
+            unknown.append(name)
+            continue
+        selected.extend(field for field in names if field not in selected)
+    if unknown:
+        raise ValidationError({
+            FIELDS_PARAM: f"Champs inconnus : {', '.join(unknown)}. "
+                          f"Valeurs possibles : {', '.join([*projections, *available])}."
+        })
+    return selected or None
+
+
+def _column(model, attrs):
+    """
+    ('shop__name', 'shop') for the source ['shop', 'name'], (path, None) for
+    a column of `model` itself; None when the source is not a plain column
+    (method, property, reverse relation).
+    """
+    related = []
+    for index, attr in enumerate(attrs):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if index == len(attrs) - 1:
+            break
+        if not (field.many_to_one or field.one_to_one) or field.auto_created:
+            return None
+        related.append(attr)
+        model = field.related_model
+    return '__'.join(attrs), '__'.join(related) or None
+
+
+def project_queryset(queryset, serializer, extra=()):
+    """
+    `queryset` restricted to the columns read by `serializer`'s fields, plus
+    `extra` model fields (e.g. the pagination keys). Left whole when a field
+    reads something other than a column.
+    """
+    model = queryset.model
+    columns, related = [], set()
+    for field in serializer.fields.values():
+        column = _column(model, field.source_attrs) if field.source != '*' else None
+        if column is None:
+            return queryset
+        columns.append(column[0])
+        if column[1]:
+            related.add(column[1])
+    for name in extra:
+        if _column(model, name.split('__')) is not None:
+            columns.append(name)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
@@ -0,0 +1,80 @@
+"""
+Background flushing of in-process write buffers.
+"""
+import atexit
+import logging
+import threading
+
+from django.db import close_old_connections, connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlusher:
+    """
+    Base class for thread-safe in-process buffers written to the database by
+    a daemon thread every `flush_interval` seconds, on demand (`wake()`), and
+    one last time when the worker exits.
+
+    Subclasses implement `_take()`, which swaps out and returns the pending
+    batch (called with `self._lock` held), and `_write(batch)`.
+    """
+
+    name = 'flusher'
+
+    def __init__(self, flush_interval=2.0):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _take(self):
+        raise NotImplementedError
+
+    def _write(self, batch):
+        raise NotImplementedError
+
+    def _batch_size(self, batch):
+        return len(batch)
+
+    def ensure_started(self):
+        """Start the flusher thread; call with `self._lock` held."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def flush(self):
+        """Write everything pending. Returns the number of items written."""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._take()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception('%s: flush failed, %d items lost', self.name, self._batch_size(batch))
+                return 0
+            return self._batch_size(batch)
+
+    def stop(self):
+        """Stop the flusher thread and write what is left (worker shutdown)."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+        connections.close_all()
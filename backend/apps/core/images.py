@@ -0,0 +1,122 @@
+"""
+Delivery URLs of uploaded images, computed once per upload.
+
+Models store, next to an ImageField `<field>`, the columns
+`<prefix>_url`, `<prefix>_thumb_url`, `<prefix>_medium_url` and
+`<prefix>_srcset` (see Product.image, Shop.logo). They are filled by
+`refresh_image_urls()` from save() when the file changes, so serializers
+read plain strings and never go through the storage backend.
+
+With Cloudinary the variants are on-the-fly transformations (width
+limit, automatic format and quality); with any other storage every
+variant is the original file and the srcset is empty.
+"""
+from django.conf import settings
+from rest_framework import serializers
+
+# Largest width (px) of each variant; the srcset lists all of them.
+THUMB_WIDTH = getattr(settings, 'IMAGE_THUMB_WIDTH', 320)
+MEDIUM_WIDTH = getattr(settings, 'IMAGE_MEDIUM_WIDTH', 800)
+SRCSET_WIDTHS = (THUMB_WIDTH, MEDIUM_WIDTH, 2 * MEDIUM_WIDTH)
+
+URL_MAX_LENGTH = 500
+
+
+def _is_cloudinary(storage):
+    try:
+        from cloudinary_storage.storage import MediaCloudinaryStorage
+    except ImportError:
+        return False
+    return isinstance(storage, MediaCloudinaryStorage)
+
+
+def _cloudinary_variant(storage, name, width):
+    import cloudinary
+    resource = cloudinary.CloudinaryResource(
+        storage._prepend_prefix(name), default_resource_type=storage._get_resource_type(name),
+    )
+    return resource.build_url(width=width, crop='limit', quality='auto', fetch_format='auto')
+
+
+def image_urls(field_file):
+    """{'url', 'thumb_url', 'medium_url', 'srcset'} for a stored file ('' when empty)."""
+    if not field_file:
+        return {'url': '', 'thumb_url': '', 'medium_url': '', 'srcset': ''}
+    storage, name = field_file.storage, field_file.name
+    url = storage.url(name)
+    if not _is_cloudinary(storage):
+        return {'url': url, 'thumb_url': url, 'medium_url': url, 'srcset': ''}
+    variants = {width: _cloudinary_variant(storage, name, width) for width in SRCSET_WIDTHS}
+    return {
+        'url': url,
+        'thumb_url': variants[THUMB_WIDTH],
+        'medium_url': variants[MEDIUM_WIDTH],
+        'srcset': ', '.join(f'{variant} {width}w' for width, variant in variants.items()),
+    }
+
+
+def url_columns(prefix):
+    return [f'{prefix}_url', f'{prefix}_thumb_url', f'{prefix}_medium_url', f'{prefix}_srcset']
+
+
+def refresh_image_urls(instance, field, prefix, force=False):
+    """
+    Store the delivery URLs of `instance.<field>` in the `<prefix>_*`
+    columns if the file changed since it was loaded (or `force`). A pending
+    upload is sent to the storage first, as FileField.pre_save would do,
+    so its final name is known. Returns True when the columns changed.
+    """
+    field_file = getattr(instance, field)
+    if field_file and not field_file._committed:
+        field_file.save(field_file.name, field_file.file, save=False)
+    name = field_file.name or ''
+    if not force and name == getattr(instance, f'_loaded_{field}', None):
+        return False
+    urls = image_urls(field_file)
+    changed = False
+    for column, key in zip(url_columns(prefix), ('url', 'thumb_url', 'medium_url', 'srcset')):
+        if getattr(instance, column) != urls[key]:
+            setattr(instance, column, urls[key])
+            changed = True
+    setattr(instance, f'_loaded_{field}', name)
+    return changed
+
+
+def absolute_url(request, url):
+    """`url` as stored, made absolute for local storages ('/media/...')."""
+    if url and url.startswith('/') and request is not None:
+        return request.build_absolute_uri(url)
+    return url or None
+
+
+class StoredURLField(serializers.ReadOnlyField):
+    """Serializer field for a URL column filled by refresh_image_urls()."""
+
+    def to_representation(self, value):
+        return absolute_url(self.context.get('request'), value)
+
+
+def backfill_image_urls(queryset, field, prefix, batch_size=500):
+    """
+    Recompute the URL columns of every row of `queryset` (e.g. after a
+    storage or width change). Usable from migrations with historical
+    models. Returns the ids of the rows updated.
+    """
+    columns = url_columns(prefix)
+    changed = []
+    updated = []
+    rows = queryset.order_by('pk').only('pk', field, *columns)
+    for instance in rows.iterator(chunk_size=batch_size):
+        urls = image_urls(getattr(instance, field))
+        values = [urls['url'], urls['thumb_url'], urls['medium_url'], urls['srcset']]
+        if [getattr(instance, column) for column in columns] != values:
+            for column, value in zip(columns, values):
+                setattr(instance, column, value)
+            changed.append(instance)
+        if len(changed) >= batch_size:
+            queryset.model.objects.bulk_update(changed, columns)
+            updated.extend(instance.pk for instance in changed)
+            changed = []
+    queryset.model.objects.bulk_update(changed, columns)
+    updated.extend(instance.pk for instance in changed)
+    return updated
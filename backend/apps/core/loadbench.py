@@ -0,0 +1,266 @@
+"""
+HTTP load benchmark: weighted visitor and seller scenarios replayed by
+concurrent workers (`manage.py bench_http`).
+
+A scenario is what one page of the frontend asks the API for:
+- visit       : the stats beacon of a shop page (views, some WhatsApp clicks);
+- marketplace : the product cards, the next page through the cursor,
+                and one search out of two;
+- shop        : a public shop page (the shop, then its products);
+- dashboard   : the seller dashboard (stats, shop, products), with a JWT.
+
+Each worker picks scenarios at random following the weights until the
+deadline and times every request. Requests go either through the Django
+test Client in this process, or over HTTP to a running server; the query
+count of a response is read from its X-Query-Count header
+(apps.core.middleware.QueryCountMiddleware).
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from django.db import connections
+
+from .middleware import QUERY_COUNT_HEADER
+
+DEFAULT_WEIGHTS = {'visit': 50, 'marketplace': 25, 'shop': 15, 'dashboard': 10}
+
+OWNER_EMAIL = 'bench-owner@linkcontact.local'
+OWNER_PASSWORD = 'bench-password'
+SHOP_PREFIX = 'bench-shop'
+SHOP_SLUG = SHOP_PREFIX + '-{}'
+
+# Product names are built from these words, so that searches match.
+NOUNS = ('robe', 'chemise', 'sac', 'chaussures', 'montre', 'pagne', 'savon', 'parfum', 'bracelet', 'casquette')
+ADJECTIVES = ('rouge', 'noir', 'bleu', 'wax', 'cuir', 'coton', 'artisanal', 'classique')
+
+
+class BenchContext:
+    """What the scenarios need to know about the seeded dataset."""
+
+    def __init__(self, shops, token=None):
+        self.slugs = [SHOP_SLUG.format(i) for i in range(shops)]
+        self.token = token
+
+
+def visit(send, context, rng):
+    action = 'whatsapp_click' if rng.random() < 0.2 else 'view'
+    send('visit beacon', 'post', '/api/stats/visit/', {'shop_slug': rng.choice(context.slugs), 'action': action})
+
+
+def marketplace(send, context, rng):
+    headers = send('public products card', 'get', '/api/public/products/?fields=card')
+    cursor = headers.get('X-Next-Cursor')
+    if cursor:
+        send('public products next', 'get', '/api/public/products/?' + urlencode({'fields': 'card', 'cursor': cursor}))
+    if rng.random() < 0.5:
+        send('public search', 'get', '/api/public/products/search/?' + urlencode({'q': rng.choice(NOUNS)}))
+
+
+def shop(send, context, rng):
+    slug = rng.choice(context.slugs)
+    send('shop by slug', 'get', f'/api/shops/{slug}/')
+    send('shop products', 'get', f'/api/shops/{slug}/products/')
+
+
+def dashboard(send, context, rng):
+    send('stats/me', 'get', '/api/stats/me/', auth=True)
+    send('shops/me', 'get', '/api/shops/me/', auth=True)
+    send('products (owner)', 'get', '/api/products/', auth=True)
+
+
+SCENARIOS = {'visit': visit, 'marketplace': marketplace, 'shop': shop, 'dashboard': dashboard}
+
+
+def seed(shops=50, products=2000, days=90):
+    """
+    Shops `bench-shop-0`... with `products` published products spread over
+    them, `days` of daily stats for the first one (owned by OWNER_EMAIL).
+    Does nothing if the owner already exists; returns True when seeded.
+    """
+    from apps.accounts.models import User
+
+    from . import testing
+
+    if User.objects.filter(email=OWNER_EMAIL).exists():
+        return False
+    owner = User.objects.create_user(
+        username=OWNER_EMAIL, email=OWNER_EMAIL, password=OWNER_PASSWORD,
+        shop_name='Boutique 0', slug=SHOP_SLUG.format(0), whatsapp_number='22890000000',
+    )
+    all_shops = [owner.shop] + testing.create_shops(shops - 1, SHOP_PREFIX)
+    rng = random.Random(0)
+    testing.create_products(
+        all_shops, products, prefix='bench', batch_size=500,
+        name=lambda i: f'{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {i}'.capitalize(),
+        fields=lambda i: {
+            'description': 'Produit de démonstration.', 'price': 1000 + i % 50 * 500, 'views_count': rng.randrange(1000),
+        },
+    )
+    testing.create_stats(owner.shop, days - 1, visits=500)
+    return True
+
+
+class InProcessTransport:
+    """Django test Client: the whole middleware stack, without a socket."""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method, path, body=None, headers=None):
+        extra = {f'HTTP_{name.upper().replace("-", "_")}': value for name, value in (headers or {}).items()}
+        if body is not None:
+            extra.update(data=json.dumps(body), content_type='application/json')
+        response = getattr(self.client, method)(path, **extra)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, response.headers, content
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    """
+    Requests to the server at `base_url`, one connection each: gunicorn's
+    sync workers close them anyway, and keep-alive with the development
+    server adds ~40 ms (delayed ACK) to every response.
+    """
+
+    def __init__(self, base_url, timeout=30.0):
+        url = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(url.netloc, timeout=timeout)
+        self.prefix = url.path.rstrip('/')
+
+    def request(self, method, path, body=None, headers=None):
+        headers = {**(headers or {}), 'Connection': 'close'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method.upper(), self.prefix + path, body=data, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        finally:
+            self.connection.close()
+        return response.status, response.headers, content
+
+    def close(self):
+        self.connection.close()
+
+
+def login(transport):
+    """Access token of the seeded owner."""
+    status, _, content = transport.request(
+        'post', '/api/auth/login/', {'email': OWNER_EMAIL, 'password': OWNER_PASSWORD},
+    )
+    if status != 200:
+        raise RuntimeError(f'Connexion du compte de démonstration impossible : HTTP {status} {content[:200]!r}')
+    return json.loads(content)['access']
+
+
+def _sender(transport, context, record):
+    """send() for the scenarios: one timed request, appended to `record`; returns the response headers."""
+
+    def send(request_name, method, path, body=None, auth=False):
+        headers = {'Authorization': f'Bearer {context.token}'} if auth else {}
+        begin = time.perf_counter()
+        try:
+            status, response_headers, _ = transport.request(method, path, body, headers)
+        except (OSError, http.client.HTTPException):
+            record.append((request_name, time.perf_counter() - begin, 0, None))
+            return {}
+        queries = response_headers.get(QUERY_COUNT_HEADER)
+        record.append((
+            request_name, time.perf_counter() - begin, status, int(queries) if queries is not None else None,
+        ))
+        return response_headers
+
+    return send
+
+
+def run(make_transport, context, weights, concurrency, duration, seed=0):
+    """
+    Replay the scenarios with `concurrency` workers for `duration` seconds.
+    Returns (samples, scenario counts, elapsed seconds); a sample is
+    (request name, seconds, HTTP status or 0 on a connection error,
+    query count or None).
+    """
+    names = [name for name in SCENARIOS if weights.get(name)]
+    scenario_weights = [weights[name] for name in names]
+    samples = []
+    scenario_counts = dict.fromkeys(names, 0)
+    lock = threading.Lock()
+
+    # Warm-up, not measured: imports, URL resolver, per-process caches.
+    transport = make_transport()
+    try:
+        send = _sender(transport, context, [])
+        for name in names:
+            SCENARIOS[name](send, context, random.Random(seed))
+    finally:
+        transport.close()
+
+    def worker(number, deadline):
+        rng = random.Random(seed * 1000 + number)
+        transport = make_transport()
+        record = []
+        played = dict.fromkeys(names, 0)
+        try:
+            send = _sender(transport, context, record)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, scenario_weights)[0]
+                SCENARIOS[name](send, context, rng)
+                played[name] += 1
+        finally:
+            transport.close()
+        with lock:
+            samples.extend(record)
+            for name, count in played.items():
+                scenario_counts[name] += count
+
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [threading.Thread(target=worker, args=(number, deadline)) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, scenario_counts, time.perf_counter() - started
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    """Request count, errors (HTTP >= 400 or no response), req/s, latency percentiles (ms), queries per request."""
+    latencies = sorted(seconds for _, seconds, _, _ in samples)
+    queries = [count for _, _, _, count in samples if count is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, status, _ in samples if not status or status >= 400),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def summarize_by_request(samples, elapsed):
+    """summarize() for each request name, by name."""
+    by_name = {}
+    for sample in samples:
+        by_name.setdefault(sample[0], []).append(sample)
+    return {name: summarize(group, elapsed) for name, group in sorted(by_name.items())}
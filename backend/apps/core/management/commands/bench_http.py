@@ -0,0 +1,229 @@
+"""
+HTTP load benchmark: latency percentiles, throughput and queries per request.
+
+    python manage.py bench_http
+    python manage.py bench_http --duration 30 --concurrency 8 --weights visit=80,dashboard=20
+    python manage.py bench_http --compare bench-1a2b3c4.json
+
+By default, runs in this process against a throwaway test database seeded
+with --shops shops and --products products (apps.core.loadbench.seed).
+With --url, runs against a server started separately, on a database seeded
+beforehand with --seed:
+
+    export DJANGO_SETTINGS_MODULE=config.settings_bench
+    python manage.py migrate && python manage.py bench_http --seed
+    gunicorn config.wsgi --workers 4 &
+    python manage.py bench_http --url http://127.0.0.1:8000
+
+Results are printed and written to --output (JSON, with the git commit),
+so that runs on two commits can be compared with --compare. In-process,
+the workers share the GIL with the application: compare runs of the same
+mode, on the same machine and database.
+"""
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from apps.core import loadbench, testing
+
+QUERY_COUNT_MIDDLEWARE = 'apps.core.middleware.QueryCountMiddleware'
+
+
+def _weights(value):
+    """`visit=50,dashboard=10` -> the default weights with these ones replaced."""
+    weights = dict(loadbench.DEFAULT_WEIGHTS)
+    for part in filter(None, value.split(',')):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in loadbench.SCENARIOS:
+            raise CommandError(f"Scénario inconnu : {name!r} (disponibles : {', '.join(loadbench.SCENARIOS)}).")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Poids invalide pour {name} : {weight!r}.')
+        if weights[name] < 0:
+            raise CommandError(f'Poids négatif pour {name}.')
+    if not any(weights.values()):
+        raise CommandError('Au moins un scénario doit avoir un poids positif.')
+    return weights
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _delta(current, previous):
+    if previous in (None, 0) or current is None:
+        return ''
+    return f'{(current - previous) / previous:+.0%}'
+
+
+class Command(BaseCommand):
+    help = 'Banc de charge HTTP : latences p50/p95/p99, requêtes/s et requêtes SQL par requête.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=10.0, help='Durée de la mesure (secondes).')
+        parser.add_argument('--concurrency', type=int, default=4, help='Clients simultanés.')
+        parser.add_argument(
+            '--weights', type=_weights, default=dict(loadbench.DEFAULT_WEIGHTS),
+            help=f"Poids des scénarios, ex. visit=50,marketplace=25 (défaut : "
+                 f"{','.join(f'{name}={weight}' for name, weight in loadbench.DEFAULT_WEIGHTS.items())}).",
+        )
+        parser.add_argument('--url', help='Serveur à mesurer (ex. http://127.0.0.1:8000) au lieu du processus courant.')
+        parser.add_argument('--seed', action='store_true', help='Peupler la base configurée, sans mesurer.')
+        parser.add_argument('--shops', type=int, default=50)
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--random-seed', type=int, default=0, help='Graine du tirage des scénarios.')
+        parser.add_argument('--output', help='Fichier JSON des résultats (défaut : bench-<commit>.json).')
+        parser.add_argument('--compare', help="Résultats JSON d'une exécution précédente à comparer.")
+
+    def handle(self, *args, **options):
+        if options['shops'] <= 0 or options['products'] < 0:
+            raise CommandError('--shops doit être positif et --products ne peut pas être négatif.')
+        if options['seed']:
+            return self._seed(options)
+        if options['duration'] <= 0 or options['concurrency'] <= 0:
+            raise CommandError('--duration et --concurrency doivent être positifs.')
+        previous = self._load(options['compare']) if options['compare'] else None
+
+        if options['url']:
+            database = None
+            samples, scenarios, elapsed = self._run_http(options)
+        else:
+            database = connection.vendor
+            samples, scenarios, elapsed = self._run_in_process(options)
+
+        commit = _git_commit()
+        report = {
+            'commit': commit,
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'mode': 'http' if options['url'] else 'in-process',
+            'url': options['url'],
+            'database': database,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'concurrency': options['concurrency'],
+            'duration': round(elapsed, 2),
+            'weights': options['weights'],
+            'dataset': {'shops': options['shops'], 'products': options['products']},
+            'scenarios': scenarios,
+            'total': loadbench.summarize(samples, elapsed),
+            'requests': loadbench.summarize_by_request(samples, elapsed),
+        }
+        self._report(report, previous)
+        output = options['output'] or f"bench-{commit or 'local'}.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        self.stdout.write(f'Résultats écrits dans {output}')
+
+    def _load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Lecture de {path} impossible : {e}')
+
+    def _seed(self, options):
+        # Writes to the configured database: never the production one by mistake.
+        if settings.SETTINGS_MODULE != 'config.settings_bench':
+            raise CommandError('--seed écrit dans la base configurée : lancer avec DJANGO_SETTINGS_MODULE=config.settings_bench.')
+        if loadbench.seed(options['shops'], options['products']):
+            self.stdout.write(self.style.SUCCESS(
+                f"{options['shops']} boutiques et {options['products']} produits créés ({connection.vendor})."
+            ))
+        else:
+            self.stdout.write('Base déjà peuplée, rien à faire.')
+
+    def _run_http(self, options):
+        make_transport = lambda: loadbench.HTTPTransport(options['url'])  # noqa: E731
+        transport = make_transport()
+        try:
+            token = loadbench.login(transport)
+        except (OSError, RuntimeError) as e:
+            raise CommandError(f"{e} (base peuplée avec --seed ? serveur démarré sur {options['url']} ?)")
+        finally:
+            transport.close()
+        context = loadbench.BenchContext(options['shops'], token)
+        return loadbench.run(
+            make_transport, context, options['weights'], options['concurrency'], options['duration'],
+            options['random_seed'],
+        )
+
+    def _run_in_process(self, options):
+        middleware = list(settings.MIDDLEWARE)
+        if QUERY_COUNT_MIDDLEWARE not in middleware:
+            middleware.insert(0, QUERY_COUNT_MIDDLEWARE)
+        test_settings = connection.settings_dict['TEST']
+        directory = None
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # A file rather than the in-memory database, whose shared cache
+            # fails concurrent writes ("table is locked") instead of waiting.
+            directory = tempfile.mkdtemp(prefix='bench-')
+            test_settings['NAME'] = os.path.join(directory, 'bench.sqlite3')
+        try:
+            with testing.throwaway_database(), override_settings(
+                ALLOWED_HOSTS=['*'], MIDDLEWARE=middleware,
+                PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+            ):
+                loadbench.seed(options['shops'], options['products'])
+                transport = loadbench.InProcessTransport()
+                try:
+                    context = loadbench.BenchContext(options['shops'], loadbench.login(transport))
+                finally:
+                    transport.close()
+                return loadbench.run(
+                    loadbench.InProcessTransport, context, options['weights'], options['concurrency'],
+                    options['duration'], options['random_seed'],
+                )
+        finally:
+            if directory:
+                test_settings['NAME'] = None
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def _report(self, report, previous):
+        total = report['total']
+        self.stdout.write(
+            f"{report['mode']} ({report['database'] or report['url']}), commit {report['commit'] or '?'} : "
+            f"{report['concurrency']} clients, {report['duration']:.1f} s, "
+            + ', '.join(f'{name} {count}' for name, count in report['scenarios'].items())
+        )
+        columns = ('requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request')
+        self.stdout.write(
+            f"{'requête':<24}{'nombre':>8}{'erreurs':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'SQL/req':>9}"
+            + (f"{'Δ p50':>8}{'Δ p95':>8}{'Δ req/s':>9}" if previous else '')
+        )
+        rows = [*report['requests'].items(), ('total', total)]
+        for name, stats in rows:
+            count, errors, rps, p50, p95, p99, queries = (stats[column] for column in columns)
+            line = (
+                f'{name:<24}{count:>8}{errors:>9}{rps:>9.1f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}'
+                f"{'-' if queries is None else f'{queries:.1f}':>9}"
+            )
+            if previous:
+                before = previous['total'] if name == 'total' else previous.get('requests', {}).get(name, {})
+                line += (
+                    f"{_delta(p50, before.get('p50_ms')):>8}{_delta(p95, before.get('p95_ms')):>8}"
+                    f"{_delta(rps, before.get('rps')):>9}"
+                )
+            self.stdout.write(self.style.ERROR(line) if errors else line)
+        if previous:
+            self.stdout.write(
+                f"Comparé à {previous.get('mode')} du commit {previous.get('commit') or '?'} ({previous.get('date')})."
+            )
@@ -0,0 +1,91 @@
+"""
+Cost of allocating a product slug when many products share a base name.
+
+    python manage.py bench_slug_allocation
+    python manage.py bench_slug_allocation --sizes 10 1000 10000 --saves 50
+
+Runs against a throwaway test database. For each size N, N products
+named "Robe" already exist (robe, robe-1 ... robe-<N-1>); the command then
+saves --saves new "Robe" products and reports the queries and time per
+save. The former one-exists()-per-suffix loop is timed once per size for
+comparison (--no-legacy to skip it).
+"""
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from apps.core import testing
+
+NAME = 'Robe'
+
+
+@contextmanager
+def count_queries(counter):
+    """Count executed statements in counter[0] (no 9000-query log limit)."""
+    def wrapper(execute, sql, params, many, context):
+        counter[0] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield
+
+
+class Command(BaseCommand):
+    help = "Benchmark de l'allocation de slugs uniques (produits partageant un même nom)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+        parser.add_argument('--saves', type=int, default=50)
+        parser.add_argument('--no-legacy', action='store_true')
+
+    def handle(self, *args, **options):
+        with testing.throwaway_database():
+            rows = [self._measure(size, options) for size in sorted(set(options['sizes']))]
+
+        self.stdout.write(f"{'N':>8}{'requêtes/save':>16}{'ms/save':>10}{'ancien: requêtes':>18}{'ancien: ms':>12}")
+        for size, queries, ms, legacy_queries, legacy_ms in rows:
+            legacy = f'{legacy_queries:>18}{legacy_ms:>12.1f}' if legacy_queries is not None else f"{'-':>18}{'-':>12}"
+            self.stdout.write(f'{size:>8}{queries:>16.1f}{ms:>10.2f}' + legacy)
+
+    def _measure(self, size, options):
+        from apps.products.models import Product
+
+        with transaction.atomic():
+            shop = self._seed(size)
+            legacy_queries = legacy_ms = None
+            if not options['no_legacy']:
+                legacy_queries, legacy_ms = self._legacy(Product)
+
+            saves = options['saves']
+            queries = [0]
+            started = time.perf_counter()
+            with count_queries(queries):
+                for _ in range(saves):
+                    Product(shop=shop, name=NAME, description='-', price=10).save()
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return size, queries[0] / saves, elapsed * 1000 / saves, legacy_queries, legacy_ms
+
+    def _legacy(self, model):
+        """The former allocation loop: one exists() per tried suffix."""
+        queries = [0]
+        started = time.perf_counter()
+        with count_queries(queries):
+            base_slug = slugify(NAME)
+            slug = base_slug
+            counter = 1
+            while model.objects.filter(slug=slug).exists():
+                slug = f'{base_slug}-{counter}'
+                counter += 1
+        return queries[0], (time.perf_counter() - started) * 1000
+
+    def _seed(self, size):
+        shop = testing.create_seller('bench').shop
+        base = slugify(NAME)
+        testing.create_products(
+            [shop], size, prefix=base, name=lambda i: NAME, fields=lambda i: {'slug': base} if i == 0 else {},
+        )
+        return shop
@@ -0,0 +1,42 @@
+"""
+Recompute the stored image URLs of products and shop logos.
+
+    python manage.py refresh_image_urls
+
+Needed after a change of storage, Cloudinary account or IMAGE_*_WIDTH
+settings; uploads keep the columns up to date on their own. Cached
+public responses of the shops touched are invalidated.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.cache import CATALOG_SCOPE, bump_versions, shop_scope
+from apps.core.images import backfill_image_urls
+
+
+class Command(BaseCommand):
+    help = "Recalcule les URLs d'images stockées (produits et logos des boutiques)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        from apps.products.models import Product
+        from apps.shops.models import Shop
+
+        batch_size = options['batch_size']
+        # Rows without a file keep their URLs (e.g. image_url given by a bulk import).
+        products = backfill_image_urls(
+            Product.objects.exclude(image='').exclude(image__isnull=True), 'image', 'image', batch_size,
+        )
+        shops = backfill_image_urls(Shop.objects.exclude(logo='').exclude(logo__isnull=True), 'logo', 'logo', batch_size)
+
+        # bulk_update n'envoie pas post_save : invalider le cache à la main.
+        shop_ids = set(shops)
+        for start in range(0, len(products), batch_size):
+            chunk = products[start:start + batch_size]
+            shop_ids.update(Product.objects.filter(pk__in=chunk).values_list('shop_id', flat=True))
+        if shop_ids:
+            bump_versions(CATALOG_SCOPE, *(shop_scope(shop_id) for shop_id in shop_ids))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(products)} produit(s) et {len(shops)} boutique(s) mis à jour.'
+        ))
@@ -0,0 +1,34 @@
+"""
+Middleware of the benchmark settings (config.settings_bench).
+"""
+from contextlib import ExitStack
+
+from django.db import connections
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+
+
+class QueryCountMiddleware:
+    """
+    Adds an X-Query-Count header: the SQL queries run while the response
+    was built, on every database. Queries made while a streaming body is
+    consumed come after the header and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        response[QUERY_COUNT_HEADER] = str(count)
+        return response
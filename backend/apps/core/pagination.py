@@ -0,0 +1,137 @@
+"""
+Keyset (cursor) pagination for public lists.
+
+Pages are delimited by the values of the ordering columns of the last row
+sent, not by an OFFSET, so page 1000 costs the same index range scan as
+page 1. The response body stays a plain JSON array (frontend
+compatibility); the next page is advertised in headers:
+
+    Link: <https://…/api/public/products/?cursor=…>; rel="next"
+    X-Next-Cursor: …
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class KeysetPagination:
+    """
+    Paginate a queryset on `ordering`, a tuple of descending field (or
+    numeric annotation) names ending with a unique column ('-created_at', '-id').
+    Query params: `cursor` (opaque token) and `page_size`.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, ordering=('-created_at', '-id')):
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.next_cursor = None
+        self.request = None
+
+    def get_page_size(self, request, default=None, maximum=None):
+        default = default or getattr(settings, 'PUBLIC_PAGE_SIZE', 24)
+        maximum = maximum or getattr(settings, 'PUBLIC_MAX_PAGE_SIZE', 100)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(size, maximum))
+
+    def _ordered_after_cursor(self, queryset, request):
+        queryset = queryset.order_by(*self.ordering)
+        raw = request.query_params.get(self.cursor_query_param)
+        if raw:
+            queryset = queryset.filter(self._after(self.decode_cursor(raw, queryset.model)))
+        return queryset
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        rows = list(self._ordered_after_cursor(queryset, request)[:page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    def page_queryset(self, queryset, request, default=None, maximum=None):
+        """
+        The page as an unevaluated queryset, for streaming (apps.core.streaming).
+        The next cursor is known beforehand: one query reads the ordering
+        values of the page's last row and of the row after it, if any.
+        """
+        self.request = request
+        page_size = self.get_page_size(request, default, maximum)
+        queryset = self._ordered_after_cursor(queryset, request)
+        edge = list(queryset.values_list(*self.fields)[page_size - 1:page_size + 1])
+        if len(edge) > 1:
+            self.next_cursor = self._encode_values(edge[0])
+        return queryset[:page_size]
+
+    def get_headers(self):
+        headers = {}
+        if self.next_cursor:
+            url = replace_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor,
+            )
+            headers['Link'] = f'<{url}>; rel="next"'
+            headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        return headers
+
+    def get_paginated_response(self, data):
+        return Response(data, headers=self.get_headers())
+
+    def encode_cursor(self, instance):
+        return self._encode_values([getattr(instance, field) for field in self.fields])
+
+    def _encode_values(self, values):
+        # isoformat() keeps microseconds (DjangoJSONEncoder would truncate them).
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        payload = json.dumps(values, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, raw, model):
+        try:
+            padded = raw + '=' * (-len(raw) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError(raw)
+            values = [
+                self._to_python(model, field, value)
+                for field, value in zip(self.fields, values)
+            ]
+            if None in values:
+                raise ValueError(raw)
+            return values
+        except (ValueError, TypeError, DjangoValidationError):
+            raise NotFound('Curseur invalide.')
+
+    def _to_python(self, model, field, value):
+        try:
+            return model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist:
+            # Annotation (e.g. a search rank): kept as decoded from JSON.
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ValueError(value)
+            return value
+
+    def _after(self, values):
+        """
+        Rows strictly after `values` in the (descending) ordering:
+        f0 < v0 OR (f0 = v0 AND f1 < v1) OR ..., plus a redundant f0 <= v0
+        so the database can range-scan the index on the first column.
+        """
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            equal = {f: v for f, v in zip(self.fields[:index], values[:index])}
+            condition |= Q(**equal, **{f'{field}__lt': values[index]})
+        return Q(**{f'{self.fields[0]}__lte': values[0]}) & condition
@@ -0,0 +1,159 @@
+"""
+Unique slug allocation for Product, Shop and User.
+
+`next_free_slug()` finds the first free slug of the form `base`,
+`base-1`, `base-2`... with one aggregate query over the rows equal to
+`base` or matching `base-<n>` (a prefix range on the slug index), instead
+of one exists() per attempt. Two concurrent writers can still pick the
+same value: `save_with_unique_slug()` writes inside a savepoint and, on a
+unique-constraint conflict on that slug, allocates again.
+`allocate_slugs()` / `bulk_create_with_unique_slugs()` do the same for a
+batch of new rows (bulk imports). `shared_with` lists other models whose
+slug must be free as well (a seller's User and Shop share one slug).
+"""
+import random
+import re
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Case, CharField, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Cast, Length, Substr
+from django.db.models.lookups import Exact, LessThanOrEqual
+
+# Allocation + write attempts before letting the IntegrityError through.
+MAX_ATTEMPTS = 5
+
+# Longest suffix read as a number (fits a 32-bit integer). Longer ones,
+# such as a phone number in a shop name, are ordinary slugs.
+MAX_SUFFIX_DIGITS = 9
+
+
+def _clean_base(base, max_length, fallback):
+    return (base or fallback)[:max_length].strip('-') or fallback
+
+
+def next_free_slug(model, base, field='slug', exclude_pk=None, fallback='item', skip=0, shared_with=()):
+    """
+    First free `base` / `base-<n>` slug for `model.<field>`, in one query
+    (plus one per model of `shared_with`). `skip` leaves that many numbers
+    free after the highest one taken.
+    """
+    max_length = min(m._meta.get_field(field).max_length for m in (model, *shared_with))
+    base = _clean_base(base, max_length, fallback)
+    while True:
+        tops = [_highest_suffix(model, base, field, exclude_pk)]
+        tops += [_highest_suffix(other, base, field, None) for other in shared_with]
+        tops = [top for top in tops if top is not None]
+        if not tops:
+            return base
+        top = max(tops)
+        suffix = f'-{top + 1 + skip}'
+        if len(base) + len(suffix) <= max_length:
+            return base + suffix
+        # Too long with the suffix: allocate under a shorter base.
+        base = base[:max_length - len(suffix)].rstrip('-') or fallback[:max_length - len(suffix)]
+
+
+def _highest_suffix(model, base, field, exclude_pk):
+    """None if `base` is free, else the highest n among `base` (0) and `base-<n>` (n of up to MAX_SUFFIX_DIGITS digits)."""
+    suffix = Substr(field, len(base) + 2)
+    if connections[router.db_for_read(model)].vendor == 'sqlite':
+        # SQLite's LIKE is case-insensitive and cannot use the index; a
+        # binary range can ('.' is the character after '-'). REGEXP is a
+        # Python callback there: keep suffixes that read back unchanged as
+        # an integer instead.
+        numbered = Q(
+            Exact(suffix, Cast(Cast(suffix, IntegerField()), CharField())),
+            LessThanOrEqual(Length(suffix), MAX_SUFFIX_DIGITS),
+            **{f'{field}__gte': f'{base}-', f'{field}__lt': f'{base}.'},
+        )
+    else:
+        # PostgreSQL: LIKE 'base-%' uses the varchar_pattern_ops index
+        # Django creates for slug fields.
+        numbered = Q(**{
+            f'{field}__startswith': f'{base}-',
+            f'{field}__regex': rf'^{re.escape(base)}-[0-9]{{1,{MAX_SUFFIX_DIGITS}}}$',
+        })
+    queryset = model._default_manager.filter(Q(**{field: base}) | numbered)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset.aggregate(top=Max(Case(
+        When(**{field: base}, then=Value(0)),
+        default=Cast(suffix, IntegerField()),
+    )))['top']
+
+
+def save_with_unique_slug(model, base, write, field='slug', exclude_pk=None, fallback='item', shared_with=()):
+    """
+    Call `write(slug)` with a free slug inside a savepoint, allocating
+    again when a concurrent writer took the same slug first. Retries jump
+    a random, growing number of suffixes ahead so that writers racing for
+    the same base do not collide again on the next free number.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        skip = random.randrange(4 ** (attempt - 1)) if attempt > 1 else 0
+        slug = next_free_slug(model, base, field, exclude_pk, fallback, skip, shared_with)
+        try:
+            with transaction.atomic():
+                return write(slug)
+        except IntegrityError:
+            taken = model._default_manager.filter(**{field: slug})
+            if exclude_pk is not None:
+                taken = taken.exclude(pk=exclude_pk)
+            taken = taken.exists() or any(
+                other._default_manager.filter(**{field: slug}).exists() for other in shared_with
+            )
+            if attempt == MAX_ATTEMPTS or not taken:
+                raise
+
+
+def allocate_slugs(model, bases, field='slug', fallback='item', skip=0):
+    """
+    Distinct free slugs for a batch of new rows, one per entry of `bases`:
+    one query for the whole batch, plus one per base already taken or
+    repeated within the batch.
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = [_clean_base(base, max_length, fallback) for base in bases]
+    taken = set(
+        model._default_manager.filter(**{f'{field}__in': set(bases)}).values_list(field, flat=True)
+    )
+    used = set()
+    tops = {}
+    slugs = []
+    for base in bases:
+        slug = base
+        while slug in taken or slug in used:
+            if base not in tops:
+                tops[base] = (_highest_suffix(model, base, field, None) or 0) + skip
+            tops[base] += 1
+            suffix = f'-{tops[base]}'
+            if len(base) + len(suffix) > max_length:
+                # Too long with the suffix: continue under a shorter base,
+                # whose own suffixes are looked up in the database.
+                base = base[:max_length - len(suffix)].rstrip('-') or fallback[:max_length - len(suffix)]
+                taken.add(base)
+                slug = base
+                continue
+            slug = base + suffix
+        used.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def bulk_create_with_unique_slugs(model, objs, bases, field='slug', fallback='item', batch_size=None):
+    """
+    bulk_create `objs` with slugs allocated from `bases`, inside a
+    savepoint, allocating again if a concurrent writer took one of them.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        skip = random.randrange(4 ** (attempt - 1)) if attempt > 1 else 0
+        slugs = allocate_slugs(model, bases, field, fallback, skip)
+        for obj, slug in zip(objs, slugs):
+            setattr(obj, field, slug)
+        try:
+            with transaction.atomic():
+                return model._default_manager.bulk_create(objs, batch_size=batch_size)
+        except IntegrityError:
+            taken = model._default_manager.filter(**{f'{field}__in': slugs})
+            if attempt == MAX_ATTEMPTS or not taken.exists():
+                raise
@@ -0,0 +1,75 @@
+"""
+Streaming JSON list responses.
+
+DRF renders a list by building `serializer.data` for every row, then the
+whole encoded body. Here rows are read with `.iterator(chunk_size=...)`
+(a server-side cursor on PostgreSQL), encoded one at a time and sent in
+~64 KB pieces through a StreamingHttpResponse, so a worker's memory does
+not grow with the number of rows. The body is the same compact JSON
+array JSONRenderer would produce.
+"""
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .pagination import KeysetPagination
+
+# Rows fetched from the database per round trip.
+CHUNK_SIZE = getattr(settings, 'STREAMING_CHUNK_SIZE', 500)
+
+# Bytes accumulated before a piece of the body is sent.
+BUFFER_SIZE = 64 * 1024
+
+_encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_json_list(rows, to_representation):
+    """Yield the JSON array of `to_representation(row)` for each row, as bytes."""
+    buffer = ['[']
+    size = 1
+    first = True
+    for row in rows:
+        item = _encoder.encode(to_representation(row))
+        if not first:
+            item = ',' + item
+        first = False
+        buffer.append(item)
+        size += len(item)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    buffer.append(']')
+    yield ''.join(buffer).encode()
+
+
+def streaming_json_response(queryset, to_representation, headers=None, chunk_size=None):
+    """
+    StreamingHttpResponse of the JSON array of `queryset` rows, each one
+    turned into a dict by `to_representation` (e.g. a serializer's).
+    """
+    rows = queryset.iterator(chunk_size=chunk_size or CHUNK_SIZE)
+    response = StreamingHttpResponse(
+        iter_json_list(rows, to_representation), content_type='application/json',
+    )
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def wants_stream(request):
+    """True for `?stream=1` (or true/yes)."""
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def streaming_page_response(request, queryset, to_representation, ordering=('-created_at', '-id')):
+    """
+    `?stream=1` variant of a keyset-paginated public list: same cursors and
+    headers, pages of up to PUBLIC_STREAM_MAX_PAGE_SIZE rows, streamed.
+    """
+    paginator = KeysetPagination(ordering=ordering)
+    page = paginator.page_queryset(
+        queryset, request,
+        default=getattr(settings, 'PUBLIC_STREAM_PAGE_SIZE', 1000),
+        maximum=getattr(settings, 'PUBLIC_STREAM_MAX_PAGE_SIZE', 10000),
+    )
+    return streaming_json_response(page, to_representation, paginator.get_headers())
@@ -0,0 +1,127 @@
+"""
+Helpers shared by the test suites (`python manage.py test`) and the
+benchmark commands: dataset seeding, reset of the per-process caches,
+and a throwaway test database for the benchmarks.
+"""
+import datetime
+from contextlib import contextmanager
+
+PASSWORD = 'test-password'
+
+
+def create_seller(slug, name=None, password=PASSWORD, **extra):
+    """A seller account `<slug>@linkcontact.local` and its shop at `slug`."""
+    from apps.accounts.models import User
+
+    email = f'{slug}@linkcontact.local'
+    return User.objects.create_user(
+        username=email, email=email, password=password,
+        shop_name=name or slug.replace('-', ' ').capitalize(), slug=slug, **extra,
+    )
+
+
+def create_shops(count, prefix, start=1):
+    """`count` sellers without password, with shops `<prefix>-<start>`, `<prefix>-<start + 1>`..."""
+    from apps.accounts.models import User
+    from apps.shops.models import Shop
+
+    numbers = range(start, start + count)
+    users = User.objects.bulk_create([
+        User(username=f'{prefix}-{i}@linkcontact.local', email=f'{prefix}-{i}@linkcontact.local') for i in numbers
+    ])
+    return Shop.objects.bulk_create([
+        Shop(user=user, name=f'Boutique {i}', slug=f'{prefix}-{i}') for i, user in zip(numbers, users)
+    ])
+
+
+def create_products(shops, count, prefix='produit', name=None, fields=None, spread=False, batch_size=1000):
+    """
+    `count` published products `<prefix>-<i>` spread over `shops` in turn.
+    `name(i)` and `fields(i)` (extra column values) default to `Produit <i>`
+    and nothing. `spread` backdates created_at by i minutes, so that the
+    rows are not all created in the same instant.
+    """
+    from django.utils import timezone
+
+    from apps.products.models import Product
+
+    rows = Product.objects.bulk_create([
+        Product(**{
+            'shop': shops[i % len(shops)], 'name': name(i) if name else f'Produit {i}', 'slug': f'{prefix}-{i}',
+            'description': '-', 'price': 10, 'status': 'published', **(fields(i) if fields else {}),
+        })
+        for i in range(count)
+    ], batch_size=batch_size)
+    if spread:
+        now = timezone.now()
+        for i, row in enumerate(rows):
+            row.created_at = now - datetime.timedelta(minutes=i)
+        Product.objects.bulk_update(rows, ['created_at'], batch_size=batch_size)
+    return rows
+
+
+def create_stats(shop, days, visits):
+    """`days` daily rollups before today and `visits` raw page views, one per minute back from now."""
+    from django.utils import timezone
+
+    from apps.stats.models import Visit, VisitDailyRollup
+
+    today = timezone.localdate()
+    VisitDailyRollup.objects.bulk_create([
+        VisitDailyRollup(shop=shop, day=today - datetime.timedelta(days=i), views=i + 1, whatsapp_clicks=i)
+        for i in range(1, days + 1)
+    ])
+    now = timezone.now()
+    Visit.objects.bulk_create([
+        Visit(shop=shop, action=Visit.ACTION_VIEW, created_at=now - datetime.timedelta(minutes=i))
+        for i in range(visits)
+    ])
+
+
+def clear_caches():
+    """Reset every per-process cache and pending counter, as in a fresh worker."""
+    from django.core.cache import cache
+
+    from apps.accounts import authentication
+    from apps.shops import resolver, slug_index
+    from apps.stats.counters import get_counters
+
+    authentication.clear()
+    resolver.clear()
+    slug_index.clear()
+    cache.clear()
+    get_counters().discard()
+
+
+def jwt_client(user, **defaults):
+    """Test client authenticated as `user` with an access token."""
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}', **defaults)
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Create the test databases (test_<NAME> on the configured server, like
+    `manage.py test`), and drop them on exit. Used by the benchmark commands.
+    """
+    from django.db import connections
+    from django.test.runner import DiscoverRunner
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    old_config = runner.setup_databases()
+    try:
+        yield
+    finally:
+        from apps.stats.counters import get_counters
+        from apps.stats.ingest import get_buffer
+
+        get_buffer().stop()
+        get_counters().stop()
+        connections.close_all()
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
@@ -0,0 +1,38 @@
+"""
+Login throttling: failed attempts on an account from one address must not
+lock its owner out from another.
+"""
+from django.test import TestCase, override_settings
+
+from apps.accounts import throttling
+from apps.core import testing
+
+PATH = '/api/auth/login/'
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    LOGIN_THROTTLE_ENABLED=True, LOGIN_THROTTLE_BACKEND=throttling.BACKEND_MEMORY,
+    LOGIN_THROTTLE_ACCOUNT_BURST=3, LOGIN_THROTTLE_ACCOUNT_PER_MINUTE=1,
+)
+class LoginThrottleTests(TestCase):
+
+    def setUp(self):
+        self.email = testing.create_seller('cible').email
+        throttling.get_store().clear()
+
+    def tearDown(self):
+        throttling.get_store().clear()
+        testing.clear_caches()
+
+    def _login(self, password, ip):
+        return self.client.post(
+            PATH, {'email': self.email, 'password': password}, content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    def test_account_bucket_is_per_address(self):
+        for _ in range(3):
+            self.assertEqual(self._login('wrong-password', '203.0.113.7').status_code, 400)
+        self.assertEqual(self._login('wrong-password', '203.0.113.7').status_code, 429)
+        # The same account from the owner's address is still allowed.
+        self.assertEqual(self._login(testing.PASSWORD, '198.51.100.2').status_code, 200)
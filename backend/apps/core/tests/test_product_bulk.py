@@ -0,0 +1,95 @@
+"""
+Bulk product import (CSV, JSON Lines) and catalog export, through the API,
+with the import run inline (PRODUCT_IMPORT_MODE = 'sync').
+"""
+import csv
+import io
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.core import testing
+from apps.products.models import Product, ProductImport
+
+CSV_FILE = (
+    'name,price,slug,status\n'
+    'Robe,10,,\n'
+    'Robe,12.50,,draft\n'
+    'Chemise,abc,,\n'
+    'Sac,5,sac-cuir,\n'
+)
+
+
+@override_settings(PRODUCT_IMPORT_MODE='sync', PRODUCT_IMPORT_CHUNK_SIZE=2)
+class ProductBulkTests(TestCase):
+
+    def setUp(self):
+        self.seller = testing.create_seller('vendeur')
+        testing.create_products([self.seller.shop], 1, prefix='robe', fields=lambda i: {'slug': 'robe'})
+        self.client = testing.jwt_client(self.seller)
+
+    def tearDown(self):
+        testing.clear_caches()
+
+    def _import(self, client, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/products/import/', {'file': SimpleUploadedFile(name, content.encode())})
+        self.assertEqual(response.status_code, 202, response.content)
+        return ProductImport.objects.get(pk=response.json()['id'])
+
+    def _export(self, client, export_format):
+        response = client.get(f'/api/products/export/?type={export_format}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_import_csv(self):
+        job = self._import(self.client, 'catalogue.csv', CSV_FILE)
+        self.assertEqual(job.status, ProductImport.STATUS_DONE)
+        self.assertEqual((job.total_rows, job.processed_rows, job.created_count, job.error_count), (4, 4, 3, 1))
+        self.assertEqual([error['line'] for error in job.errors], [4])
+        self.assertIn('price', job.errors[0]['errors'])
+        # `robe` is taken: the two new robes get the next suffixes.
+        products = self.seller.shop.products.order_by('id')
+        self.assertEqual(
+            list(products.values_list('slug', 'price', 'status')),
+            [('robe', 10, 'published'), ('robe-1', 10, 'published'), ('robe-2', 12.5, 'draft'),
+             ('sac-cuir', 5, 'published')],
+        )
+
+    def test_import_jsonl_with_unreadable_line(self):
+        content = '{"name": "Montre", "price": "99"}\nnot json\n\n{"price": "5"}\n'
+        job = self._import(self.client, 'catalogue.jsonl', content)
+        self.assertEqual(job.status, ProductImport.STATUS_DONE)
+        self.assertEqual((job.created_count, job.error_count), (1, 2))
+        self.assertEqual([error['line'] for error in job.errors], [2, 4])
+        self.assertIn('name', job.errors[1]['errors'])
+        self.assertTrue(Product.objects.filter(shop=self.seller.shop, slug='montre').exists())
+
+    def test_export_round_trip(self):
+        self._import(self.client, 'catalogue.csv', CSV_FILE)
+        exported = self._export(self.client, 'csv')
+
+        other = testing.create_seller('autre')
+        other_client = testing.jwt_client(other)
+        job = self._import(other_client, 'export.csv', exported)
+        self.assertEqual((job.created_count, job.error_count), (4, 0))
+
+        def rows(text):
+            return [
+                {key: value for key, value in row.items() if key not in ('slug', 'created_at')}
+                for row in csv.DictReader(io.StringIO(text))
+            ]
+
+        reexported = self._export(other_client, 'csv')
+        self.assertEqual(rows(reexported), rows(exported))
+        # Slugs are global: the exported ones are taken, and suffixed as bases.
+        self.assertEqual(
+            [row['slug'] for row in csv.DictReader(io.StringIO(reexported))],
+            ['robe-3', 'robe-1-1', 'robe-2-1', 'sac-cuir-1'],
+        )
+
+        lines = self._export(self.client, 'jsonl').splitlines()
+        self.assertEqual(
+            [json.loads(line)['slug'] for line in lines], ['robe', 'robe-1', 'robe-2', 'sac-cuir'],
+        )
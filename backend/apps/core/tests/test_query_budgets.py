@@ -0,0 +1,104 @@
+"""
+Query-count budgets per API endpoint, with N+1 detection.
+
+Every endpoint below is requested with cold in-process caches on datasets
+of N = 1, 10 and 1000 rows of what it lists (products, shops, visits...),
+and must run exactly its budgeted number of queries at every N: a count
+that grows with N is an N+1. Change a budget on purpose, in the same
+commit as the change that needs it.
+"""
+from django.test import Client, TestCase, override_settings
+
+from apps.core import testing
+
+OWNER_SLUG = 'budget-shop'
+
+# (name, method, path, auth, budget). `auth` is 'jwt', 'session' (admin) or None.
+ENDPOINTS = [
+    ('public products', 'get', '/api/public/products/?page_size=100', None, 1),
+    ('public products popular', 'get', '/api/public/products/?ordering=popular&page_size=100', None, 1),
+    ('public products card', 'get', '/api/public/products/?fields=card&page_size=100', None, 1),
+    ('public search', 'get', '/api/public/products/search/?q=produit&page_size=100', None, 1),
+    ('shop by slug', 'get', f'/api/shops/{OWNER_SLUG}/', None, 2),
+    ('shop products', 'get', f'/api/shops/{OWNER_SLUG}/products/?page_size=100', None, 2),
+    ('public products stream', 'get', '/api/public/products/?stream=1&page_size=1000', None, 2),
+    ('shop products stream', 'get', f'/api/shops/{OWNER_SLUG}/products/?stream=1&page_size=1000', None, 3),
+    ('products (owner)', 'get', '/api/products/', 'jwt', 2),
+    ('shops/me', 'get', '/api/shops/me/', 'jwt', 1),
+    # Name, slug and WhatsApp live on the shop only: one UPDATE (the account's names are unchanged).
+    ('shops/me update', 'put', '/api/shops/me/', 'jwt', 2),
+    ('auth/me', 'get', '/api/auth/me/', 'jwt', 1),
+    # Cold: the user, then the slug index (shop slugs, one SELECT); 0 once both are cached.
+    ('utils/check-slug', 'get', '/api/utils/check-slug/boutique-1/', 'jwt', 2),
+    ('stats/me day', 'get', '/api/stats/me/', 'jwt', 5),
+    ('stats/me hour', 'get', '/api/stats/me/?granularity=hour', 'jwt', 5),
+    ('stats/me export', 'get', '/api/stats/me/export/', 'jwt', 2),
+    ('visit beacon', 'post', '/api/stats/visit/', None, 6),
+    ('visit batch', 'post', '/api/stats/visit/batch/', None, 6),
+    # Conflict check, user INSERT, shop slug allocation and INSERT, in one transaction.
+    ('auth/register', 'post', '/api/auth/register/', None, 8),
+    ('auth/register slug', 'post', '/api/auth/register/', None, 5),
+    ('admin products', 'get', '/admin/products/product/', 'session', 5),
+    ('admin shops', 'get', '/admin/shops/shop/', 'session', 5),
+]
+
+
+def _payload(name, size):
+    if name == 'visit beacon':
+        return {'shop_slug': OWNER_SLUG, 'action': 'view'}
+    if name == 'visit batch':
+        # Capped so bulk_create stays one INSERT on SQLite (999 bound parameters max).
+        return {'events': [{'shop_slug': OWNER_SLUG, 'action': 'view'}] * min(size, 100)}
+    if name == 'shops/me update':
+        return {'name': 'Budget', 'slug': OWNER_SLUG, 'whatsapp_number': '22890000000', 'first_name': '', 'last_name': ''}
+    if name.startswith('auth/register'):
+        body = {'email': 'new-seller@linkcontact.local', 'password': 'budget-password', 'shop_name': 'Nouvelle Boutique'}
+        if name.endswith('slug'):
+            body.update(email='new-seller-slug@linkcontact.local', slug='nouvelle-boutique-officielle')
+        return body
+    return None
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    STATS_INGESTION_MODE='sync',
+)
+class QueryBudgetTests(TestCase):
+
+    def tearDown(self):
+        testing.clear_caches()
+
+    def _seed(self, size):
+        """Owner shop with `size` products, rollups and visits; `size` other shops with one product each."""
+        owner = testing.create_seller(OWNER_SLUG, is_staff=True, is_superuser=True)
+        testing.create_products([owner.shop], size)
+        testing.create_products(testing.create_shops(size, 'boutique'), size, prefix='article')
+        testing.create_stats(owner.shop, days=size, visits=size)
+        return owner
+
+    def _check_budgets(self, size):
+        owner = self._seed(size)
+        admin = Client()
+        admin.force_login(owner)
+        clients = {'jwt': testing.jwt_client(owner), 'session': admin, None: Client()}
+        for name, method, path, auth, budget in ENDPOINTS:
+            with self.subTest(endpoint=name, size=size):
+                testing.clear_caches()
+                payload = _payload(name, size)
+                with self.assertNumQueries(budget):
+                    if payload is not None:
+                        response = getattr(clients[auth], method)(path, payload, content_type='application/json')
+                    else:
+                        response = getattr(clients[auth], method)(path)
+                    # Streamed rows are read while the body is consumed.
+                    content = b''.join(response.streaming_content) if response.streaming else response.content
+                self.assertLess(response.status_code, 400, content[:200])
+
+    def test_budgets_1(self):
+        self._check_budgets(1)
+
+    def test_budgets_10(self):
+        self._check_budgets(10)
+
+    def test_budgets_1000(self):
+        self._check_budgets(1000)
@@ -0,0 +1,105 @@
+"""
+Query plans of the public product lists: index scan, no sort.
+
+The dataset (20 000 products, mostly published and active, over 50 shops)
+is ANALYZEd, then each endpoint below is requested (first page, then the
+page after the returned cursor) and every ordered query it runs on the
+products table is passed to EXPLAIN. A plan that sorts the rows
+(PostgreSQL Sort node, SQLite temporary B-tree) or reads the whole table
+instead of an index fails the test.
+"""
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core import testing
+
+OWNER_SLUG = 'plans-shop'
+TABLE = 'products_product'
+
+# (name, path).
+ENDPOINTS = [
+    ('public products', '/api/public/products/'),
+    ('public products popular', '/api/public/products/?ordering=popular'),
+    ('public products card', '/api/public/products/?fields=card'),
+    ('public products stream', '/api/public/products/?stream=1&page_size=1000'),
+    ('shop products', f'/api/shops/{OWNER_SLUG}/products/'),
+    ('shop products stream', f'/api/shops/{OWNER_SLUG}/products/?stream=1&page_size=100'),
+]
+
+
+def _pg_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _pg_nodes(child)
+
+
+def _explain(sql):
+    """(plan lines, problems) for one query."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            nodes = list(_pg_nodes(plan[0]['Plan']))
+            problems = []
+            if any(node['Node Type'] in ('Sort', 'Incremental Sort') for node in nodes):
+                problems.append('sort')
+            if any(node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == TABLE for node in nodes):
+                problems.append('full table scan')
+            lines = [
+                node['Node Type'] + (f" using {node['Index Name']}" if 'Index Name' in node else '')
+                + (f" on {node['Relation Name']}" if 'Relation Name' in node else '')
+                for node in nodes
+            ]
+            return lines, problems
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        lines = [row[-1] for row in cursor.fetchall()]
+    problems = []
+    if any('TEMP B-TREE' in line for line in lines):
+        problems.append('sort')
+    if any(line.startswith(f'SCAN {TABLE}') and 'INDEX' not in line for line in lines):
+        problems.append('full table scan')
+    return lines, problems
+
+
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # About 1 product in 7 is hidden (draft or inactive); created_at is spread over time.
+        owner = testing.create_seller(OWNER_SLUG)
+        shops = [owner.shop] + testing.create_shops(49, 'plans')
+        testing.create_products(shops, 20000, spread=True, fields=lambda i: {
+            'views_count': i % 997, 'status': 'draft' if i % 10 == 3 else 'published', 'is_active': i % 20 != 7,
+        })
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {TABLE}' if connection.vendor == 'postgresql' else 'ANALYZE')
+
+    def tearDown(self):
+        testing.clear_caches()
+
+    def test_public_lists_read_an_index_without_sorting(self):
+        for name, path in ENDPOINTS:
+            for page in (1, 2):
+                testing.clear_caches()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(path)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, 200, f'{name} (page {page})')
+                ordered = [
+                    query['sql'] for query in queries.captured_queries
+                    if f'FROM "{TABLE}"' in query['sql'] and 'ORDER BY' in query['sql']
+                ]
+                self.assertTrue(ordered, f'{name} (page {page}): no ordered query on {TABLE}')
+                for sql in ordered:
+                    with self.subTest(endpoint=name, page=page):
+                        lines, problems = _explain(sql)
+                        self.assertFalse(problems, '\n'.join([sql, *lines]))
+                cursor = response.get('X-Next-Cursor')
+                if not cursor:
+                    break
+                path += ('&' if '?' in path else '?') + f'cursor={cursor}'
@@ -0,0 +1,41 @@
+"""
+Deleting a seller, a shop or a product, with the signal receivers that
+bump the dashboard stats version.
+"""
+from django.db import connection
+from django.test import TestCase
+
+from apps.core import testing
+from apps.shops.models import Shop
+from apps.stats.models import ShopStatsVersion
+
+
+class SellerDeletionTests(TestCase):
+
+    def setUp(self):
+        self.user = testing.create_seller('supprime')
+        self.shop = self.user.shop
+        testing.create_products([self.shop], 3, prefix='supprime')
+        # bulk_create sends no signal: deleting one product creates the version row.
+        testing.create_products([self.shop], 1, prefix='en-plus')[0].delete()
+
+    def tearDown(self):
+        testing.clear_caches()
+
+    def test_delete_seller_with_products(self):
+        self.user.delete()
+        # Foreign keys are checked at commit: run the check now.
+        connection.check_constraints()
+        self.assertFalse(Shop.objects.filter(pk=self.shop.pk).exists())
+        self.assertFalse(ShopStatsVersion.objects.filter(shop_id=self.shop.pk).exists())
+
+    def test_delete_shop_with_products(self):
+        self.shop.delete()
+        connection.check_constraints()
+        self.assertFalse(ShopStatsVersion.objects.filter(shop_id=self.shop.pk).exists())
+
+    def test_delete_product_bumps_stats_version(self):
+        version = ShopStatsVersion.objects.get(shop=self.shop).version
+        self.shop.products.first().delete()
+        self.shop.products.all().delete()
+        self.assertEqual(ShopStatsVersion.objects.get(shop=self.shop).version, version + 3)
@@ -0,0 +1,37 @@
+"""
+Slug -> shop id resolution: unknown slugs are cached briefly, and
+anything but a string is rejected before the cache.
+"""
+from django.test import TestCase, override_settings
+
+from apps.core import testing
+from apps.shops import resolver
+
+
+class ShopResolverTests(TestCase):
+
+    def tearDown(self):
+        testing.clear_caches()
+
+    @override_settings(SHOP_RESOLVER_NOT_FOUND_TTL=0)
+    def test_unknown_slug_is_not_kept(self):
+        self.assertIsNone(resolver.resolve_shop_id('nouvelle-1'))
+        self.assertEqual(resolver.resolve_shop_ids(['nouvelle-1']), {})
+        # bulk_create sends no signal, like a shop registered on another worker.
+        shop, = testing.create_shops(1, 'nouvelle')
+        self.assertEqual(resolver.resolve_shop_id(shop.slug), shop.pk)
+        self.assertEqual(resolver.resolve_shop_ids([shop.slug, 'absente']), {shop.slug: shop.pk})
+
+    def test_known_slug_is_cached(self):
+        shop = testing.create_seller('connue').shop
+        self.assertEqual(resolver.resolve_shop_id('connue'), shop.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve_shop_id('connue'), shop.pk)
+
+    def test_non_string_slug(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(resolver.resolve_shop_id(['connue']))
+        response = self.client.post(
+            '/api/stats/visit/', {'shop_slug': ['connue'], 'action': 'view'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,76 @@
+"""
+Memory used to serve a large public product list, streamed or not.
+
+For each page size N, /api/public/products/?stream=1&page_size=N is read
+chunk by chunk (chunks dropped as a client would) under tracemalloc. The
+streaming peak must not grow with N beyond TOLERANCE, and the streamed
+body must equal the same page rendered the regular way (serializer.data
++ JSONRenderer).
+"""
+import json
+import tracemalloc
+
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.core import testing
+from apps.products.models import Product
+from apps.products.serializers import ProductPublicSerializer
+
+SIZES = (1000, 10000)
+MB = 1024 * 1024
+TOLERANCE = 1 * MB
+
+
+def _render(size):
+    """The same page, materialized as the regular list view would."""
+    request = Request(RequestFactory().get('/api/public/products/'))
+    products = Product.objects.select_related('shop').order_by('-created_at', '-id')[:size]
+    data = ProductPublicSerializer(products, many=True, context={'request': request}).data
+    return JSONRenderer().render(data)
+
+
+@override_settings(PUBLIC_STREAM_MAX_PAGE_SIZE=max(SIZES))
+class StreamingMemoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        shop = testing.create_seller('flux').shop
+        testing.create_products([shop], max(SIZES), fields=lambda i: {
+            'description': 'Description ' * 5, 'price': 10 + i,
+        })
+
+    def tearDown(self):
+        testing.clear_caches()
+
+    def _streamed_peak(self, size):
+        testing.clear_caches()
+        tracemalloc.start()
+        try:
+            response = self.client.get(f'/api/public/products/?stream=1&page_size={size}')
+            for _chunk in response.streaming_content:
+                pass
+            return response.status_code, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_streaming_peak_does_not_grow_with_page_size(self):
+        peaks = []
+        for size in SIZES:
+            status, peak = self._streamed_peak(size)
+            self.assertEqual(status, 200)
+            peaks.append(peak)
+        growth = peaks[-1] - peaks[0]
+        self.assertLessEqual(
+            growth, TOLERANCE,
+            f'streaming peak grows with N: {growth / MB:+.2f} MB between N={SIZES[0]} and N={SIZES[-1]}',
+        )
+
+    def test_streamed_body_matches_rendered_page(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                testing.clear_caches()
+                response = self.client.get(f'/api/public/products/?stream=1&page_size={size}')
+                streamed = b''.join(response.streaming_content)
+                self.assertEqual(json.loads(streamed), json.loads(_render(size)))
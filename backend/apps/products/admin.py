@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Product
+from apps.core.cache import CATALOG_SCOPE, bump_versions, shop_scope
+from .models import Product, ProductImport
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
@@ -24,11 +25,14 @@ class ProductAdmin(admin.ModelAdmin):
         'name',
         'description',
         'shop__user__email',
-        'shop__user__shop_name'
+        'shop__name'
     )
 
     ordering = ('-created_at',)
 
+    # get_user_email lit shop.user sur chaque ligne de la liste
+    list_select_related = ('shop__user',)
+
     list_editable = (
         'status',
         'is_active'
@@ -53,14 +57,30 @@ class ProductAdmin(admin.ModelAdmin):
     get_user_email.short_description = 'Utilisateur'
 
     # 🔥 Actions rapides SaaS
+    def _set_status(self, queryset, status):
+        # update() n'envoie pas post_save : invalider le cache des boutiques touchées.
+        shop_ids = set(queryset.values_list('shop_id', flat=True))
+        queryset.update(status=status)
+        bump_versions(CATALOG_SCOPE, *(shop_scope(shop_id) for shop_id in shop_ids))
+
     def make_published(self, request, queryset):
-        queryset.update(status='published')
+        self._set_status(queryset, 'published')
     make_published.short_description = "Publier les produits sélectionnés"
 
     def make_draft(self, request, queryset):
-        queryset.update(status='draft')
+        self._set_status(queryset, 'draft')
     make_draft.short_description = "Mettre en brouillon"
 
     def make_archived(self, request, queryset):
-        queryset.update(status='archived')
+        self._set_status(queryset, 'archived')
     make_archived.short_description = "Archiver les produits"
+
+
+
+@admin.register(ProductImport)
+class ProductImportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'shop', 'source_name', 'status', 'processed_rows', 'total_rows', 'created_count',
+                    'error_count', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('shop',)
+    readonly_fields = [field.name for field in ProductImport._meta.fields]
@@ -0,0 +1,242 @@
+"""
+Bulk catalog import and export for sellers.
+
+Import: the uploaded file (CSV with a header row, JSON Lines, or a JSON
+array) is spooled to a temporary file and a ProductImport job is created.
+After commit, the job runs on a daemon thread (PRODUCT_IMPORT_MODE =
+'thread', the default) or inline ('sync'). Rows are read as a stream,
+validated PRODUCT_IMPORT_CHUNK_SIZE at a time and written with one
+bulk_create per chunk, slugs being allocated for the whole chunk at once
+(apps.core.slugs). Progress is saved after every chunk. Images are not
+uploaded: an `image_url` column is stored as the delivery URL.
+
+Export: the shop's catalog, streamed as CSV or JSON Lines from a server-side
+iterator, with the columns the import reads back.
+"""
+import csv
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.core.cache import CATALOG_SCOPE, bump_versions, shop_scope
+from apps.core.slugs import bulk_create_with_unique_slugs
+from apps.stats.rollups import bump_stats_versions
+from .models import Product, ProductImport
+from .serializers import ProductImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+FORMAT_JSON = 'json'
+
+EXTENSIONS = {
+    '.csv': FORMAT_CSV,
+    '.jsonl': FORMAT_JSONL,
+    '.ndjson': FORMAT_JSONL,
+    '.json': FORMAT_JSON,
+}
+
+EXPORT_FIELDS = ['slug', 'name', 'description', 'price', 'status', 'is_active', 'image_url', 'created_at']
+
+# Rejected rows detailed in ProductImport.errors (the others are only counted).
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFileError(ValueError):
+    """The file cannot be read at all (format, encoding, size)."""
+
+
+def detect_format(filename):
+    return EXTENSIONS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def spool_upload(upload, source_format):
+    """Copy an uploaded file to a temporary path the job thread can read."""
+    handle = tempfile.NamedTemporaryFile(prefix='linkcontact-import-', suffix=f'.{source_format}', delete=False)
+    with handle:
+        for chunk in upload.chunks():
+            handle.write(chunk)
+    return handle.name
+
+
+def read_rows(path, source_format):
+    """Yield (line number, row dict) from an import file, streaming CSV and JSON Lines."""
+    with open(path, encoding='utf-8-sig', newline='') as handle:
+        if source_format == FORMAT_CSV:
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row
+        elif source_format == FORMAT_JSONL:
+            for line_num, line in enumerate(handle, start=1):
+                if line.strip():
+                    yield line_num, _json_object(line)
+        else:
+            try:
+                rows = json.load(handle)
+            except ValueError as exc:
+                raise ImportFileError(f'JSON invalide : {exc}')
+            if not isinstance(rows, list):
+                raise ImportFileError('Le fichier JSON doit contenir une liste de produits.')
+            for index, row in enumerate(rows, start=1):
+                yield index, row
+
+
+def _json_object(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def count_rows(path, source_format):
+    """Number of rows, reading the whole file once: unreadable files fail here."""
+    try:
+        return sum(1 for _ in read_rows(path, source_format))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f'Fichier illisible (CSV UTF-8 attendu) : {exc}')
+
+
+def _clean(row):
+    """Row as serializer input: empty CSV cells count as missing."""
+    if not isinstance(row, dict):
+        return None
+    return {key: value for key, value in row.items() if key and value not in ('', None)}
+
+
+def import_chunk(shop, rows):
+    """
+    Validate (line, row) pairs and bulk-create the valid ones for `shop`.
+    Returns (created, [{'line': n, 'errors': {...}}, ...]).
+    """
+    products, bases, errors = [], [], []
+    for line, row in rows:
+        data = _clean(row)
+        if data is None:
+            errors.append({'line': line, 'errors': {'non_field_errors': ['Ligne illisible.']}})
+            continue
+        serializer = ProductImportRowSerializer(data=data)
+        if not serializer.is_valid():
+            errors.append({'line': line, 'errors': serializer.errors})
+            continue
+        values = serializer.validated_data
+        image_url = values['image_url']
+        products.append(Product(
+            shop=shop,
+            name=values['name'],
+            description=values['description'],
+            price=values['price'],
+            status=values['status'],
+            is_active=values['is_active'],
+            image_url=image_url,
+            image_thumb_url=image_url,
+            image_medium_url=image_url,
+        ))
+        bases.append(values['slug'] or values['name'])
+    if products:
+        bulk_create_with_unique_slugs(Product, products, [slugify(base) for base in bases], fallback='produit')
+        # bulk_create sends no post_save: invalidate the cached responses and
+        # the dashboard ETag (total_products) here, in the chunk's transaction.
+        bump_versions(shop_scope(shop.pk), CATALOG_SCOPE)
+        bump_stats_versions([shop.pk])
+    return len(products), errors
+
+
+def run_import(job_id, path):
+    """Process a ProductImport job from its spooled file, then delete the file."""
+    job = ProductImport.objects.select_related('shop').get(pk=job_id)
+    chunk_size = getattr(settings, 'PRODUCT_IMPORT_CHUNK_SIZE', 500)
+    try:
+        job.total_rows = count_rows(path, job.source_format)
+        max_rows = getattr(settings, 'PRODUCT_IMPORT_MAX_ROWS', 50000)
+        if job.total_rows > max_rows:
+            raise ImportFileError(f'Trop de lignes ({job.total_rows}), maximum {max_rows} par import.')
+        job.status = ProductImport.STATUS_RUNNING
+        job.save(update_fields=['total_rows', 'status'])
+
+        chunk = []
+        for line, row in read_rows(path, job.source_format):
+            chunk.append((line, row))
+            if len(chunk) >= chunk_size:
+                _import_and_record(job, chunk)
+                chunk = []
+        if chunk:
+            _import_and_record(job, chunk)
+        job.status = ProductImport.STATUS_DONE
+    except ImportFileError as exc:
+        job.status = ProductImport.STATUS_FAILED
+        job.errors = (job.errors + [{'line': None, 'errors': {'non_field_errors': [str(exc)]}}])[:MAX_REPORTED_ERRORS]
+    except Exception:
+        logger.exception('Import de produits %s interrompu', job_id)
+        job.status = ProductImport.STATUS_FAILED
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'errors', 'finished_at'])
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return job
+
+
+def _import_and_record(job, chunk):
+    with transaction.atomic():
+        created, errors = import_chunk(job.shop, chunk)
+        job.processed_rows += len(chunk)
+        job.created_count += created
+        job.error_count += len(errors)
+        job.errors = (job.errors + errors)[:MAX_REPORTED_ERRORS]
+        job.save(update_fields=['processed_rows', 'created_count', 'error_count', 'errors'])
+
+
+def start_import(job, path):
+    """Run the job once the current transaction commits, on a thread unless PRODUCT_IMPORT_MODE is 'sync'."""
+    if getattr(settings, 'PRODUCT_IMPORT_MODE', 'thread') == 'sync':
+        transaction.on_commit(lambda: run_import(job.pk, path))
+        return
+
+    def work():
+        try:
+            run_import(job.pk, path)
+        finally:
+            connections.close_all()
+
+    transaction.on_commit(
+        lambda: threading.Thread(target=work, name=f'product-import-{job.pk}', daemon=True).start()
+    )
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(shop_id, export_format=FORMAT_CSV, chunk_size=1000):
+    """Yield the shop's catalog as CSV or JSON Lines text, one line at a time."""
+    rows = (
+        Product.objects.filter(shop_id=shop_id).order_by('id')
+        .values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    )
+    if export_format == FORMAT_JSONL:
+        for values in rows:
+            item = dict(zip(EXPORT_FIELDS, values))
+            item['price'] = str(item['price'])
+            item['created_at'] = item['created_at'].isoformat()
+            yield json.dumps(item, ensure_ascii=False) + '\n'
+        return
+    writer = csv.writer(_Echo())
+    created_at = EXPORT_FIELDS.index('created_at')
+    yield writer.writerow(EXPORT_FIELDS)
+    for values in rows:
+        values = list(values)
+        values[created_at] = values[created_at].isoformat()
+        yield writer.writerow(values)
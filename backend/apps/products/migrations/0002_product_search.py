@@ -0,0 +1,57 @@
+"""
+Full-text search index for products (see apps.products.search):
+a generated tsvector column + GIN index on PostgreSQL, an FTS5 table
+kept in sync by triggers on SQLite.
+"""
+from django.db import DatabaseError, migrations, transaction
+
+from apps.products.search import (
+    FTS_TABLE, PG_SEARCH_VECTOR, PG_UNACCENT_MAPPING, SQLITE_TRIGGERS, TABLE, TS_CONFIG, install_sqlite_fts,
+)
+
+
+def _try_unaccent(schema_editor):
+    """Make TS_CONFIG accent-insensitive if the unaccent extension can be installed."""
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+            schema_editor.execute(PG_UNACCENT_MAPPING)
+    except DatabaseError:
+        pass
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE TEXT SEARCH CONFIGURATION {TS_CONFIG} (COPY = pg_catalog.french)')
+        _try_unaccent(schema_editor)
+        schema_editor.execute(
+            f'ALTER TABLE {TABLE} ADD COLUMN search_vector tsvector '
+            f'GENERATED ALWAYS AS ({PG_SEARCH_VECTOR}) STORED'
+        )
+        schema_editor.execute(f'CREATE INDEX {TABLE}_search_gin ON {TABLE} USING gin (search_vector)')
+    elif connection.vendor == 'sqlite':
+        install_sqlite_fts(connection)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TABLE}_search_gin')
+        schema_editor.execute(f'ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector')
+        schema_editor.execute(f'DROP TEXT SEARCH CONFIGURATION IF EXISTS {TS_CONFIG}')
+    elif connection.vendor == 'sqlite':
+        for trigger in SQLITE_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+def fill_image_urls(apps, schema_editor):
+    from apps.core.images import backfill_image_urls
+    Product = apps.get_model('products', 'Product')
+    backfill_image_urls(Product.objects.exclude(image='').exclude(image__isnull=True), 'image', 'image')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_url',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_thumb_url',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_medium_url',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_srcset',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_image_urls, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def publish_existing_drafts(apps, schema_editor):
+    """
+    Public lists now show published products only, but `status` defaulted
+    to draft and the seller form never set it: before this release every
+    product was listed whatever its status. Publish those drafts so the
+    marketplace and shop pages keep showing them; is_active is untouched.
+    """
+    Product = apps.get_model('products', 'Product')
+    Product.objects.filter(status='draft').update(status='published')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_visible_indexes'),
+    ]
+
+    operations = [
+        # Not reversible: drafts and products published on purpose are indistinguishable afterwards.
+        migrations.RunPython(publish_existing_drafts, migrations.RunPython.noop),
+    ]
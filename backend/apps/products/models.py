@@ -6,11 +6,22 @@ V1 Production Ready - SaaS Architecture
 from django.db import models
 from django.utils.text import slugify
 
+from apps.core.db import keep_counter_columns
+from apps.core.images import URL_MAX_LENGTH, refresh_image_urls, url_columns
+from apps.core.slugs import save_with_unique_slug
+
 
 def product_image_path(instance, filename):
     return f'products/{instance.shop.id}/{filename}'
 
 
+class ProductQuerySet(models.QuerySet):
+
+    def visible(self):
+        """Products shown on public pages: published and active."""
+        return self.filter(status='published', is_active=True)
+
+
 class Product(models.Model):
     """
     Product published inside a Shop.
@@ -49,6 +60,13 @@ class Product(models.Model):
         null=True
     )
 
+    # URLs de livraison calculées à l'upload (apps.core.images) :
+    # les listes les lisent directement, sans passer par le stockage.
+    image_url = models.CharField(max_length=URL_MAX_LENGTH, blank=True, editable=False)
+    image_thumb_url = models.CharField(max_length=URL_MAX_LENGTH, blank=True, editable=False)
+    image_medium_url = models.CharField(max_length=URL_MAX_LENGTH, blank=True, editable=False)
+    image_srcset = models.TextField(blank=True, editable=False)
+
     status = models.CharField(
         max_length=10,
         choices=STATUS_CHOICES,
@@ -63,30 +81,109 @@ class Product(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['slug']),
             models.Index(fields=['status']),
-            models.Index(fields=['created_at']),
+            # Tri complet (created_at, id) : listes admin, sans tri supplémentaire.
+            models.Index(fields=['created_at', 'id'], name='product_created_idx'),
+            # Produits d'une boutique, du plus récent au plus ancien (pages boutique, dashboard).
+            models.Index(fields=['shop', 'created_at', 'id'], name='product_shop_created_idx'),
+            # Catalogue public (marketplace) : seules les lignes visibles sont indexées.
+            models.Index(
+                fields=['created_at', 'id'], name='product_visible_created_idx',
+                condition=models.Q(status='published', is_active=True),
+            ),
+            models.Index(
+                fields=['views_count', 'created_at', 'id'], name='product_visible_popular_idx',
+                condition=models.Q(status='published', is_active=True),
+            ),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Image as loaded, to recompute the URL columns only when it changes.
+        instance._loaded_image = instance.__dict__.get('image') or ''
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Auto generate unique slug.
         """
-        if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
+        if refresh_image_urls(self, 'image', 'image') and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *url_columns('image')}
+
+        keep_counter_columns(self, args, kwargs, 'views_count')
 
-            while Product.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
+        if self.slug:
+            return super().save(*args, **kwargs)
 
+        def write(slug):
             self.slug = slug
+            super(Product, self).save(*args, **kwargs)
 
-        super().save(*args, **kwargs)
+        save_with_unique_slug(Product, slugify(self.name), write, exclude_pk=self.pk, fallback='produit')
 
     def __str__(self):
         return f"{self.name} - Shop {self.shop_id}"
+
+
+class ProductImport(models.Model):
+    """
+    Bulk catalog import job of a shop (apps.products.bulk), polled by the
+    seller for progress.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    shop = models.ForeignKey(
+        'shops.Shop',
+        on_delete=models.CASCADE,
+        related_name='product_imports'
+    )
+
+    source_name = models.CharField(max_length=255, blank=True)
+
+    source_format = models.CharField(max_length=10)
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+
+    # Lignes de données du fichier, connues après un premier passage rapide.
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+
+    processed_rows = models.PositiveIntegerField(default=0)
+
+    created_count = models.PositiveIntegerField(default=0)
+
+    error_count = models.PositiveIntegerField(default=0)
+
+    # Détail des premières lignes rejetées : [{"line": 12, "errors": {...}}, ...]
+    errors = models.JSONField(default=list, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import {self.pk} - Shop {self.shop_id} ({self.status})"
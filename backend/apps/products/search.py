@@ -0,0 +1,121 @@
+"""
+Full-text product search.
+
+PostgreSQL: `products_product.search_vector` is a stored tsvector column
+generated from name (weight A) and description (weight B), so it is kept
+up to date on every write, bulk ones included. A GIN index answers
+`search_vector @@ websearch_to_tsquery(...)` and matches are ranked with
+ts_rank_cd. The `linkcontact_fr` text search configuration is the French
+one, accent-insensitive when the unaccent extension is available.
+
+SQLite (dev/tests): an FTS5 external-content table, products_product_fts,
+kept in sync by triggers and ranked with bm25().
+
+Both are created by migration products.0002. Neither column is declared on
+the model: Django never reads nor writes them.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+TABLE = 'products_product'
+FTS_TABLE = 'products_product_fts'
+TS_CONFIG = 'linkcontact_fr'
+
+PG_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{TS_CONFIG}'::regconfig, coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{TS_CONFIG}'::regconfig, coalesce(description, '')), 'B')"
+)
+
+PG_UNACCENT_MAPPING = (
+    f'ALTER TEXT SEARCH CONFIGURATION {TS_CONFIG} '
+    'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem'
+)
+
+SQLITE_FTS_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"name, description, content='{TABLE}', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON {TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+]
+
+SQLITE_TRIGGERS = (f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def install_sqlite_fts(conn=None):
+    """
+    Create the FTS5 table and its triggers if missing, and reindex when a
+    trigger had to be (re)created. Idempotent: SQLite drops triggers when
+    Django rebuilds products_product during a later migration, so this
+    also runs after every `migrate` (see apps.products.signals).
+    """
+    conn = conn or connection
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            list(SQLITE_TRIGGERS),
+        )
+        missing = set(SQLITE_TRIGGERS) - {row[0] for row in cursor.fetchall()}
+        if not missing:
+            return False
+        for statement in SQLITE_FTS_STATEMENTS:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def _fts5_query(text):
+    """Terms of `text` as quoted FTS5 strings, all required."""
+    return ' '.join(f'"{word}"' for word in _WORD.findall(text))
+
+
+def search_products(queryset, text):
+    """
+    Restrict `queryset` (Products) to matches of `text`, annotated with a
+    `rank` where higher is more relevant.
+    """
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{TS_CONFIG}'::regconfig, %s)"
+        return queryset.filter(
+            RawSQL(f'"{TABLE}"."search_vector" @@ {tsquery}', [text], output_field=BooleanField())
+        ).annotate(
+            # float8, so a rank read back from a pagination cursor compares equal.
+            rank=RawSQL(
+                f'ts_rank_cd("{TABLE}"."search_vector", {tsquery})::float8',
+                [text], output_field=FloatField(),
+            )
+        )
+    if vendor == 'sqlite':
+        match = _fts5_query(text)
+        if not match:
+            return queryset.annotate(rank=RawSQL('0', [], output_field=FloatField())).none()
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            # bm25() is lower for better matches.
+            rank=RawSQL(
+                f'(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{TABLE}"."id")',
+                [match], output_field=FloatField(),
+            )
+        )
+    # Other backends: unindexed, unranked.
+    match = Q()
+    for word in _WORD.findall(text):
+        match &= Q(name__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(match).annotate(rank=RawSQL('0', [], output_field=FloatField()))
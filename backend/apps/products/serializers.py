@@ -1,45 +1,42 @@
 """
 Serializers for products app.
 """
-import logging
 from rest_framework import serializers
-from .models import Product
 
-logger = logging.getLogger(__name__)
+from apps.core.fieldsets import SparseFieldsetMixin
+from apps.core.images import StoredURLField
+from .models import Product, ProductImport
 
 
 class ProductSerializer(serializers.ModelSerializer):
-    """CRUD - products for authenticated user. Image as full URL."""
-    image = serializers.SerializerMethodField()
+    """
+    CRUD - products for authenticated user. Image as full URL, plus the
+    thumbnail / medium variants and a srcset, all precomputed at upload.
+    """
+    image = StoredURLField(source='image_url')
+    image_thumb = StoredURLField(source='image_thumb_url')
+    image_medium = StoredURLField(source='image_medium_url')
+    image_srcset = StoredURLField()
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'price', 'image', 'created_at']
+        fields = ['id', 'name', 'description', 'price', 'image', 'image_thumb', 'image_medium', 'image_srcset',
+                  'status', 'is_active', 'created_at']
         read_only_fields = ['created_at']
 
-    def get_image(self, obj):
-        if obj.image:
-            try:
-                url = obj.image.url
-                # Cloudinary URLs are usually absolute http/https
-                if url.startswith('http'):
-                    return url.strip()
-                
-                request = self.context.get('request')
-                if request:
-                    return request.build_absolute_uri(url)
-                return url
-            except Exception as e:
-                logger.error(f"Error getting image URL in ProductSerializer: {e}")
-                return None
-        return None
-
 
 class ProductCreateUpdateSerializer(serializers.ModelSerializer):
-    """POST/PUT - multipart/form-data, image required on create."""
+    """
+    POST/PUT - multipart/form-data, image required on create. Products
+    created here are published (listed publicly) unless `status` says
+    otherwise.
+    """
+    status = serializers.ChoiceField(choices=Product.STATUS_CHOICES, default='published')
+    is_active = serializers.BooleanField(default=True)
+
     class Meta:
         model = Product
-        fields = ['name', 'description', 'price', 'image']
+        fields = ['name', 'description', 'price', 'image', 'status', 'is_active']
 
     def validate_image(self, value):
         if not value and not self.instance:
@@ -47,31 +44,48 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class ProductPublicSerializer(serializers.ModelSerializer):
-    """Public product list - full image URL."""
-    image = serializers.SerializerMethodField()
+class ProductPublicSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Public product list - image URLs read from the precomputed columns.
+    ?fields= selects fields; `card` is what a marketplace card displays.
+    """
+    image = StoredURLField(source='image_url')
+    image_thumb = StoredURLField(source='image_thumb_url')
+    image_medium = StoredURLField(source='image_medium_url')
+    image_srcset = StoredURLField()
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'price', 'image', 'shop_name', 'shop_slug', 'shop_whatsapp']
+        fields = ['id', 'name', 'description', 'price', 'image', 'image_thumb', 'image_medium', 'image_srcset',
+                  'shop_name', 'shop_slug', 'shop_whatsapp']
+        projections = {
+            'card': ['id', 'name', 'price', 'image', 'image_medium', 'image_srcset',
+                     'shop_name', 'shop_slug', 'shop_whatsapp'],
+        }
 
     shop_name = serializers.CharField(source='shop.name', read_only=True)
     shop_slug = serializers.CharField(source='shop.slug', read_only=True)
     shop_whatsapp = serializers.CharField(source='shop.whatsapp_number', read_only=True)
 
-    def get_image(self, obj):
-        if obj.image:
-            try:
-                url = obj.image.url
-                # Cloudinary URLs are usually absolute http/https
-                if url.startswith('http'):
-                    return url.strip()
-                
-                request = self.context.get('request')
-                if request:
-                    return request.build_absolute_uri(url)
-                return url
-            except Exception as e:
-                logger.error(f"Error getting image URL in ProductPublicSerializer: {e}")
-                return None
-        return None
+
+class ProductImportRowSerializer(serializers.Serializer):
+    """One row of a bulk import file (CSV column or JSON key per field); published by default, as in the seller API."""
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=14, decimal_places=2, min_value=0)
+    status = serializers.ChoiceField(choices=Product.STATUS_CHOICES, required=False, default='published')
+    is_active = serializers.BooleanField(required=False, default=True)
+    # Image déjà hébergée : l'URL est stockée telle quelle, sans upload.
+    image_url = serializers.URLField(max_length=500, required=False, allow_blank=True, default='')
+    # Base du slug (sinon le nom) ; un suffixe est ajouté s'il est pris.
+    slug = serializers.SlugField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    """GET /api/products/import/{id}/ - progress of a bulk import."""
+
+    class Meta:
+        model = ProductImport
+        fields = ['id', 'status', 'source_name', 'source_format', 'total_rows', 'processed_rows',
+                  'created_count', 'error_count', 'errors', 'created_at', 'finished_at']
+        read_only_fields = fields
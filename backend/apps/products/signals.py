@@ -0,0 +1,26 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from apps.core.cache import CATALOG_SCOPE, bump_versions, shop_scope
+from apps.products.models import Product
+from apps.products.search import FTS_TABLE, install_sqlite_fts
+
+
+@receiver(post_migrate)
+def restore_sqlite_search_triggers(sender, using='default', plan=None, **kwargs):
+    # SQLite supprime les triggers FTS quand une migration reconstruit
+    # products_product : on les recrée (et on réindexe) après chaque migrate.
+    connection = connections[using]
+    if sender.name != 'apps.products' or not plan or connection.vendor != 'sqlite':
+        return
+    if FTS_TABLE in connection.introspection.table_names():
+        install_sqlite_fts(connection)
+
+
+# Invalide les réponses publiques en cache de la boutique et du catalogue.
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def bump_product_cache_versions(sender, instance, **kwargs):
+    bump_versions(shop_scope(instance.shop_id), CATALOG_SCOPE)
@@ -1,8 +1,15 @@
 from django.urls import path
-from .views import ProductListCreateView, ProductDetailView, PublicProductListView
+from .views import (
+    ProductListCreateView, ProductDetailView, PublicProductListView, PublicProductSearchView,
+    ProductImportView, ProductImportDetailView, ProductExportView,
+)
 
 urlpatterns = [
     path('products/', ProductListCreateView.as_view()),
     path('products/<int:pk>/', ProductDetailView.as_view()),
+    path('products/import/', ProductImportView.as_view()),
+    path('products/import/<int:pk>/', ProductImportDetailView.as_view()),
+    path('products/export/', ProductExportView.as_view()),
     path('public/products/', PublicProductListView.as_view()),
+    path('public/products/search/', PublicProductSearchView.as_view()),
 ]
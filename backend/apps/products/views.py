@@ -5,11 +5,20 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
-from .models import Product
-from .serializers import ProductSerializer, ProductCreateUpdateSerializer, ProductPublicSerializer
-from apps.shops.models import Shop
+from apps.accounts.authentication import get_request_shop
+from apps.core.cache import CATALOG_SCOPE, POPULARITY_SCOPE, cached_response
+from apps.core.fieldsets import project_queryset, requested_fields
+from apps.core.pagination import KeysetPagination
+from apps.core.streaming import streaming_page_response, wants_stream
+from . import bulk
+from .models import Product, ProductImport
+from .search import search_products
+from .serializers import (
+    ProductSerializer, ProductCreateUpdateSerializer, ProductPublicSerializer, ProductImportSerializer,
+)
 
 
 class ProductListCreateView(APIView):
@@ -17,8 +26,8 @@ class ProductListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Get current user's shop and list products for that shop
-        shop = get_object_or_404(Shop, user=request.user)
+        # Current user's shop (loaded with the user by the authentication) and its products
+        shop = get_request_shop(request)
         products = Product.objects.filter(shop=shop)
         return Response(ProductSerializer(products, many=True, context={'request': request}).data)
 
@@ -27,7 +36,7 @@ class ProductListCreateView(APIView):
         if not ser.is_valid():
             return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
         # Associate created product with the user's shop
-        shop = get_object_or_404(Shop, user=request.user)
+        shop = get_request_shop(request)
         ser.save(shop=shop)
         return Response(ProductSerializer(ser.instance, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
@@ -62,10 +71,129 @@ class ProductDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def public_products(queryset, fields, ordering):
+    """
+    `queryset` ready for ProductPublicSerializer(fields=fields): shop joined
+    for the full representation, only the needed columns for a ?fields=
+    selection (plus the `ordering` keys the paginator reads).
+    """
+    if fields is None:
+        # ProductPublicSerializer reads shop.name/slug/whatsapp_number on every row.
+        return queryset.select_related('shop')
+    return project_queryset(queryset, ProductPublicSerializer(fields=fields), ordering)
+
+
 class PublicProductListView(APIView):
-    """GET /api/public/products/ - public list of all products."""
+    """
+    GET /api/public/products/ - public list of visible products (published
+    and active), newest first, paginated by keyset (?cursor=, ?page_size=,
+    next page in the Link header).
+    ?ordering=popular sorts by views_count (live counter, no aggregation).
+    Served from the versioned response cache (apps.core.cache), except
+    ?stream=1: large pages streamed row by row (apps.core.streaming).
+    """
+    permission_classes = []  # Public access
+
+    def get(self, request):
+        if request.query_params.get('ordering') == 'popular':
+            ordering = ('-views_count', '-created_at', '-id')
+            scopes = [CATALOG_SCOPE, POPULARITY_SCOPE]
+        else:
+            ordering = ('-created_at', '-id')
+            scopes = [CATALOG_SCOPE]
+
+        fields = requested_fields(request, ProductPublicSerializer)
+        queryset = public_products(Product.objects.visible(), fields, [key.lstrip('-') for key in ordering])
+
+        if wants_stream(request):
+            return streaming_page_response(
+                request, queryset,
+                ProductPublicSerializer(context={'request': request}, fields=fields).to_representation, ordering,
+            )
+
+        def build():
+            paginator = KeysetPagination(ordering=ordering)
+            products = paginator.paginate_queryset(queryset, request)
+            return paginator.get_paginated_response(
+                ProductPublicSerializer(products, many=True, context={'request': request}, fields=fields).data
+            )
+
+        return cached_response(self, request, scopes, build)
+
+
+class PublicProductSearchView(APIView):
+    """
+    GET /api/public/products/search/?q= - full-text search over visible
+    products' name and description, most relevant first, keyset-paginated
+    like /api/public/products/.
+    """
     permission_classes = []  # Public access
 
     def get(self, request):
-        products = Product.objects.all().order_by('-created_at')
-        return Response(ProductPublicSerializer(products, many=True, context={'request': request}).data)
+        query = (request.query_params.get('q') or '').strip()
+        if not query:
+            return Response({'q': 'Paramètre de recherche requis.'}, status=status.HTTP_400_BAD_REQUEST)
+        fields = requested_fields(request, ProductPublicSerializer)
+        paginator = KeysetPagination(ordering=('-rank', '-id'))
+        products = paginator.paginate_queryset(
+            search_products(public_products(Product.objects.visible(), fields, ['id']), query), request,
+        )
+        return paginator.get_paginated_response(
+            ProductPublicSerializer(products, many=True, context={'request': request}, fields=fields).data
+        )
+
+
+class ProductImportView(APIView):
+    """
+    POST /api/products/import/ - bulk import (multipart, `file`: .csv,
+    .jsonl or .json), processed in the background; 202 with the job.
+    GET - the shop's latest imports.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        shop = get_request_shop(request)
+        jobs = ProductImport.objects.filter(shop=shop)[:20]
+        return Response(ProductImportSerializer(jobs, many=True).data)
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['Fichier requis.']}, status=status.HTTP_400_BAD_REQUEST)
+        source_format = bulk.detect_format(upload.name)
+        if source_format is None:
+            return Response(
+                {'file': ['Format non supporté : .csv, .jsonl ou .json attendu.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        shop = get_request_shop(request)
+        path = bulk.spool_upload(upload, source_format)
+        job = ProductImport.objects.create(shop=shop, source_name=upload.name[:255], source_format=source_format)
+        bulk.start_import(job, path)
+        return Response(ProductImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ProductImportDetailView(APIView):
+    """GET /api/products/import/{id}/ - progress and rejected rows of an import."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(ProductImport, pk=pk, shop__user=request.user)
+        return Response(ProductImportSerializer(job).data)
+
+
+class ProductExportView(APIView):
+    """GET /api/products/export/?type=csv|jsonl - the seller's catalog, streamed."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        shop = get_request_shop(request)
+        export_format = request.query_params.get('type', bulk.FORMAT_CSV)
+        if export_format not in (bulk.FORMAT_CSV, bulk.FORMAT_JSONL):
+            return Response({'type': ['csv ou jsonl.']}, status=status.HTTP_400_BAD_REQUEST)
+        content_type = 'text/csv' if export_format == bulk.FORMAT_CSV else 'application/x-ndjson'
+        response = StreamingHttpResponse(
+            bulk.export_rows(shop.pk, export_format), content_type=f'{content_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{shop.slug or "catalogue"}.{export_format}"'
+        return response
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+def fill_logo_urls(apps, schema_editor):
+    from apps.core.images import backfill_image_urls
+    Shop = apps.get_model('shops', 'Shop')
+    backfill_image_urls(Shop.objects.exclude(logo='').exclude(logo__isnull=True), 'logo', 'logo')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0002_shop_whatsapp_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shop',
+            name='logo_url',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='shop',
+            name='logo_thumb_url',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='shop',
+            name='logo_medium_url',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='shop',
+            name='logo_srcset',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_logo_urls, migrations.RunPython.noop),
+    ]
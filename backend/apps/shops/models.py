@@ -6,6 +6,10 @@ from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
 
+from apps.core.db import keep_counter_columns
+from apps.core.images import URL_MAX_LENGTH, refresh_image_urls, url_columns
+from apps.core.slugs import save_with_unique_slug
+
 from django.core.validators import RegexValidator
 
 phone_validator = RegexValidator(
@@ -40,6 +44,13 @@ class Shop(models.Model):
         blank=True,
         null=True
     )
+
+    # URLs de livraison du logo calculées à l'upload (apps.core.images).
+    logo_url = models.CharField(max_length=URL_MAX_LENGTH, blank=True, editable=False)
+    logo_thumb_url = models.CharField(max_length=URL_MAX_LENGTH, blank=True, editable=False)
+    logo_medium_url = models.CharField(max_length=URL_MAX_LENGTH, blank=True, editable=False)
+    logo_srcset = models.TextField(blank=True, editable=False)
+
     whatsapp_number = models.CharField(
     max_length=20,
     blank=True,
@@ -64,22 +75,40 @@ class Shop(models.Model):
             models.Index(fields=['created_at']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Slug as loaded, to invalidate the slug resolver when it changes.
+        instance._loaded_slug = instance.__dict__.get('slug')
+        # Logo as loaded, to recompute the URL columns only when it changes.
+        instance._loaded_logo = instance.__dict__.get('logo') or ''
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Auto-generate slug if missing.
         """
-        if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-
-            while Shop.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-
-            self.slug = slug
-
-        super().save(*args, **kwargs)
+        if refresh_image_urls(self, 'logo', 'logo') and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *url_columns('logo')}
+
+        keep_counter_columns(self, args, kwargs, 'views_count')
+
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            def write(slug):
+                self.slug = slug
+                super(Shop, self).save(*args, **kwargs)
+
+            save_with_unique_slug(Shop, slugify(self.name), write, exclude_pk=self.pk, fallback='boutique')
+
+        loaded_slug = getattr(self, '_loaded_slug', None)
+        if loaded_slug != self.slug:
+            from .resolver import invalidate_slugs
+            from .slug_index import slug_changed
+            invalidate_slugs(loaded_slug, self.slug)
+            slug_changed(loaded_slug, self.slug)
+            self._loaded_slug = self.slug
 
     def __str__(self):
         return self.name
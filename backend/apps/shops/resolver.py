@@ -0,0 +1,86 @@
+"""
+Slug -> shop id resolution shared by the public, slug-addressed endpoints.
+
+A miss costs one lookup on the unique `shops_shop.slug` index; the answer
+is kept in a bounded per-process LRU with a TTL. Entries are dropped as
+soon as a slug changes in this process (see Shop.save / User.save); other
+workers converge within SHOP_RESOLVER_TTL. "No such shop" is kept only
+SHOP_RESOLVER_NOT_FOUND_TTL seconds, so that a shop registered or renamed
+on another worker is found quickly.
+"""
+from django.conf import settings
+
+from apps.core.lru import TTLCache
+from .models import Shop
+
+# Cached marker for slugs that match no shop (shop ids start at 1).
+_NOT_FOUND = 0
+
+_cache = TTLCache(
+    maxsize=getattr(settings, 'SHOP_RESOLVER_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'SHOP_RESOLVER_TTL', 300),
+)
+
+
+def _remember(slug, shop_id):
+    if shop_id:
+        _cache.set(slug, shop_id)
+    else:
+        _cache.set(slug, _NOT_FOUND, ttl=getattr(settings, 'SHOP_RESOLVER_NOT_FOUND_TTL', 5))
+
+
+def resolve_shop_id(slug):
+    """Return the id of the shop published under `slug`, or None (also for a non-str `slug`)."""
+    if not slug or not isinstance(slug, str):
+        return None
+    shop_id = _cache.get(slug)
+    if shop_id is None:
+        ids = list(Shop.objects.filter(slug=slug).order_by().values_list('id', flat=True)[:1])
+        shop_id = ids[0] if ids else _NOT_FOUND
+        _remember(slug, shop_id)
+    return shop_id or None
+
+
+async def aresolve_shop_id(slug):
+    """Async variant of resolve_shop_id, using the async ORM on a miss."""
+    if not slug or not isinstance(slug, str):
+        return None
+    shop_id = _cache.get(slug)
+    if shop_id is None:
+        shop_id = await Shop.objects.filter(slug=slug).order_by().values_list('id', flat=True).afirst()
+        shop_id = shop_id or _NOT_FOUND
+        _remember(slug, shop_id)
+    return shop_id or None
+
+
+def resolve_shop_ids(slugs):
+    """
+    Resolve many slugs at once: {slug: shop_id} for the slugs that match a
+    shop. Cache misses are fetched together in a single `slug IN (...)` query.
+    """
+    resolved, missing = {}, []
+    for slug in set(slugs):
+        if not slug:
+            continue
+        shop_id = _cache.get(slug)
+        if shop_id is None:
+            missing.append(slug)
+        elif shop_id:
+            resolved[slug] = shop_id
+    if missing:
+        found = dict(Shop.objects.filter(slug__in=missing).values_list('slug', 'id'))
+        for slug in missing:
+            shop_id = found.get(slug, _NOT_FOUND)
+            _remember(slug, shop_id)
+            if shop_id:
+                resolved[slug] = shop_id
+    return resolved
+
+
+def invalidate_slugs(*slugs):
+    """Forget cached resolutions for the given slugs (old and new values)."""
+    _cache.delete(*[slug for slug in slugs if slug])
+
+
+def clear():
+    _cache.clear()
@@ -2,6 +2,8 @@
 Serializers for shops app.
 """
 from rest_framework import serializers
+
+from apps.core.images import StoredURLField
 from .models import Shop
 
 
@@ -10,10 +12,13 @@ class ShopMeSerializer(serializers.ModelSerializer):
     # We use the native fields of the Shop model
     first_name = serializers.CharField(source='user.first_name', read_only=True)
     last_name = serializers.CharField(source='user.last_name', read_only=True)
+    logo = StoredURLField(source='logo_url')
+    logo_thumb = StoredURLField(source='logo_thumb_url')
 
     class Meta:
         model = Shop
-        fields = ['id', 'name', 'slug', 'description', 'whatsapp_number', 'logo', 'first_name', 'last_name']
+        fields = ['id', 'name', 'slug', 'description', 'whatsapp_number', 'logo', 'logo_thumb',
+                  'first_name', 'last_name']
 
 
 class ShopMeUpdateSerializer(serializers.ModelSerializer):
@@ -29,44 +34,34 @@ class ShopMeUpdateSerializer(serializers.ModelSerializer):
         fields = ['description', 'logo', 'name', 'slug', 'whatsapp_number', 'first_name', 'last_name']
 
     def update(self, instance, validated_data):
-        name = validated_data.pop('name', None)
-        slug = validated_data.pop('slug', None)
-        whatsapp = validated_data.pop('whatsapp_number', None)
-        first_name = validated_data.pop('first_name', None)
-        last_name = validated_data.pop('last_name', None)
-        
-        # Update Shop basic fields (description, logo)
+        # Nom, slug et WhatsApp n'existent que sur la boutique : une seule
+        # écriture, plus celle du compte si le prénom ou le nom change.
+        user_fields = {
+            field: validated_data.pop(field) for field in ('first_name', 'last_name') if field in validated_data
+        }
         for k, v in validated_data.items():
             setattr(instance, k, v)
-            
-        # Update Shop core fields
-        if name is not None:
-            instance.name = name
-        if slug is not None:
-            instance.slug = slug
-        if whatsapp is not None:
-            instance.whatsapp_number = whatsapp
-        instance.save()
-        
-        # Keep User in sync
+        if validated_data:
+            # `instance` vient du cache de l'authentification et peut être
+            # périmé : seules les colonnes envoyées sont écrites (Shop.save
+            # ajoute les URLs du logo s'il change).
+            instance.save(update_fields=[*validated_data, 'updated_at'])
+
         u = instance.user
-        if name is not None:
-            u.shop_name = name
-        if slug is not None:
-            u.slug = slug
-        if whatsapp is not None:
-            u.whatsapp_number = whatsapp
-        if first_name is not None:
-            u.first_name = first_name
-        if last_name is not None:
-            u.last_name = last_name
-        u.save()
-        
+        changed = [field for field, value in user_fields.items() if getattr(u, field) != value]
+        if changed:
+            for field in changed:
+                setattr(u, field, user_fields[field])
+            u.save(update_fields=changed)
         return instance
 
 
 class ShopPublicSerializer(serializers.ModelSerializer):
-    """GET /api/shops/{slug}/ - public shop info."""
+    """GET /api/shops/{slug}/ - public shop info. Logo URLs precomputed at upload."""
+    logo = StoredURLField(source='logo_url')
+    logo_thumb = StoredURLField(source='logo_thumb_url')
+    logo_srcset = StoredURLField()
+
     class Meta:
         model = Shop
-        fields = ['id', 'name', 'description', 'slug', 'whatsapp_number', 'logo']
+        fields = ['id', 'name', 'description', 'slug', 'whatsapp_number', 'logo', 'logo_thumb', 'logo_srcset']
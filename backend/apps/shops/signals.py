@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.core.cache import CATALOG_SCOPE, bump_versions, shop_scope
+from apps.shops.models import Shop
+from apps.shops.resolver import invalidate_slugs
+from apps.shops.slug_index import slug_changed
+
+@receiver(post_delete, sender=Shop)
+def forget_deleted_shop_slug(sender, instance, **kwargs):
+    invalidate_slugs(instance.slug)
+    slug_changed(instance.slug, None)
+
+
+# Les réponses publiques en cache (page boutique, catalogue) affichent les
+# champs de la boutique : toute écriture les invalide.
+
+@receiver(post_save, sender=Shop)
+@receiver(post_delete, sender=Shop)
+def bump_shop_cache_versions(sender, instance, **kwargs):
+    bump_versions(shop_scope(instance.pk), CATALOG_SCOPE)
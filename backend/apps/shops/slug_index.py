@@ -0,0 +1,139 @@
+"""
+In-process index of the slugs taken by sellers, for availability checks.
+
+GET /api/utils/check-slug/{slug}/ runs on every keystroke of the shop
+settings form. Instead of a query per call, each worker keeps the slugs
+of every Shop in a sorted list: a lookup is a bisection, and the slugs
+starting with a prefix are a contiguous slice of the list, which is what
+suggestions are built from. The index is loaded with one query on first
+use, then kept current as slugs change in this process (Shop.save and
+deletions, applied on commit). Writes made by
+other workers are picked up by a full reload every SLUG_INDEX_TTL
+seconds. The unique constraints stay the authority when saving: a stale
+answer only affects the hint shown while typing.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import transaction
+
+# Word variants tried after the first numbered suggestions.
+SUGGESTION_WORDS = ('boutique', 'shop', 'officiel', 'store')
+
+
+class SlugIndex:
+    """Sorted list of the taken slugs, with a set for membership."""
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self._slugs = []
+        self._taken = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from .models import Shop
+
+        # Sorted here: bisect needs Python's order, not the database collation.
+        self._slugs = sorted(Shop.objects.exclude(slug='').values_list('slug', flat=True))
+        self._taken = set(self._slugs)
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            self._load()
+
+    def __contains__(self, slug):
+        with self._lock:
+            self._ensure_loaded()
+            return slug in self._taken
+
+    def with_prefix(self, prefix):
+        """Taken slugs starting with `prefix`, in order."""
+        with self._lock:
+            self._ensure_loaded()
+            if not prefix:
+                return list(self._slugs)
+            start = bisect_left(self._slugs, prefix)
+            # Up to the first string sorting after every `prefix...` one.
+            end = bisect_left(self._slugs, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+            return self._slugs[start:end]
+
+    def replace(self, old=None, new=None):
+        """Record that one shop's slug went from `old` to `new` (either may be empty)."""
+        if old == new:
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                # Not loaded yet: the first lookup will read the current slugs.
+                return
+            if old and old in self._taken:
+                self._taken.discard(old)
+                del self._slugs[bisect_left(self._slugs, old)]
+            if new and new not in self._taken:
+                self._taken.add(new)
+                insort(self._slugs, new)
+
+    def clear(self):
+        with self._lock:
+            self._slugs, self._taken, self._loaded_at = [], set(), None
+
+
+_index = SlugIndex(ttl=getattr(settings, 'SLUG_INDEX_TTL', 300))
+
+
+def slug_changed(old, new):
+    """Update the index once the current transaction commits (nothing on rollback)."""
+    if old != new:
+        transaction.on_commit(lambda: _index.replace(old, new))
+
+
+def is_taken(slug, own=()):
+    """True if `slug` is used by a seller other than the one owning the `own` slugs."""
+    return slug not in own and slug in _index
+
+
+def suggest(slug, count=None, max_length=50, own=()):
+    """
+    Up to `count` free slugs close to `slug`: the first free `slug-<n>`,
+    word variants (`slug-boutique`...), then further numbers. Computed from
+    the index only, without a query.
+    """
+    count = getattr(settings, 'SLUG_SUGGESTIONS', 5) if count is None else count
+    numbered = set()
+    for taken in _index.with_prefix(f'{slug}-'):
+        suffix = taken[len(slug) + 1:]
+        if suffix.isdigit():
+            numbered.add(int(suffix))
+
+    def numbers():
+        n = 1
+        while True:
+            if n not in numbered:
+                yield f'{slug}-{n}'
+            n += 1
+
+    def free(candidate):
+        return len(candidate) <= max_length and not is_taken(candidate, own)
+
+    suggestions = []
+    next_number = numbers()
+    candidates = [next(next_number), next(next_number)]
+    candidates += [f'{slug}-{word}' for word in SUGGESTION_WORDS]
+    for candidate in candidates:
+        if len(suggestions) == count:
+            return suggestions
+        if free(candidate) and candidate not in suggestions:
+            suggestions.append(candidate)
+    while len(suggestions) < count:
+        candidate = next(next_number)
+        if len(candidate) > max_length:
+            break
+        suggestions.append(candidate)
+    return suggestions
+
+
+def clear():
+    _index.clear()
@@ -1,34 +1,51 @@
 """
 Views for shops app.
 """
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.accounts.models import User
+from apps.core.cache import cached_response, shop_scope
+from apps.core.fieldsets import requested_fields
+from apps.core.pagination import KeysetPagination
+from apps.core.streaming import streaming_page_response, wants_stream
+from . import slug_index
 from .models import Shop
+from .resolver import resolve_shop_id
 from .serializers import ShopMeSerializer, ShopMeUpdateSerializer, ShopPublicSerializer
 
 
+def _resolve_or_404(slug):
+    shop_id = resolve_shop_id(slug)
+    if shop_id is None:
+        raise Http404
+    return shop_id
+
+
 class ShopMeView(APIView):
     """GET /api/shops/me/ - current user's shop."""
     permission_classes = [IsAuthenticated]
 
+    def _get_shop(self, request):
+        # Loaded with the user by the authentication (ShopMeSerializer reads
+        # shop.user.first_name / last_name); created if missing.
+        try:
+            return request.user.shop
+        except Shop.DoesNotExist:
+            shop, created = Shop.objects.get_or_create(
+                user=request.user,
+                defaults={'name': request.user.username}
+            )
+            return shop
+
     def get(self, request):
-        # Ensure a Shop exists for the user; create one if missing.
-        shop, created = Shop.objects.get_or_create(
-            user=request.user,
-            defaults={'name': request.user.shop_name or request.user.username}
-        )
-        return Response(ShopMeSerializer(shop).data)
+        return Response(ShopMeSerializer(self._get_shop(request)).data)
 
     def put(self, request):
-        shop, created = Shop.objects.get_or_create(
-            user=request.user,
-            defaults={'name': request.user.shop_name or request.user.username}
-        )
+        shop = self._get_shop(request)
         ser = ShopMeUpdateSerializer(shop, data=request.data, partial=True)
         if not ser.is_valid():
             return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -37,30 +54,61 @@ class ShopMeView(APIView):
 
 
 class ShopBySlugView(APIView):
-    """GET /api/shops/{slug}/ - public shop by slug."""
+    """GET /api/shops/{slug}/ - public shop by slug (versioned response cache)."""
     permission_classes = [AllowAny]
 
     def get(self, request, slug):
-        shop = get_object_or_404(Shop, slug=slug)
-        return Response(ShopPublicSerializer(shop).data)
+        shop_id = _resolve_or_404(slug)
+        return cached_response(
+            self, request, [shop_scope(shop_id)],
+            lambda: Response(ShopPublicSerializer(get_object_or_404(Shop, pk=shop_id)).data),
+        )
 
 
 class ShopProductsBySlugView(APIView):
-    """GET /api/shops/{slug}/products/ - public products."""
+    """
+    GET /api/shops/{slug}/products/ - the shop's visible products, newest first,
+    paginated by keyset like /api/public/products/, versioned response cache
+    (?stream=1: large pages streamed, not cached).
+    """
     permission_classes = [AllowAny]
 
     def get(self, request, slug):
         from apps.products.models import Product
         from apps.products.serializers import ProductPublicSerializer
-        shop = get_object_or_404(Shop, slug=slug)
-        products = Product.objects.filter(shop=shop).order_by('-created_at')
-        return Response(ProductPublicSerializer(products, many=True, context={'request': request}).data)
+        from apps.products.views import public_products
+        shop_id = _resolve_or_404(slug)
+        fields = requested_fields(request, ProductPublicSerializer)
+        queryset = public_products(Product.objects.visible().filter(shop_id=shop_id), fields, ['created_at', 'id'])
+
+        if wants_stream(request):
+            return streaming_page_response(
+                request, queryset,
+                ProductPublicSerializer(context={'request': request}, fields=fields).to_representation,
+            )
+
+        def build():
+            paginator = KeysetPagination()
+            products = paginator.paginate_queryset(queryset, request)
+            return paginator.get_paginated_response(
+                ProductPublicSerializer(products, many=True, context={'request': request}, fields=fields).data
+            )
+
+        return cached_response(self, request, [shop_scope(shop_id)], build)
 
 
 class CheckSlugView(APIView):
-    """GET /api/utils/check-slug/{slug}/ - check if slug available (frontend ShopSettings)."""
+    """
+    GET /api/utils/check-slug/{slug}/ - check if slug available (frontend
+    ShopSettings), with free alternatives when it is not. Answered from the
+    in-process slug index: no query once the index is loaded.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, slug):
-        exists = User.objects.filter(slug=slug).exclude(pk=request.user.pk).exists()
-        return Response({'available': not exists})
+        # The seller's current slug counts as available to them.
+        own = {request.user.slug}
+        if not slug_index.is_taken(slug, own):
+            return Response({'available': True, 'suggestions': []})
+        max_length = Shop._meta.get_field('slug').max_length
+        return Response({'available': False, 'suggestions': slug_index.suggest(slug, max_length=max_length, own=own)})
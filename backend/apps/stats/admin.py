@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Visit
+from .models import Visit, VisitDailyRollup
 
 
 @admin.register(Visit)
@@ -12,3 +12,10 @@ class VisitAdmin(admin.ModelAdmin):
     list_display = ('id', 'action', 'created_at')
     list_filter = ('action',)
     date_hierarchy = 'created_at'
+
+
+@admin.register(VisitDailyRollup)
+class VisitDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('id', 'shop', 'day', 'views', 'whatsapp_clicks')
+    list_select_related = ('shop',)
+    date_hierarchy = 'day'
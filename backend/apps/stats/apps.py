@@ -5,3 +5,6 @@ class StatsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.stats'
     verbose_name = 'Statistiques'
+
+    def ready(self):
+        import apps.stats.signals
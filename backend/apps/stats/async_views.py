@@ -0,0 +1,50 @@
+"""
+Async (ASGI) views for stats app.
+
+Plain Django async views: DRF's APIView is sync-only. Under an ASGI server
+(uvicorn/daphne) a worker serves many concurrent beacons without holding a
+thread per request; under WSGI Django runs them in a per-request event loop.
+"""
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from apps.shops.resolver import aresolve_shop_id
+from .ingest import arecord_visit
+from .models import Visit
+from .serializers import parse_product_id
+
+
+@csrf_exempt
+@require_POST
+async def visit_create_async(request):
+    """POST /api/stats/visit/async/ - track visit (public), same contract as VisitCreateView."""
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'detail': 'JSON invalide'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'detail': 'JSON invalide'}, status=400)
+    shop_slug = data.get('shop_slug')
+    action = data.get('action')
+    if not shop_slug:
+        return JsonResponse({'detail': 'shop_slug requis'}, status=400)
+    if not isinstance(shop_slug, str):
+        return JsonResponse({'detail': 'shop_slug doit être une chaîne'}, status=400)
+    if not action:
+        return JsonResponse({'detail': 'action requis'}, status=400)
+    if action == 'visit':
+        action = Visit.ACTION_VIEW
+    if action not in (Visit.ACTION_VIEW, Visit.ACTION_WHATSAPP):
+        return JsonResponse({'detail': 'action doit être view ou whatsapp_click'}, status=400)
+    try:
+        product_id = parse_product_id(data.get('product_id'))
+    except (TypeError, ValueError):
+        return JsonResponse({'detail': 'product_id doit être un entier positif'}, status=400)
+    shop_id = await aresolve_shop_id(shop_slug)
+    if shop_id is None:
+        return JsonResponse({'detail': 'Boutique introuvable'}, status=404)
+    await arecord_visit(shop_id, action, product_id=product_id)
+    return JsonResponse({'success': True}, status=201)
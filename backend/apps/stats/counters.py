@@ -0,0 +1,168 @@
+"""
+Live popularity counters: Shop.views_count and Product.views_count.
+
+Every recorded 'view' visit adds to in-memory per-shop and per-product
+tallies. A daemon thread writes them every STATS_COUNTER_FLUSH_INTERVAL
+seconds (and when the worker exits) as batched UPDATEs of the form
+
+    UPDATE ... SET views_count = views_count + n WHERE id IN (...)
+
+one statement per distinct increment, so a popular shop costs one row
+update per flush instead of one per page view. Counters are eventually
+consistent; `python manage.py reconcile_view_counters` recomputes them.
+"""
+import threading
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+
+from apps.core.cache import POPULARITY_SCOPE, bump_versions
+from apps.core.flush import PeriodicFlusher
+from apps.products.models import Product
+from apps.shops.models import Shop
+from .models import Visit, VisitDailyRollup
+
+# Rows per UPDATE statement.
+CHUNK_SIZE = 500
+
+
+def _by_increment(counts):
+    """{increment: sorted keys} for a {key: increment} mapping."""
+    groups = defaultdict(list)
+    for key, increment in counts.items():
+        groups[increment].append(key)
+    return sorted((increment, sorted(keys)) for increment, keys in groups.items())
+
+
+def _chunks(items):
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start:start + CHUNK_SIZE]
+
+
+def apply_increments(shop_counts, product_counts):
+    """
+    Add `shop_counts` ({shop_id: n}) and `product_counts` ({(shop_id,
+    product_id): n}) to the views_count columns. Each UPDATE commits on its
+    own so row locks are held for one statement only. A product only counts
+    if it belongs to the shop the visit was recorded for.
+    """
+    for increment, shop_ids in _by_increment(shop_counts):
+        for chunk in _chunks(shop_ids):
+            Shop.objects.filter(pk__in=chunk).update(views_count=F('views_count') + increment)
+    for increment, keys in _by_increment(product_counts):
+        for chunk in _chunks(keys):
+            match = reduce(or_, (Q(pk=product_id, shop_id=shop_id) for shop_id, product_id in chunk))
+            Product.objects.filter(match).update(views_count=F('views_count') + increment)
+    # The cached ?ordering=popular feed depends on the counters.
+    bump_versions(POPULARITY_SCOPE)
+
+
+class ViewCounters(PeriodicFlusher):
+    """Thread-safe in-process tallies of page views, flushed by a daemon thread."""
+
+    name = 'view-counters-flusher'
+
+    def __init__(self, flush_interval=10.0):
+        super().__init__(flush_interval)
+        self._shops = Counter()
+        self._products = Counter()
+
+    def __len__(self):
+        return len(self._shops) + len(self._products)
+
+    def add(self, visits):
+        shops = Counter()
+        products = Counter()
+        for visit in visits:
+            if visit.action != Visit.ACTION_VIEW:
+                continue
+            shops[visit.shop_id] += 1
+            if visit.product_id:
+                products[(visit.shop_id, visit.product_id)] += 1
+        if not shops:
+            return
+        with self._lock:
+            self._shops.update(shops)
+            self._products.update(products)
+            self.ensure_started()
+
+    def discard(self):
+        """Drop the pending tallies without writing them; returns the views dropped."""
+        with self._lock:
+            batch = self._take()
+        return self._batch_size(batch) if batch else 0
+
+    def _take(self):
+        if not self._shops:
+            return None
+        batch = (self._shops, self._products)
+        self._shops, self._products = Counter(), Counter()
+        return batch
+
+    def _batch_size(self, batch):
+        return sum(batch[0].values())
+
+    def _write(self, batch):
+        apply_increments(*batch)
+
+
+_counters = None
+_counters_lock = threading.Lock()
+
+
+def get_counters():
+    """Process-wide ViewCounters, created on first use."""
+    global _counters
+    if _counters is None:
+        with _counters_lock:
+            if _counters is None:
+                _counters = ViewCounters(
+                    flush_interval=getattr(settings, 'STATS_COUNTER_FLUSH_INTERVAL', 10.0),
+                )
+    return _counters
+
+
+def reconcile_counters(batch_size=1000):
+    """
+    Recompute views_count from stored data: shops from the daily rollups
+    (which outlive raw-visit retention), products from the raw visits still
+    kept. Returns (shops_updated, products_updated).
+
+    The views tallied in this process but not flushed yet are already in
+    the stored data (after the visit buffer is written): they are dropped
+    rather than added a second time. Other workers cannot be reached from
+    here; their next flush adds their pending tallies on top, so counters
+    can come out too high by the views those workers received during the
+    last STATS_COUNTER_FLUSH_INTERVAL seconds. Run it at a quiet time.
+    """
+    from .ingest import get_buffer
+
+    get_buffer().flush()
+    get_counters().discard()
+    shop_views = dict(
+        VisitDailyRollup.objects.order_by().values_list('shop_id').annotate(total=Sum('views'))
+    )
+    product_views = dict(
+        Visit.objects.filter(action=Visit.ACTION_VIEW, product__isnull=False, product__shop_id=F('shop_id'))
+        .order_by().values_list('product_id').annotate(total=Count('id'))
+    )
+    updated = (
+        _reconcile(Shop, shop_views, batch_size),
+        _reconcile(Product, product_views, batch_size),
+    )
+    bump_versions(POPULARITY_SCOPE)
+    return updated
+
+
+def _reconcile(model, totals, batch_size):
+    changed = []
+    rows = model.objects.order_by('pk').values_list('pk', 'views_count')
+    for pk, current in rows.iterator(chunk_size=batch_size):
+        expected = totals.get(pk, 0)
+        if current != expected:
+            changed.append(model(pk=pk, views_count=expected))
+    model.objects.bulk_update(changed, ['views_count'], batch_size=batch_size)
+    return len(changed)
@@ -0,0 +1,139 @@
+"""
+Visit ingestion pipeline for LinkContact statistics.
+
+Two modes, selected with settings.STATS_INGESTION_MODE:
+- 'sync'     : every beacon is written immediately (one INSERT per request).
+- 'buffered' : beacons are queued in-process and written with bulk_create
+               when STATS_BUFFER_MAX_SIZE visits are pending or every
+               STATS_BUFFER_FLUSH_INTERVAL seconds, whichever comes first.
+               Pending visits are flushed when the worker exits.
+
+In both modes, page views also feed the coalesced popularity counters
+(apps.stats.counters).
+"""
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.flush import PeriodicFlusher
+from .counters import get_counters
+from .models import Visit
+from .rollups import upsert_rollups
+
+MODE_SYNC = 'sync'
+MODE_BUFFERED = 'buffered'
+
+
+def write_visits(visits):
+    """
+    Persist a batch of unsaved Visit instances in one INSERT and add them
+    to the daily rollups, in a single transaction.
+    """
+    if not visits:
+        return 0
+    with transaction.atomic():
+        Visit.objects.bulk_create(visits)
+        upsert_rollups(visits)
+    return len(visits)
+
+
+class VisitBuffer(PeriodicFlusher):
+    """
+    Thread-safe in-process queue of visits, drained by a daemon thread.
+    """
+
+    name = 'visit-buffer-flusher'
+
+    def __init__(self, max_size=500, flush_interval=2.0):
+        super().__init__(flush_interval)
+        self.max_size = max_size
+        self._pending = []
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, visits):
+        with self._lock:
+            self._pending.extend(visits)
+            full = len(self._pending) >= self.max_size
+            self.ensure_started()
+        if full:
+            self.wake()
+
+    def _take(self):
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _write(self, batch):
+        write_visits(batch)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_mode():
+    mode = getattr(settings, 'STATS_INGESTION_MODE', MODE_SYNC)
+    if mode not in (MODE_SYNC, MODE_BUFFERED):
+        raise ImproperlyConfigured(
+            f"STATS_INGESTION_MODE doit être '{MODE_SYNC}' ou '{MODE_BUFFERED}' (reçu: {mode!r})."
+        )
+    return mode
+
+
+def get_buffer():
+    """Process-wide VisitBuffer, created on first use."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = VisitBuffer(
+                    max_size=getattr(settings, 'STATS_BUFFER_MAX_SIZE', 500),
+                    flush_interval=getattr(settings, 'STATS_BUFFER_FLUSH_INTERVAL', 2.0),
+                )
+    return _buffer
+
+
+def record_visits(visits):
+    """Hand a list of unsaved Visit instances to the configured pipeline."""
+    if get_mode() == MODE_BUFFERED:
+        get_buffer().add(visits)
+    else:
+        write_visits(visits)
+    get_counters().add(visits)
+    return len(visits)
+
+
+def record_visit(shop_id, action, created_at=None, product_id=None):
+    """Record a single beacon for the given shop id."""
+    visit = Visit(
+        shop_id=shop_id, product_id=product_id, action=action,
+        created_at=created_at or timezone.now(),
+    )
+    return record_visits([visit])
+
+
+async def arecord_visits(visits):
+    """
+    Async variant of record_visits. Buffered mode only appends to the
+    in-memory queue; sync mode runs the transactional write in the ORM
+    thread (Django has no async transactions).
+    """
+    if get_mode() == MODE_BUFFERED:
+        get_buffer().add(visits)
+    else:
+        await sync_to_async(write_visits)(visits)
+    get_counters().add(visits)
+    return len(visits)
+
+
+async def arecord_visit(shop_id, action, created_at=None, product_id=None):
+    visit = Visit(
+        shop_id=shop_id, product_id=product_id, action=action,
+        created_at=created_at or timezone.now(),
+    )
+    return await arecord_visits([visit])
@@ -0,0 +1,116 @@
+"""
+Compare the sync (WSGI, DRF) and async (ASGI) visit ingestion paths.
+
+    python manage.py bench_visit_ingestion --requests 2000 --concurrency 50
+    python manage.py bench_visit_ingestion --mode buffered
+
+Runs against a throwaway test database. Both paths go through the full
+Django handler stack in-process: the WSGI path with django.test.Client on
+`concurrency` threads (one thread per in-flight request, like gunicorn gthread), the
+ASGI path with django.test.AsyncClient on one event loop. The numbers
+compare handler overhead and concurrency behaviour, not network I/O.
+"""
+import asyncio
+import statistics
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from apps.core import testing
+from apps.stats import ingest
+
+SYNC_PATH = '/api/stats/visit/'
+ASYNC_PATH = '/api/stats/visit/async/'
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark des chemins d\'ingestion de visites WSGI (sync) et ASGI (async).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--mode', choices=[ingest.MODE_SYNC, ingest.MODE_BUFFERED], default=ingest.MODE_SYNC)
+
+    def handle(self, *args, **options):
+        with testing.throwaway_database(), override_settings(STATS_INGESTION_MODE=options['mode']):
+            payload = {'shop_slug': testing.create_seller('bench').shop.slug, 'action': 'view'}
+            results = [
+                ('WSGI sync ' + SYNC_PATH, self._run_sync(payload, options)),
+                ('ASGI async ' + ASYNC_PATH, self._run_async(payload, options)),
+            ]
+
+        self.stdout.write(
+            f"{options['requests']} requêtes, concurrence {options['concurrency']}, mode {options['mode']}"
+        )
+        self.stdout.write(f"{'chemin':<36}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'erreurs':>10}")
+        for label, (elapsed, latencies, errors) in results:
+            latencies.sort()
+            self.stdout.write(
+                f'{label:<36}'
+                f'{len(latencies) / elapsed:>10.0f}'
+                f'{_percentile(latencies, 0.50) * 1000:>10.2f}'
+                f'{_percentile(latencies, 0.95) * 1000:>10.2f}'
+                f'{_percentile(latencies, 0.99) * 1000:>10.2f}'
+                f'{errors:>10}'
+            )
+            if latencies:
+                self.stdout.write(f'{"":<36}moyenne {statistics.mean(latencies) * 1000:.2f} ms')
+
+    def _run_sync(self, payload, options):
+        requests, concurrency = options['requests'], options['concurrency']
+        outcomes = []
+        lock = threading.Lock()
+
+        def worker(count):
+            # One long-lived client and DB connection per thread, like a gthread worker.
+            client = Client(raise_request_exception=False)
+            mine = []
+            for _ in range(count):
+                started = time.perf_counter()
+                response = client.post(SYNC_PATH, payload, content_type='application/json')
+                mine.append((time.perf_counter() - started, response.status_code))
+            connections.close_all()
+            with lock:
+                outcomes.extend(mine)
+
+        shares = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+        threads = [threading.Thread(target=worker, args=(share,)) for share in shares if share]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return elapsed, [d for d, _ in outcomes], sum(1 for _, code in outcomes if code != 201)
+
+    def _run_async(self, payload, options):
+        async def main():
+            client = AsyncClient(raise_request_exception=False)
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def one():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post(ASYNC_PATH, payload, content_type='application/json')
+                    return time.perf_counter() - started, response.status_code
+
+            started = time.perf_counter()
+            outcomes = await asyncio.gather(*(one() for _ in range(options['requests'])))
+            elapsed = time.perf_counter() - started
+            await sync_to_async(connections.close_all)()
+            return elapsed, outcomes
+
+        elapsed, outcomes = asyncio.run(main())
+        return elapsed, [d for d, _ in outcomes], sum(1 for _, code in outcomes if code != 201)
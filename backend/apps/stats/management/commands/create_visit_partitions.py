@@ -0,0 +1,35 @@
+"""
+Create the monthly stats_visit partitions ahead of time (PostgreSQL).
+
+    python manage.py create_visit_partitions
+    python manage.py create_visit_partitions --ahead 6
+
+Schedule it (cron / Render job) at least once a month so inserts never land
+in the default partition. After a missed run, the rows of the months it
+creates are moved out of the default partition.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.stats.partitioning import add_months, create_month_partitions, is_partitioned, month_start
+
+
+class Command(BaseCommand):
+    help = 'Crée à l\'avance les partitions mensuelles de stats_visit (PostgreSQL).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=getattr(settings, 'STATS_PARTITIONS_AHEAD', 3),
+            help='Nombre de mois futurs à préparer (en plus du mois courant).',
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError('stats_visit n\'est pas partitionnée sur cette base (PostgreSQL requis).')
+        this_month = month_start(timezone.localdate())
+        partitions = create_month_partitions(this_month, add_months(this_month, options['ahead']))
+        for name, moved in partitions.items():
+            if moved:
+                self.stdout.write(f'{name} : {moved} visites déplacées depuis la partition par défaut.')
+        self.stdout.write(self.style.SUCCESS(f'Partitions prêtes : {", ".join(partitions)}'))
@@ -0,0 +1,46 @@
+"""
+Apply the raw visit retention policy.
+
+    python manage.py prune_visits                   # STATS_RETENTION_MONTHS
+    python manage.py prune_visits --keep-months 12 --archive
+
+Partitioned tables lose whole months at once (drop, or detach and keep as
+stats_visit_archive_YYYY_MM with --archive). Elsewhere rows are deleted by
+small batches. Daily rollups are kept, so dashboards are not affected.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.stats.partitioning import prune_visits
+
+
+class Command(BaseCommand):
+    help = 'Supprime ou archive les visites plus anciennes que la durée de rétention.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months', type=int, default=getattr(settings, 'STATS_RETENTION_MONTHS', 24),
+            help='Nombre de mois complets à conserver en plus du mois courant.',
+        )
+        parser.add_argument('--archive', action='store_true', help='Détacher les partitions au lieu de les supprimer.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Pause (s) entre deux lots de suppression.')
+
+    def handle(self, *args, **options):
+        if options['keep_months'] < 0:
+            raise CommandError('--keep-months doit être positif.')
+        try:
+            result = prune_visits(
+                options['keep_months'],
+                archive=options['archive'],
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(f"Visites antérieures au {result['cutoff']:%Y-%m-%d} :")
+        for name in result['dropped']:
+            self.stdout.write(f'  partition supprimée : {name}')
+        for name in result['archived']:
+            self.stdout.write(f'  partition archivée : {name}')
+        self.stdout.write(self.style.SUCCESS(f"{result['deleted']} lignes supprimées par lots."))
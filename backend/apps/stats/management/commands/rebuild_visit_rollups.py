@@ -0,0 +1,27 @@
+"""
+Backfill or rebuild VisitDailyRollup from raw Visit rows.
+
+    python manage.py rebuild_visit_rollups
+    python manage.py rebuild_visit_rollups --shop 12 --shop 15
+
+Run it while visit ingestion is quiet: visits written during the rebuild
+of a shop may be counted twice or missed.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.stats.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit la table VisitDailyRollup à partir des visites brutes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shop', type=int, action='append', dest='shop_ids',
+            help='Limiter à cette boutique (répétable).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(options['shop_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{written} lignes de rollup écrites.'))
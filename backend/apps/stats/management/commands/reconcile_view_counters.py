@@ -0,0 +1,28 @@
+"""
+Recompute Shop.views_count and Product.views_count from stored visits.
+
+    python manage.py reconcile_view_counters
+
+Shop counters are rebuilt from the daily rollups, which keep the full
+history after raw visits are pruned; product counters from the raw visits
+still retained. Views already stored but still pending in a running
+worker's counters are added again at that worker's next flush: counters
+can end up too high by the views of the last STATS_COUNTER_FLUSH_INTERVAL
+seconds. Run it when traffic is low (apps.stats.counters.reconcile_counters).
+"""
+from django.core.management.base import BaseCommand
+
+from apps.stats.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les compteurs views_count des boutiques et produits à partir des visites.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        shops, products = reconcile_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{shops} boutique(s) et {products} produit(s) corrigé(s).'
+        ))
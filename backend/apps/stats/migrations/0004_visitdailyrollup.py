@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Visit = apps.get_model('stats', 'Visit')
+    VisitDailyRollup = apps.get_model('stats', 'VisitDailyRollup')
+    rows = (
+        Visit.objects.order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('shop_id', 'day')
+        .annotate(
+            views=Count('id', filter=Q(action='view')),
+            whatsapp_clicks=Count('id', filter=Q(action='whatsapp_click')),
+        )
+    )
+    VisitDailyRollup.objects.bulk_create(
+        (VisitDailyRollup(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0002_shop_whatsapp_number'),
+        ('stats', '0003_visit_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('whatsapp_clicks', models.PositiveIntegerField(default=0)),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visit_rollups', to='shops.shop')),
+            ],
+            options={
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('shop', 'day'), name='stats_rollup_shop_day_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from apps.stats.partitioning import convert_to_partitioned, is_partitioned, supports_partitioning
+
+
+def partition_visits(apps, schema_editor):
+    # PostgreSQL only: other backends keep a plain table and prune by batches.
+    connection = schema_editor.connection
+    if supports_partitioning(connection) and not is_partitioned(connection):
+        convert_to_partitioned(connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0004_visitdailyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_visits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0002_shop_whatsapp_number'),
+        ('stats', '0005_partition_visit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopStatsVersion',
+            fields=[
+                ('shop', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats_version', serialize=False, to='shops.shop')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('stats', '0006_shopstatsversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visit',
+            name='product',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='visits', to='products.product'),
+        ),
+    ]
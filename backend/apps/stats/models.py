@@ -4,6 +4,7 @@ Production Ready V1
 """
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Visit(models.Model):
@@ -25,6 +26,17 @@ class Visit(models.Model):
         related_name='visits',
     )
 
+    # Produit consulté, le cas échéant. Pas de contrainte en base : les visites
+    # brutes survivent à la suppression du produit et restent insérables en masse.
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='visits',
+        blank=True,
+        null=True,
+    )
+
     action = models.CharField(
         max_length=20,
         choices=ACTION_CHOICES,
@@ -46,8 +58,11 @@ class Visit(models.Model):
         null=True
     )
 
+    # Horodatage fixé à la réception du beacon (et non à l'écriture),
+    # pour rester exact quand l'ingestion est bufferisée.
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True
     )
 
@@ -60,3 +75,51 @@ class Visit(models.Model):
 
     def __str__(self):
         return f"{self.shop.slug} - {self.action} @ {self.created_at}"
+
+
+class VisitDailyRollup(models.Model):
+    """
+    Per-shop daily counters, upserted at ingestion time (apps.stats.ingest).
+    Dashboard stats read this table only; rebuild it from raw visits with
+    `python manage.py rebuild_visit_rollups`.
+    """
+
+    shop = models.ForeignKey(
+        'shops.Shop',
+        on_delete=models.CASCADE,
+        related_name='visit_rollups',
+    )
+
+    day = models.DateField()
+
+    views = models.PositiveIntegerField(default=0)
+
+    whatsapp_clicks = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['shop', 'day'], name='stats_rollup_shop_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.shop_id} - {self.day}: {self.views} vues, {self.whatsapp_clicks} clics"
+
+
+class ShopStatsVersion(models.Model):
+    """
+    Change counter of a shop's dashboard stats, bumped whenever its rollups
+    or product count change. Used as a cheap ETag validator by StatsMeView.
+    """
+
+    shop = models.OneToOneField(
+        'shops.Shop',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats_version',
+    )
+
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.shop_id} v{self.version}"
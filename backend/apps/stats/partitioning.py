@@ -0,0 +1,257 @@
+"""
+Monthly partitioning and retention for the stats_visit table.
+
+On PostgreSQL, stats_visit is a table partitioned by RANGE (created_at) with
+one partition per month (stats_visit_pYYYY_MM) and a default partition for
+rows outside the prepared months. Old months are detached and dropped (or
+kept as stats_visit_archive_YYYY_MM tables) in O(1), without touching the
+indexes of the live partitions.
+
+On other backends (SQLite in dev/tests) the table stays a plain table and
+retention falls back to small batched DELETEs, each in its own transaction,
+so locks are only held briefly.
+"""
+import datetime
+import time
+
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+TABLE = 'stats_visit'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def archive_name(month):
+    return f'{TABLE}_archive_{month:%Y_%m}'
+
+
+def supports_partitioning(connection=None):
+    connection = connection or default_connection
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(connection=None):
+    connection = connection or default_connection
+    if not supports_partitioning(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT EXISTS ('
+            ' SELECT 1 FROM pg_partitioned_table pt'
+            ' JOIN pg_class c ON c.oid = pt.partrelid'
+            ' WHERE c.relname = %s AND pg_table_is_visible(c.oid))',
+            [TABLE],
+        )
+        return cursor.fetchone()[0]
+
+
+def list_partitions(connection=None):
+    """{month: partition name} for the monthly partitions currently attached."""
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i'
+            ' JOIN pg_class c ON c.oid = i.inhrelid'
+            ' JOIN pg_class p ON p.oid = i.inhparent'
+            ' WHERE p.relname = %s AND pg_table_is_visible(p.oid)',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f'{TABLE}_p'
+    partitions = {}
+    for name in names:
+        if name.startswith(prefix):
+            year, month = name[len(prefix):].split('_')
+            partitions[datetime.date(int(year), int(month), 1)] = name
+    return partitions
+
+
+def _month_bounds(month):
+    return f"'{month.isoformat()} 00:00:00+00'", f"'{add_months(month, 1).isoformat()} 00:00:00+00'"
+
+
+def _create_partition(cursor, quote, month):
+    start, end = _month_bounds(month)
+    cursor.execute(
+        f'CREATE TABLE {quote(partition_name(month))} PARTITION OF {quote(TABLE)} '
+        f'FOR VALUES FROM ({start}) TO ({end})'
+    )
+
+
+def create_month_partitions(first_month, last_month, connection=None):
+    """
+    Create the missing monthly partitions from first_month to last_month
+    included. Returns {partition name: rows moved into it}.
+
+    A month whose rows already landed in the default partition (a missed
+    monthly run) cannot be created directly: PostgreSQL refuses a partition
+    whose range the default one holds rows for. The default partition is
+    then detached, the new partitions created, their rows moved out of it,
+    and it is attached back, in one transaction (inserts wait meanwhile).
+    """
+    connection = connection or default_connection
+    quote = connection.ops.quote_name
+    table, default = quote(TABLE), quote(DEFAULT_PARTITION)
+    existing = set(list_partitions(connection).values())
+    result = {}
+    month = month_start(first_month)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        missing = []
+        while month <= last_month:
+            if partition_name(month) in existing:
+                result[partition_name(month)] = 0
+            else:
+                missing.append(month)
+            month = add_months(month, 1)
+
+        crowded = []
+        for month in missing:
+            start, end = _month_bounds(month)
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= {start} AND created_at < {end})'
+            )
+            if cursor.fetchone()[0]:
+                crowded.append(month)
+            else:
+                _create_partition(cursor, quote, month)
+                result[partition_name(month)] = 0
+
+        if crowded:
+            from .models import Visit
+
+            columns = ', '.join(quote(field.column) for field in Visit._meta.concrete_fields)
+            cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {default}')
+            for month in crowded:
+                _create_partition(cursor, quote, month)
+                start, end = _month_bounds(month)
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM {default} WHERE created_at >= {start} AND created_at < {end}'
+                    f' RETURNING {columns}) INSERT INTO {table} ({columns}) SELECT {columns} FROM moved'
+                )
+                result[partition_name(month)] = cursor.rowcount
+            cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT')
+    return dict(sorted(result.items()))
+
+
+def convert_to_partitioned(connection, months_ahead=3):
+    """
+    Rebuild stats_visit as a partitioned table, keeping rows, index names,
+    foreign keys and the id sequence. PostgreSQL only; used by migration
+    stats.0005.
+    """
+    quote = connection.ops.quote_name
+    table = quote(TABLE)
+    legacy = quote(f'{TABLE}_legacy')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+            [TABLE, f'{TABLE}_pkey'],
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint'
+            " WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+        cursor.execute(
+            f'ALTER TABLE {legacy} RENAME CONSTRAINT {quote(TABLE + "_pkey")} TO {quote(TABLE + "_legacy_pkey")}'
+        )
+        # The partition key has to be part of the primary key.
+        cursor.execute(
+            f'CREATE TABLE {table} ('
+            ' id bigint GENERATED BY DEFAULT AS IDENTITY,'
+            ' action varchar(20) NOT NULL,'
+            ' ip_address inet NULL,'
+            ' user_agent text NULL,'
+            ' referrer varchar(200) NULL,'
+            ' created_at timestamp with time zone NOT NULL,'
+            ' shop_id bigint NOT NULL,'
+            ' PRIMARY KEY (id, created_at)'
+            ') PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {table} DEFAULT')
+
+        cursor.execute(f'SELECT MIN(created_at), MAX(created_at) FROM {legacy}')
+        oldest, newest = cursor.fetchone()
+        this_month = month_start(timezone.localdate())
+        first = month_start(oldest) if oldest else this_month
+        last = max(month_start(newest) if newest else this_month, this_month)
+        create_month_partitions(first, add_months(last, months_ahead), connection)
+
+        columns = 'id, action, ip_address, user_agent, referrer, created_at, shop_id'
+        cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}')
+        cursor.execute(f'DROP TABLE {legacy}')
+
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'),"
+            f' COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)'
+        )
+
+
+def delete_in_batches(cutoff, batch_size=5000, pause=0.0):
+    """
+    Delete visits created before `cutoff` by chunks of `batch_size` ids,
+    each chunk in its own short transaction. Returns the number of rows deleted.
+    """
+    from .models import Visit
+
+    deleted = 0
+    old_visits = Visit.objects.filter(created_at__lt=cutoff).order_by()
+    while True:
+        ids = list(old_visits.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Visit.objects.filter(id__in=ids).delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+def prune_visits(keep_months, archive=False, batch_size=5000, pause=0.0, today=None):
+    """
+    Remove visits older than the first day of the month `keep_months` months
+    before `today`. Whole monthly partitions are detached and dropped (or
+    renamed to stats_visit_archive_YYYY_MM when `archive` is set); whatever
+    remains older than the cutoff is deleted in batches.
+    """
+    cutoff_month = add_months(month_start(today or timezone.localdate()), -keep_months)
+    cutoff = timezone.make_aware(datetime.datetime.combine(cutoff_month, datetime.time.min))
+    result = {'cutoff': cutoff, 'dropped': [], 'archived': [], 'deleted': 0}
+
+    if is_partitioned():
+        quote = default_connection.ops.quote_name
+        with default_connection.cursor() as cursor:
+            for month, name in sorted(list_partitions().items()):
+                if add_months(month, 1) > cutoff_month:
+                    continue
+                cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}')
+                if archive:
+                    cursor.execute(f'ALTER TABLE {quote(name)} RENAME TO {quote(archive_name(month))}')
+                    result['archived'].append(archive_name(month))
+                else:
+                    cursor.execute(f'DROP TABLE {quote(name)}')
+                    result['dropped'].append(name)
+    elif archive:
+        raise ValueError("L'archivage nécessite une table partitionnée (PostgreSQL).")
+
+    result['deleted'] = delete_in_batches(cutoff, batch_size=batch_size, pause=pause)
+    return result
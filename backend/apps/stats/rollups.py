@@ -0,0 +1,95 @@
+"""
+Daily visit rollups (VisitDailyRollup) for LinkContact statistics.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ShopStatsVersion, Visit, VisitDailyRollup
+
+
+def count_by_day(visits):
+    """Group unsaved/saved Visit instances into {(shop_id, day): [views, whatsapp_clicks]}."""
+    counts = defaultdict(lambda: [0, 0])
+    for visit in visits:
+        key = (visit.shop_id, timezone.localdate(visit.created_at))
+        if visit.action == Visit.ACTION_WHATSAPP:
+            counts[key][1] += 1
+        else:
+            counts[key][0] += 1
+    return counts
+
+
+def upsert_rollups(visits):
+    """
+    Add the given visits to their (shop, day) rollup rows with one
+    INSERT ... ON CONFLICT DO UPDATE (PostgreSQL and SQLite >= 3.24).
+    """
+    counts = count_by_day(visits)
+    if not counts:
+        return
+    table = connection.ops.quote_name(VisitDailyRollup._meta.db_table)
+    rows, params = [], []
+    # Stable key order so concurrent flushes lock rows in the same order.
+    for (shop_id, day), (views, clicks) in sorted(counts.items()):
+        rows.append('(%s, %s, %s, %s)')
+        params.extend([shop_id, connection.ops.adapt_datefield_value(day), views, clicks])
+    sql = (
+        f'INSERT INTO {table} (shop_id, day, views, whatsapp_clicks) '
+        f'VALUES {", ".join(rows)} '
+        f'ON CONFLICT (shop_id, day) DO UPDATE SET '
+        f'views = {table}.views + excluded.views, '
+        f'whatsapp_clicks = {table}.whatsapp_clicks + excluded.whatsapp_clicks'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+    bump_stats_versions(shop_id for shop_id, _ in counts)
+
+
+def bump_stats_versions(shop_ids):
+    """Increment the ShopStatsVersion counter of each shop, creating it if needed."""
+    shop_ids = sorted(set(shop_ids))
+    if not shop_ids:
+        return
+    table = connection.ops.quote_name(ShopStatsVersion._meta.db_table)
+    sql = (
+        f'INSERT INTO {table} (shop_id, version) '
+        f'VALUES {", ".join(["(%s, 1)"] * len(shop_ids))} '
+        f'ON CONFLICT (shop_id) DO UPDATE SET version = {table}.version + 1'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, shop_ids)
+
+
+def rebuild_rollups(shop_ids=None, batch_size=1000):
+    """
+    Recompute rollup rows from raw Visit rows, for every shop or only
+    `shop_ids`. Returns the number of rollup rows written.
+    """
+    visits = Visit.objects.order_by()
+    rollups = VisitDailyRollup.objects.all()
+    if shop_ids is not None:
+        visits = visits.filter(shop_id__in=shop_ids)
+        rollups = rollups.filter(shop_id__in=shop_ids)
+    rows = (
+        visits.annotate(day=TruncDate('created_at'))
+        .values('shop_id', 'day')
+        .annotate(
+            views=Count('id', filter=Q(action=Visit.ACTION_VIEW)),
+            whatsapp_clicks=Count('id', filter=Q(action=Visit.ACTION_WHATSAPP)),
+        )
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = VisitDailyRollup.objects.bulk_create(
+            (VisitDailyRollup(**row) for row in rows.iterator()),
+            batch_size=batch_size,
+        )
+        if shop_ids is None:
+            ShopStatsVersion.objects.update(version=F('version') + 1)
+        else:
+            bump_stats_versions(shop_ids)
+    return len(created)
@@ -0,0 +1,80 @@
+"""
+Serializers for stats app.
+"""
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from .models import Visit
+
+
+def parse_product_id(value):
+    """Optional product id of a beacon: None or a positive int, ValueError otherwise."""
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(value)
+    product_id = int(value)
+    if product_id < 1:
+        raise ValueError(value)
+    return product_id
+
+
+class TimestampField(serializers.Field):
+    """ISO 8601 datetime or Unix epoch (seconds or milliseconds)."""
+
+    default_error_messages = {
+        'invalid': 'Horodatage invalide (ISO 8601 ou epoch).',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('invalid')
+        if isinstance(data, str):
+            try:
+                value = parse_datetime(data.strip())
+            except ValueError:
+                # Well-formed but out of range (2024-02-30).
+                self.fail('invalid')
+            if value is not None:
+                return value if timezone.is_aware(value) else timezone.make_aware(value)
+            try:
+                data = float(data)
+            except ValueError:
+                self.fail('invalid')
+        if not isinstance(data, (int, float)):
+            self.fail('invalid')
+        # Browsers send Date.now(), in milliseconds.
+        seconds = data / 1000 if data > 1e11 else data
+        try:
+            return datetime.datetime.fromtimestamp(seconds, tz=datetime.timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            self.fail('invalid')
+
+    def to_representation(self, value):
+        return value.isoformat()
+
+
+class VisitEventSerializer(serializers.Serializer):
+    """One event of POST /api/stats/visit/batch/."""
+    shop_slug = serializers.SlugField(max_length=255)
+    action = serializers.CharField(max_length=20)
+    product_id = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    ts = TimestampField(required=False)
+
+    def validate_action(self, value):
+        if value == 'visit':
+            value = Visit.ACTION_VIEW
+        if value not in (Visit.ACTION_VIEW, Visit.ACTION_WHATSAPP):
+            raise serializers.ValidationError('action doit être view ou whatsapp_click')
+        return value
+
+    def validate_ts(self, value):
+        now = timezone.now()
+        max_age = datetime.timedelta(seconds=getattr(settings, 'STATS_BATCH_MAX_EVENT_AGE', 7 * 24 * 3600))
+        if value > now + datetime.timedelta(minutes=5) or value < now - max_age:
+            raise serializers.ValidationError('Horodatage hors de la fenêtre acceptée.')
+        return value
@@ -0,0 +1,149 @@
+"""
+Time windows and dense, zero-filled series for the stats API.
+"""
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+GRANULARITIES = ('hour', 'day', 'week', 'month')
+
+# Window used when `from` is omitted, in buckets ending at `to`.
+DEFAULT_BUCKETS = {'hour': 24, 'day': 30, 'week': 12, 'month': 12}
+
+
+def floor_bucket(value, granularity):
+    """Start of the bucket containing `value` (datetime for hours, date otherwise)."""
+    if granularity == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'week':
+        return value - datetime.timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(start, granularity):
+    if granularity == 'hour':
+        return start + datetime.timedelta(hours=1)
+    if granularity == 'week':
+        return start + datetime.timedelta(weeks=1)
+    if granularity == 'month':
+        return (start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return start + datetime.timedelta(days=1)
+
+
+def _shift_back(start, granularity, count):
+    for _ in range(count):
+        if granularity == 'month':
+            start = (start - datetime.timedelta(days=1)).replace(day=1)
+        elif granularity == 'hour':
+            start -= datetime.timedelta(hours=1)
+        elif granularity == 'week':
+            start -= datetime.timedelta(weeks=1)
+        else:
+            start -= datetime.timedelta(days=1)
+    return start
+
+
+def _parse_bound(raw, name, granularity):
+    """Parse `from`/`to`: a date, or a datetime when granularity is 'hour'."""
+    # parse_date/parse_datetime return None when malformed, and raise
+    # ValueError when well-formed but out of range (2024-13-45).
+    try:
+        value = parse_datetime(raw) if granularity == 'hour' and 'T' in raw else None
+        day = None if value is not None else parse_date(raw)
+    except ValueError:
+        value = day = None
+    if value is not None:
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return timezone.localtime(value)
+    if day is None:
+        raise ValidationError({name: 'Date invalide (format YYYY-MM-DD).'})
+    if granularity == 'hour':
+        # A bare date covers the whole day on either side of the window.
+        at = datetime.time.min if name == 'from' else datetime.time(23)
+        return timezone.make_aware(datetime.datetime.combine(day, at))
+    return day
+
+
+class Window:
+    """
+    A validated [start, end) range cut into buckets of one granularity.
+    `start` and `end` are aligned on bucket boundaries.
+    """
+
+    def __init__(self, start, end, granularity):
+        self.start = start
+        self.end = end
+        self.granularity = granularity
+
+    @classmethod
+    def from_params(cls, params):
+        granularity = params.get('granularity') or 'day'
+        if granularity not in GRANULARITIES:
+            raise ValidationError({'granularity': f"Valeurs possibles : {', '.join(GRANULARITIES)}."})
+
+        raw_to = params.get('to')
+        if raw_to:
+            last = floor_bucket(_parse_bound(raw_to, 'to', granularity), granularity)
+        elif granularity == 'hour':
+            last = floor_bucket(timezone.localtime(), granularity)
+        else:
+            last = floor_bucket(timezone.localdate(), granularity)
+        end = next_bucket(last, granularity)
+
+        raw_from = params.get('from')
+        if raw_from:
+            start = floor_bucket(_parse_bound(raw_from, 'from', granularity), granularity)
+        else:
+            start = _shift_back(end, granularity, DEFAULT_BUCKETS[granularity])
+        if start >= end:
+            raise ValidationError({'from': '`from` doit précéder `to`.'})
+
+        window = cls(start, end, granularity)
+        max_buckets = getattr(settings, 'STATS_MAX_BUCKETS', 366)
+        if window.bucket_count(limit=max_buckets + 1) > max_buckets:
+            raise ValidationError({
+                'detail': f'Fenêtre trop large : {max_buckets} intervalles maximum.'
+            })
+        return window
+
+    def buckets(self):
+        start = self.start
+        while start < self.end:
+            end = next_bucket(start, self.granularity)
+            yield start, end
+            start = end
+
+    def bucket_count(self, limit=None):
+        count = 0
+        for _ in self.buckets():
+            count += 1
+            if limit is not None and count >= limit:
+                break
+        return count
+
+    def label(self, value):
+        return value.isoformat()
+
+    def dense_series(self, rows):
+        """
+        Merge `rows` — (bucket_or_day, views, whatsapp_clicks) tuples sorted
+        by their first item and inside the window — into one entry per
+        bucket, zero-filled, in a single pass over both sequences.
+        """
+        rows = iter(rows)
+        row = next(rows, None)
+        series = []
+        for start, end in self.buckets():
+            views = clicks = 0
+            while row is not None and row[0] < end:
+                views += row[1]
+                clicks += row[2]
+                row = next(rows, None)
+            series.append((self.label(start), views, clicks))
+        return series
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.products.models import Product
+from apps.stats.rollups import bump_stats_versions
+
+# total_products is part of the dashboard payload: a new or deleted product
+# must invalidate the StatsMeView ETag.
+
+@receiver(post_save, sender=Product)
+def bump_stats_on_product_created(sender, instance, created, **kwargs):
+    if created:
+        bump_stats_versions([instance.shop_id])
+
+
+@receiver(post_delete, sender=Product)
+def bump_stats_on_product_deleted(sender, instance, origin=None, **kwargs):
+    # Cascade from a Shop or User delete: the shop's version row goes too,
+    # and the upsert would re-insert it for a shop about to disappear.
+    if isinstance(origin, Product) or getattr(origin, 'model', None) is Product:
+        bump_stats_versions([instance.shop_id])
@@ -1,7 +1,11 @@
 from django.urls import path
-from .views import VisitCreateView, StatsMeView
+from .async_views import visit_create_async
+from .views import VisitCreateView, VisitBatchCreateView, StatsMeView, StatsExportView
 
 urlpatterns = [
     path('stats/visit/', VisitCreateView.as_view()),
+    path('stats/visit/async/', visit_create_async),
+    path('stats/visit/batch/', VisitBatchCreateView.as_view()),
     path('stats/me/', StatsMeView.as_view()),
+    path('stats/me/export/', StatsExportView.as_view()),
 ]
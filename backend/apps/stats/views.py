@@ -1,17 +1,27 @@
 """
 Views for stats app.
 """
-from django.db.models import Count, Q
-from django.db.models.functions import TruncDate
+import datetime
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.accounts.models import User
-from .models import Visit
-from django.shortcuts import get_object_or_404
+from apps.core.streaming import streaming_json_response
+from .ingest import record_visit, record_visits
+from .models import Visit, VisitDailyRollup
+from .serializers import VisitEventSerializer, parse_product_id
+from .series import Window
+from apps.products.models import Product
 from apps.shops.models import Shop
+from apps.shops.resolver import resolve_shop_id, resolve_shop_ids
 
 
 class VisitCreateView(APIView):
@@ -23,82 +33,213 @@ class VisitCreateView(APIView):
         action = request.data.get('action')
         if not shop_slug:
             return Response({'detail': 'shop_slug requis'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(shop_slug, str):
+            return Response({'detail': 'shop_slug doit être une chaîne'}, status=status.HTTP_400_BAD_REQUEST)
         if not action:
             return Response({'detail': 'action requis'}, status=status.HTTP_400_BAD_REQUEST)
         if action == 'visit':
             action = 'view'
         if action not in ('view', 'whatsapp_click'):
             return Response({'detail': 'action doit être view ou whatsapp_click'}, status=status.HTTP_400_BAD_REQUEST)
-        if not User.objects.filter(slug=shop_slug).exists():
+        try:
+            product_id = parse_product_id(request.data.get('product_id'))
+        except (TypeError, ValueError):
+            return Response({'detail': 'product_id doit être un entier positif'}, status=status.HTTP_400_BAD_REQUEST)
+        shop_id = resolve_shop_id(shop_slug)
+        if shop_id is None:
             return Response({'detail': 'Boutique introuvable'}, status=status.HTTP_404_NOT_FOUND)
-        # Resolve Shop and create Visit using FK
-        user = User.objects.get(slug=shop_slug)
-        shop = get_object_or_404(Shop, user=user)
-        Visit.objects.create(shop=shop, action=action)
+        record_visit(shop_id, action, product_id=product_id)
         return Response({'success': True}, status=status.HTTP_201_CREATED)
 
 
+class VisitBatchCreateView(APIView):
+    """
+    POST /api/stats/visit/batch/ - track many visits at once (public).
+    Body: {"events": [{"shop_slug", "action", "product_id"?, "ts"?}, ...]} or the bare list.
+    Slugs are resolved together, accepted events are written with one
+    bulk_create, and the response reports a result per event, in order.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        events = request.data.get('events') if isinstance(request.data, dict) else request.data
+        if not isinstance(events, list) or not events:
+            return Response({'detail': 'events doit être une liste non vide'}, status=status.HTTP_400_BAD_REQUEST)
+        max_events = getattr(settings, 'STATS_BATCH_MAX_EVENTS', 500)
+        if len(events) > max_events:
+            return Response(
+                {'detail': f'{max_events} événements maximum par requête'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(events)
+        valid = []
+        for index, event in enumerate(events):
+            ser = VisitEventSerializer(data=event)
+            if ser.is_valid():
+                valid.append((index, ser.validated_data))
+            else:
+                results[index] = {'index': index, 'status': 'rejected', 'errors': ser.errors}
+
+        shop_ids = resolve_shop_ids(data['shop_slug'] for _, data in valid)
+        now = timezone.now()
+        visits = []
+        for index, data in valid:
+            shop_id = shop_ids.get(data['shop_slug'])
+            if shop_id is None:
+                results[index] = {'index': index, 'status': 'rejected', 'errors': {'shop_slug': ['Boutique introuvable']}}
+                continue
+            visits.append(Visit(
+                shop_id=shop_id,
+                product_id=data.get('product_id'),
+                action=data['action'],
+                created_at=data.get('ts') or now,
+            ))
+            results[index] = {'index': index, 'status': 'accepted'}
+
+        record_visits(visits)
+        return Response({
+            'accepted': len(visits),
+            'rejected': len(events) - len(visits),
+            'results': results,
+        }, status=status.HTTP_201_CREATED if visits else status.HTTP_400_BAD_REQUEST)
+
+
 class StatsMeView(APIView):
     """
     GET /api/stats/me/ - stats for current user's shop.
-    Format Recharts: [{ date: "YYYY-MM-DD", visits: number, whatsapp: number }]
+    Query params: from, to (YYYY-MM-DD, inclusive), granularity=hour|day|week|month.
+    Format Recharts: [{ date: "YYYY-MM-DD", visits: number, whatsapp: number }],
+    one zero-filled entry per bucket of the window
     + total_visits, total_products, visits_by_day with count (frontend compatibility)
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        window = Window.from_params(request.query_params)
+        empty = {
+            'total_visits': 0,
+            'total_products': 0,
+            'visits_by_day': [],
+            'chart_data': [],
+        }
         try:
             slug = request.user.slug
         except AttributeError:
             return Response({'detail': 'Aucune boutique associée'}, status=status.HTTP_400_BAD_REQUEST)
         if not slug:
-            return Response({
-                'total_visits': 0,
-                'total_products': 0,
-                'visits_by_day': [],
-                'chart_data': [],
-            })
-
-        # Use FK relation to Shop (shop__slug) instead of non-existent shop_slug field
-        visits = Visit.objects.filter(shop__slug=slug)
-        total_visits = visits.count()
-
-        by_date = (
-            Visit.objects.filter(shop__slug=slug)
-            .annotate(day=TruncDate('created_at'))
-            .values('day')
-            .annotate(
-                view_count=Count('id', filter=Q(action='view')),
-                wa_count=Count('id', filter=Q(action='whatsapp_click')),
-            )
-            .order_by('day')
+            return Response(empty)
+
+        # One indexed lookup gives the shop and its stats version: enough to
+        # answer a conditional request without running any aggregation.
+        shop = (
+            Shop.objects.filter(user=request.user)
+            .values_list('id', 'stats_version__version')
+            .first()
         )
+        if shop is None:
+            return Response(empty)
+        shop_id, version = shop
+        etag = quote_etag(f'{shop_id}-{version or 0}-{window.granularity}-{window.start}-{window.end}')
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            return self._with_validator(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
 
-        chart_data = [
-            {
-                'date': str(row['day']),
-                'visits': row['view_count'],
-                'whatsapp': row['wa_count'],
-                'count': row['view_count'] + row['wa_count'],
-            }
-            for row in by_date
-        ]
+        totals = VisitDailyRollup.objects.filter(shop_id=shop_id).aggregate(
+            views=Sum('views'), whatsapp_clicks=Sum('whatsapp_clicks'),
+        )
+        total_visits = (totals['views'] or 0) + (totals['whatsapp_clicks'] or 0)
 
-        visits_by_day = [
-            {'date': str(r['day']), 'count': r['view_count'] + r['wa_count']}
-            for r in by_date
+        series = window.dense_series(self._window_rows(shop_id, window))
+        chart_data = [
+            {'date': label, 'visits': views, 'whatsapp': clicks, 'count': views + clicks}
+            for label, views, clicks in series
         ]
+        visits_by_day = [{'date': row['date'], 'count': row['count']} for row in chart_data]
 
-        # Count products via the user's Shop
-        try:
-            shop = Shop.objects.get(user=request.user)
-            total_products = shop.products.count()
-        except Shop.DoesNotExist:
-            total_products = 0
+        total_products = Product.objects.filter(shop_id=shop_id).count()
 
-        return Response({
+        return self._with_validator(Response({
             'total_visits': total_visits,
             'total_products': total_products,
             'visits_by_day': visits_by_day,
             'chart_data': chart_data,
-        })
+            'granularity': window.granularity,
+            'from': window.start.isoformat(),
+            'to': window.end.isoformat(),
+            'window_total': sum(row['count'] for row in chart_data),
+        }), etag)
+
+    def _with_validator(self, response, etag):
+        response['ETag'] = etag
+        # Private data: browsers may keep it but must revalidate each time.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def _window_rows(self, shop_id, window):
+        """(bucket_or_day, views, whatsapp_clicks) rows inside the window, sorted."""
+        if window.granularity == 'hour':
+            # Daily rollups are too coarse: aggregate the window's raw visits
+            # per hour in the database, on the (shop, action, created_at) index.
+            return (
+                Visit.objects.filter(
+                    shop_id=shop_id,
+                    created_at__gte=window.start,
+                    created_at__lt=window.end,
+                )
+                .annotate(bucket=TruncHour('created_at'))
+                .values('bucket')
+                .annotate(
+                    views=Count('id', filter=Q(action=Visit.ACTION_VIEW)),
+                    whatsapp_clicks=Count('id', filter=Q(action=Visit.ACTION_WHATSAPP)),
+                )
+                .order_by('bucket')
+                .values_list('bucket', 'views', 'whatsapp_clicks')
+            )
+        return (
+            VisitDailyRollup.objects.filter(
+                shop_id=shop_id, day__gte=window.start, day__lt=window.end,
+            )
+            .order_by('day')
+            .values_list('day', 'views', 'whatsapp_clicks')
+        )
+
+
+EXPORT_FIELDS = ('created_at', 'action', 'product_id', 'referrer')
+
+
+def _as_datetime(bound):
+    """Window bound as an aware datetime (day windows hold dates)."""
+    if isinstance(bound, datetime.datetime):
+        return bound
+    return timezone.make_aware(datetime.datetime.combine(bound, datetime.time.min))
+
+
+class StatsExportView(APIView):
+    """
+    GET /api/stats/me/export/ - raw visits of the current user's shop.
+    Query params: from, to, granularity as for /api/stats/me/ (the window's
+    bounds). Streamed JSON array, oldest first:
+    [{ created_at, action, product_id, referrer }, ...]
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        window = Window.from_params(request.query_params)
+        try:
+            shop_id = request.user.shop.pk
+        except Shop.DoesNotExist:
+            return Response({'detail': 'Aucune boutique associée'}, status=status.HTTP_400_BAD_REQUEST)
+        visits = (
+            Visit.objects.filter(
+                shop_id=shop_id,
+                created_at__gte=_as_datetime(window.start),
+                created_at__lt=_as_datetime(window.end),
+            )
+            .order_by('created_at', 'id')
+            .values(*EXPORT_FIELDS)
+        )
+        response = streaming_json_response(visits, dict)
+        response['Content-Disposition'] = f'attachment; filename="visites-{window.start}-{window.end}.json"'
+        patch_cache_control(response, private=True, no_store=True)
+        return response
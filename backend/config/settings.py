@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'corsheaders',
     # Local apps
+    'apps.core',
     'apps.accounts',
     'apps.shops',
     'apps.products',
@@ -116,6 +117,11 @@ CLOUDINARY_STORAGE = {
     'API_SECRET': os.environ.get('CLOUDINARY_API_SECRET', '').strip(),
 }
 
+# Largeurs (px) des variantes d'images stockées à l'upload (apps.core.images) ;
+# relancer `python manage.py refresh_image_urls` après un changement.
+IMAGE_THUMB_WIDTH = int(os.environ.get('IMAGE_THUMB_WIDTH', 320))
+IMAGE_MEDIUM_WIDTH = int(os.environ.get('IMAGE_MEDIUM_WIDTH', 800))
+
 # Compatibility for packages that reference this directly
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
@@ -136,6 +142,9 @@ CORS_ALLOW_ALL_ORIGINS = True  # Simplify for troubleshooting
 # if RENDER_EXTERNAL_HOSTNAME:
 #     CORS_ALLOWED_ORIGINS.append(f'https://{RENDER_EXTERNAL_HOSTNAME}')
 
+# En-têtes de pagination lisibles par le frontend (apps.core.pagination)
+CORS_EXPOSE_HEADERS = ['Link', 'X-Next-Cursor']
+
 CSRF_TRUSTED_ORIGINS = [
     "https://linkcontact-saas.onrender.com",
     "https://linkcontact.onrender.com",
@@ -150,7 +159,8 @@ SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT, utilisateur + boutique en cache par jeton (apps.accounts.authentication)
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -163,8 +173,98 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ),
+    # Render place un proxy devant l'application : l'IP du client (limitation des
+    # connexions) est la dernière adresse de X-Forwarded-For, pas une valeur fournie par le client
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '1')),
+}
+
+# Cache Django. Par défaut en mémoire locale du worker ; en production, un cache
+# partagé entre workers, par ex. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# et CACHE_LOCATION=redis://host:6379/0
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'linkcontact'),
+    },
 }
 
+# Cache des réponses publiques versionnées (apps.core.cache). Les versions ne sont
+# partagées entre workers qu'avec un cache partagé : désactivé par défaut en LocMemCache.
+RESPONSE_CACHE_ENABLED = os.environ.get(
+    'RESPONSE_CACHE_ENABLED', str('locmem' not in CACHE_BACKEND)
+) == 'True'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '86400'))
+
+# Résolution slug -> boutique (apps.shops.resolver) : cache LRU par worker
+SHOP_RESOLVER_CACHE_SIZE = int(os.environ.get('SHOP_RESOLVER_CACHE_SIZE', '4096'))
+SHOP_RESOLVER_TTL = float(os.environ.get('SHOP_RESOLVER_TTL', '300'))
+# Slugs inconnus : durée courte, une boutique créée ou renommée sur un autre worker doit apparaître vite
+SHOP_RESOLVER_NOT_FOUND_TTL = float(os.environ.get('SHOP_RESOLVER_NOT_FOUND_TTL', '5'))
+
+# Index des slugs pris (apps.shops.slug_index) pour GET /api/utils/check-slug/ :
+# chargé une fois par worker, tenu à jour à chaque écriture du worker et relu
+# entièrement toutes les SLUG_INDEX_TTL secondes ; SLUG_SUGGESTIONS alternatives proposées
+SLUG_INDEX_TTL = float(os.environ.get('SLUG_INDEX_TTL', '300'))
+SLUG_SUGGESTIONS = int(os.environ.get('SLUG_SUGGESTIONS', '5'))
+
+# Utilisateur authentifié par JWT (apps.accounts.authentication) : cache par jeton et par
+# worker, invalidé à chaque écriture de l'utilisateur ou de sa boutique dans ce worker
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', '4096'))
+AUTH_USER_CACHE_TTL = float(os.environ.get('AUTH_USER_CACHE_TTL', '30'))
+
+# Limitation des tentatives de connexion (apps.accounts.throttling), vérifiée avant
+# tout hachage de mot de passe : un seau de BURST jetons par IP et par compte,
+# rechargé de PER_MINUTE jetons par minute ; au-delà, réponse 429.
+# LOGIN_THROTTLE_BACKEND : 'memory' (par worker, sans requête) ou 'database'
+# (partagé entre workers ; purge avec manage.py prune_login_throttle)
+LOGIN_THROTTLE_ENABLED = os.environ.get('LOGIN_THROTTLE_ENABLED', 'True') == 'True'
+LOGIN_THROTTLE_BACKEND = os.environ.get('LOGIN_THROTTLE_BACKEND', 'memory')
+LOGIN_THROTTLE_IP_BURST = int(os.environ.get('LOGIN_THROTTLE_IP_BURST', '20'))
+LOGIN_THROTTLE_IP_PER_MINUTE = float(os.environ.get('LOGIN_THROTTLE_IP_PER_MINUTE', '10'))
+LOGIN_THROTTLE_ACCOUNT_BURST = int(os.environ.get('LOGIN_THROTTLE_ACCOUNT_BURST', '5'))
+LOGIN_THROTTLE_ACCOUNT_PER_MINUTE = float(os.environ.get('LOGIN_THROTTLE_ACCOUNT_PER_MINUTE', '1'))
+LOGIN_THROTTLE_CACHE_SIZE = int(os.environ.get('LOGIN_THROTTLE_CACHE_SIZE', '100000'))
+
+# Pagination par curseur des listes publiques (taille par défaut / max via ?page_size=)
+PUBLIC_PAGE_SIZE = int(os.environ.get('PUBLIC_PAGE_SIZE', '24'))
+PUBLIC_MAX_PAGE_SIZE = int(os.environ.get('PUBLIC_MAX_PAGE_SIZE', '100'))
+
+# Listes publiques en flux (?stream=1, apps.core.streaming) : pages plus grandes,
+# lues par lots de STREAMING_CHUNK_SIZE lignes et jamais mises en cache
+PUBLIC_STREAM_PAGE_SIZE = int(os.environ.get('PUBLIC_STREAM_PAGE_SIZE', '1000'))
+PUBLIC_STREAM_MAX_PAGE_SIZE = int(os.environ.get('PUBLIC_STREAM_MAX_PAGE_SIZE', '10000'))
+STREAMING_CHUNK_SIZE = int(os.environ.get('STREAMING_CHUNK_SIZE', '500'))
+
+# Import groupé de produits (apps.products.bulk)
+# 'thread' : traité en arrière-plan dans le worker. 'sync' : pendant la requête.
+PRODUCT_IMPORT_MODE = os.environ.get('PRODUCT_IMPORT_MODE', 'thread')
+PRODUCT_IMPORT_CHUNK_SIZE = int(os.environ.get('PRODUCT_IMPORT_CHUNK_SIZE', '500'))
+PRODUCT_IMPORT_MAX_ROWS = int(os.environ.get('PRODUCT_IMPORT_MAX_ROWS', '50000'))
+
+# Ingestion des visites (apps.stats.ingest)
+# 'sync' : un INSERT par beacon. 'buffered' : file en mémoire + bulk_create
+# par lots (taille max ou intervalle en secondes), vidée à l'arrêt du worker.
+STATS_INGESTION_MODE = os.environ.get('STATS_INGESTION_MODE', 'sync')
+STATS_BUFFER_MAX_SIZE = int(os.environ.get('STATS_BUFFER_MAX_SIZE', '500'))
+STATS_BUFFER_FLUSH_INTERVAL = float(os.environ.get('STATS_BUFFER_FLUSH_INTERVAL', '2.0'))
+
+# Compteurs de popularité (Shop/Product.views_count) : incréments cumulés en
+# mémoire et écrits par UPDATE groupés toutes les N secondes (apps.stats.counters)
+STATS_COUNTER_FLUSH_INTERVAL = float(os.environ.get('STATS_COUNTER_FLUSH_INTERVAL', '10'))
+
+# POST /api/stats/visit/batch/ : taille max d'un lot et âge max (s) d'un événement
+STATS_BATCH_MAX_EVENTS = int(os.environ.get('STATS_BATCH_MAX_EVENTS', '500'))
+STATS_BATCH_MAX_EVENT_AGE = int(os.environ.get('STATS_BATCH_MAX_EVENT_AGE', str(7 * 24 * 3600)))
+
+# Rétention des visites brutes (manage.py prune_visits) et partitions mensuelles
+# créées à l'avance sur PostgreSQL (manage.py create_visit_partitions)
+STATS_RETENTION_MONTHS = int(os.environ.get('STATS_RETENTION_MONTHS', '24'))
+STATS_PARTITIONS_AHEAD = int(os.environ.get('STATS_PARTITIONS_AHEAD', '3'))
+
+# Nombre maximal d'intervalles renvoyés par GET /api/stats/me/
+STATS_MAX_BUCKETS = int(os.environ.get('STATS_MAX_BUCKETS', '366'))
+
 # SimpleJWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
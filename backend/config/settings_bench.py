@@ -0,0 +1,45 @@
+"""
+Settings for load benchmarks on a developer machine (`manage.py bench_http`).
+
+    DJANGO_SETTINGS_MODULE=config.settings_bench python manage.py migrate
+    DJANGO_SETTINGS_MODULE=config.settings_bench python manage.py bench_http
+
+The database comes from BENCH_DATABASE_URL, never DATABASE_URL (the .env
+may point to production): a SQLite file next to manage.py by default.
+"""
+import os
+from pathlib import Path
+
+import dj_database_url
+
+# SQLite par défaut ; BENCH_DATABASE_URL=postgres://user@localhost/linkcontact_bench
+# pour une base PostgreSQL locale.
+BENCH_DATABASE_URL = os.environ.get(
+    'BENCH_DATABASE_URL', f"sqlite:///{Path(__file__).resolve().parent.parent / 'bench.sqlite3'}"
+)
+# settings.py exige DATABASE_URL ; la valeur est remplacée ci-dessous.
+os.environ.setdefault('DATABASE_URL', BENCH_DATABASE_URL)
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import MIDDLEWARE, STORAGES  # noqa: E402
+
+DATABASES = {
+    'default': dj_database_url.parse(BENCH_DATABASE_URL, conn_max_age=600)
+}
+
+# Pas de journal des requêtes SQL (DEBUG) pendant les mesures.
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+# Hachage rapide : seule la connexion du compte du tableau de bord en dépend.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Médias en local : aucun appel à Cloudinary.
+STORAGES = {
+    **STORAGES,
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+}
+DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
+
+# En-tête X-Query-Count : requêtes SQL par réponse, lu par bench_http --url.
+MIDDLEWARE = ['apps.core.middleware.QueryCountMiddleware', *MIDDLEWARE]
@@ -134,7 +134,7 @@ const Dashboard: React.FC = () => {
               <div key={product.id} className="bg-white rounded-3xl border border-gray-100 overflow-hidden shadow-sm group hover:shadow-md transition-all">
                 <div className="relative h-48 bg-gray-100">
                   {product.image ? (
-                    <img src={product.image} alt={product.name} className="w-full h-full object-cover" />
+                    <img src={product.image_thumb || product.image} alt={product.name} loading="lazy" className="w-full h-full object-cover" />
                   ) : (
                     <div className="w-full h-full flex items-center justify-center text-gray-400">Pas d'image</div>
                   )}
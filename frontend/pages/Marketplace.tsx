@@ -6,34 +6,56 @@ import { Link } from 'react-router-dom';
 
 const Marketplace: React.FC = () => {
     const [products, setProducts] = useState<Product[]>([]);
-    const [filteredProducts, setFilteredProducts] = useState<Product[]>([]);
     const [loading, setLoading] = useState(true);
     const [search, setSearch] = useState('');
+    // Curseur de la page suivante (pagination par curseur, en-tête X-Next-Cursor)
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+
+    // Recherche plein texte côté serveur dès qu'un terme est saisi, catalogue sinon.
+    // `fields=card` : uniquement les champs affichés sur les cartes.
+    const listRequest = (term: string): [string, Record<string, string>] =>
+        term.trim()
+            ? ['public/products/search/', { q: term.trim(), fields: 'card' }]
+            : ['public/products/', { fields: 'card' }];
 
     useEffect(() => {
+        let cancelled = false;
         const fetchProducts = async () => {
             try {
-                // Fix: Correct API URL
-                const res = await api.get('public/products/');
+                const [url, params] = listRequest(search);
+                const res = await api.get(url, { params });
+                if (cancelled) return;
                 setProducts(res.data);
-                setFilteredProducts(res.data);
+                setNextCursor(res.headers['x-next-cursor'] || null);
             } catch (err) {
                 console.error('Error fetching marketplace products:', err);
             } finally {
-                setLoading(false);
+                if (!cancelled) setLoading(false);
             }
         };
-        fetchProducts();
-    }, []);
+        // Attendre une pause dans la frappe avant d'interroger l'API
+        const timer = setTimeout(fetchProducts, search ? 300 : 0);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [search]);
 
-    useEffect(() => {
-        const term = search.toLowerCase();
-        const filtered = products.filter(p =>
-            p.name.toLowerCase().includes(term) ||
-            p.description.toLowerCase().includes(term)
-        );
-        setFilteredProducts(filtered);
-    }, [search, products]);
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const [url, params] = listRequest(search);
+            const res = await api.get(url, { params: { ...params, cursor: nextCursor } });
+            setProducts(prev => [...prev, ...res.data]);
+            setNextCursor(res.headers['x-next-cursor'] || null);
+        } catch (err) {
+            console.error('Error fetching marketplace products:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
 
     const sendWhatsApp = (product: Product, shopNumber?: string) => {
         if (!shopNumber) return;
@@ -114,11 +136,11 @@ const Marketplace: React.FC = () => {
                         <TrendingUp className="text-indigo-600" />
                         Produits Tendance
                     </h2>
-                    <span className="text-sm text-gray-500">{filteredProducts.length} résultats</span>
+                    <span className="text-sm text-gray-500">{products.length} résultats</span>
                 </div>
 
                 <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-8">
-                    {filteredProducts.map(product => {
+                    {products.map(product => {
                         const API_URL = import.meta.env.VITE_API_URL.replace(/\/api\/?$/, '/');
                         const imageUrl = product.image
                             ? (product.image.startsWith('http') ? product.image : `${API_URL}${product.image}`)
@@ -129,7 +151,10 @@ const Marketplace: React.FC = () => {
                                 <div className="h-64 bg-gray-100 relative overflow-hidden">
                                     {imageUrl ? (
                                         <img
-                                            src={imageUrl}
+                                            src={product.image_medium || imageUrl}
+                                            srcSet={product.image_srcset || undefined}
+                                            sizes="(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
+                                            loading="lazy"
                                             alt={product.name}
                                             className="w-full h-full object-cover transform group-hover:scale-110 transition-transform duration-700"
                                         />
@@ -147,7 +172,6 @@ const Marketplace: React.FC = () => {
                                 <div className="p-6">
                                     <div className="mb-4">
                                         <h3 className="font-bold text-lg text-gray-900 line-clamp-1 mb-1 group-hover:text-indigo-600 transition-colors">{product.name}</h3>
-                                        <p className="text-sm text-gray-500 line-clamp-2 h-10 leading-relaxed">{product.description}</p>
                                     </div>
 
                                     <div className="flex items-end justify-between mt-6">
@@ -191,7 +215,19 @@ const Marketplace: React.FC = () => {
                     })}
                 </div>
 
-                {filteredProducts.length === 0 && (
+                {nextCursor && (
+                    <div className="text-center mt-12">
+                        <button
+                            onClick={loadMore}
+                            disabled={loadingMore}
+                            className="px-8 py-3 rounded-2xl bg-white border border-gray-200 font-bold text-gray-700 hover:bg-gray-50 disabled:opacity-50 transition-colors"
+                        >
+                            {loadingMore ? 'Chargement...' : 'Voir plus'}
+                        </button>
+                    </div>
+                )}
+
+                {products.length === 0 && (
                     <div className="text-center py-32">
                         <div className="w-24 h-24 bg-gray-50 rounded-full flex items-center justify-center mx-auto mb-6">
                             <ShoppingBag size={40} className="text-gray-300" />
@@ -10,6 +10,9 @@ const PublicShop: React.FC = () => {
   const [products, setProducts] = useState<Product[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(false);
+  // Curseur de la page suivante (pagination par curseur, en-tête X-Next-Cursor)
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchData = async () => {
@@ -20,6 +23,7 @@ const PublicShop: React.FC = () => {
         ]);
         setShop(shopRes.data);
         setProducts(prodRes.data);
+        setNextCursor(prodRes.headers['x-next-cursor'] || null);
 
         api.post('stats/visit/', { shop_slug: slug, action: 'visit' });
       } catch (err) {
@@ -31,6 +35,20 @@ const PublicShop: React.FC = () => {
     if (slug) fetchData();
   }, [slug]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await api.get(`shops/${slug}/products/`, { params: { cursor: nextCursor } });
+      setProducts((prev) => [...prev, ...res.data]);
+      setNextCursor(res.headers['x-next-cursor'] || null);
+    } catch (err) {
+      console.error('Error fetching shop products:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const sendWhatsApp = (product: Product) => {
     if (!shop?.whatsapp_number) return;
 
@@ -78,7 +96,7 @@ const PublicShop: React.FC = () => {
           {shop.logo ? (
             <div className="w-32 h-32 mx-auto mb-6 rounded-3xl overflow-hidden border-4 border-white shadow-xl">
               <img
-                src={shop.logo}
+                src={shop.logo_thumb || shop.logo}
                 alt={shop.name}
                 className="w-full h-full object-cover"
               />
@@ -127,7 +145,10 @@ const PublicShop: React.FC = () => {
                   <div className="h-64 bg-gray-100 overflow-hidden flex items-center justify-center">
                     {imageUrl ? (
                       <img
-                        src={imageUrl}
+                        src={product.image_medium || imageUrl}
+                        srcSet={product.image_srcset || undefined}
+                        sizes="(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
+                        loading="lazy"
                         alt={product.name}
                         className="w-full h-full object-cover"
                       />
@@ -163,6 +184,18 @@ const PublicShop: React.FC = () => {
             })}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center mt-12">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-8 py-3 rounded-2xl bg-white border border-gray-200 font-bold text-gray-700 hover:bg-gray-50 disabled:opacity-50 transition-colors"
+            >
+              {loadingMore ? 'Chargement...' : 'Voir plus'}
+            </button>
+          </div>
+        )}
       </main>
 
       {/* Footer */}
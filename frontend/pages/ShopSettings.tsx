@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useStore } from '../store/useStore';
 import api from '../services/api';
 import { Save, Loader2, Check, Smartphone, Info, Link as LinkIcon, Upload, Image as ImageIcon } from 'lucide-react';
@@ -19,6 +19,10 @@ const ShopSettings: React.FC = () => {
   const [loading, setLoading] = useState(false);
   const [saved, setSaved] = useState(false);
   const [slugStatus, setSlugStatus] = useState<'idle' | 'checking' | 'available' | 'taken'>('idle');
+  const [slugSuggestions, setSlugSuggestions] = useState<string[]>([]);
+  // Vérification différée pendant la frappe ; seule la dernière valeur saisie compte.
+  const slugTimer = useRef<ReturnType<typeof setTimeout> | undefined>(undefined);
+  const latestSlug = useRef('');
 
   useEffect(() => {
     if (shop) {
@@ -36,24 +40,34 @@ const ShopSettings: React.FC = () => {
     }
   }, [shop]);
 
+  useEffect(() => () => clearTimeout(slugTimer.current), []);
+
   const checkSlug = async (slug: string) => {
-    if (!slug || slug === shop?.slug) {
-      setSlugStatus('idle');
-      return;
-    }
-    setSlugStatus('checking');
     try {
       const res = await api.get(`utils/check-slug/${slug}/`);
+      if (slug !== latestSlug.current) return;
       setSlugStatus(res.data.available ? 'available' : 'taken');
+      setSlugSuggestions(res.data.suggestions || []);
     } catch {
+      if (slug === latestSlug.current) setSlugStatus('idle');
+    }
+  };
+
+  const changeSlug = (val: string) => {
+    setFormData((data) => ({ ...data, slug: val }));
+    latestSlug.current = val;
+    clearTimeout(slugTimer.current);
+    setSlugSuggestions([]);
+    if (!val || val === shop?.slug) {
       setSlugStatus('idle');
+      return;
     }
+    setSlugStatus('checking');
+    slugTimer.current = setTimeout(() => checkSlug(val), 300);
   };
 
   const handleSlugChange = (e: React.ChangeEvent<HTMLInputElement>) => {
-    const val = e.target.value.toLowerCase().replace(/[^a-z0-9-]/g, '');
-    setFormData({ ...formData, slug: val });
-    checkSlug(val);
+    changeSlug(e.target.value.toLowerCase().replace(/[^a-z0-9-]/g, ''));
   };
 
   const handleLogoChange = (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -183,6 +197,21 @@ const ShopSettings: React.FC = () => {
             </div>
             {slugStatus === 'available' && <p className="text-xs text-emerald-600 mt-2 font-medium">Ce lien est disponible !</p>}
             {slugStatus === 'taken' && <p className="text-xs text-red-500 mt-2 font-medium">Ce lien est déjà utilisé.</p>}
+            {slugStatus === 'taken' && slugSuggestions.length > 0 && (
+              <div className="flex flex-wrap items-center gap-2 mt-2">
+                <span className="text-xs text-gray-500">Disponibles :</span>
+                {slugSuggestions.map((suggestion) => (
+                  <button
+                    key={suggestion}
+                    type="button"
+                    onClick={() => changeSlug(suggestion)}
+                    className="text-xs px-2.5 py-1 bg-indigo-50 text-indigo-600 rounded-lg hover:bg-indigo-100 transition-colors"
+                  >
+                    {suggestion}
+                  </button>
+                ))}
+              </div>
+            )}
           </div>
 
           {/* WhatsApp */}
@@ -13,6 +13,8 @@ export interface Shop {
   slug: string;
   whatsapp_number: string;
   logo?: string;
+  logo_thumb?: string;
+  logo_srcset?: string | null;
   user?: number;
   first_name?: string;
   last_name?: string;
@@ -24,9 +26,14 @@ export interface Product {
   description: string;
   price: number;
   image?: string;
+  image_thumb?: string;
+  image_medium?: string;
+  image_srcset?: string | null;
   shop_name?: string;
   shop_slug?: string;
   shop_whatsapp?: string;
+  status?: 'draft' | 'published' | 'archived';
+  is_active?: boolean;
 }
 
 export interface Stats {